@@ -0,0 +1,103 @@
+"""
+A seeded generator of OpenWPM-like url corpora for benchmarking.
+
+Real crawl tables have heavy host repetition: a few trackers and CDNs make
+up most requests. The generator draws hosts from a Zipf-like distribution
+over a fixed pool, and mixes in the awkward inputs domain_utils has to
+handle: deep subdomains, private suffixes, ports, scheme-less urls, IP
+hosts, ``data:`` and ``about:`` urls and very long query strings.
+"""
+import random
+import string
+
+ICANN_SUFFIXES = ['com', 'net', 'org', 'co.uk', 'de', 'com.au', 'co.jp', 'fr', 'io', 'ru']
+PRIVATE_SUFFIXES = [
+    'cloudfront.net', 'herokuapp.com', 'github.io', 'appspot.com',
+    'blogspot.com', 's3.amazonaws.com', 'azurewebsites.net', 'fbsbx.com',
+]
+SUBDOMAIN_WORDS = ['www', 'cdn', 'static', 'api', 'ads', 'track', 'img', 'm', 'eu', 'us-east-1']
+SPECIAL_URLS = [
+    'about:blank',
+    'about:srcdoc',
+    'data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7',
+    'javascript:void(0)',
+    'blob:https://www.example.com/6c7e0a3f-9f1e-4a5e-8b63-2f1e0b1f7f3c',
+]
+
+
+def _word(rng, low=3, high=10):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(low, high)))
+
+
+def _host(rng):
+    kind = rng.random()
+    if kind < 0.03:
+        return '.'.join(str(rng.randint(1, 254)) for _ in range(4))
+    if kind < 0.04:
+        return '[2001:db8::{:x}]'.format(rng.randint(1, 0xffff))
+    if kind < 0.3:
+        suffix = rng.choice(PRIVATE_SUFFIXES)
+    else:
+        suffix = rng.choice(ICANN_SUFFIXES)
+    depth = min(int(rng.expovariate(0.8)), 6)
+    labels = [rng.choice(SUBDOMAIN_WORDS + [_word(rng)]) for _ in range(depth)]
+    return '.'.join(labels + [_word(rng), suffix])
+
+
+def _path(rng):
+    return '/' + '/'.join(_word(rng, 1, 8) for _ in range(rng.randint(0, 4)))
+
+
+def _query(rng):
+    kind = rng.random()
+    if kind < 0.5:
+        return ''
+    if kind < 0.97:
+        return '?' + '&'.join(
+            '{}={}'.format(_word(rng, 1, 5), _word(rng, 1, 12)) for _ in range(rng.randint(1, 6)))
+    # Tracking pixels with kilobytes of encoded state
+    return '?d=' + ''.join(rng.choice(string.ascii_letters + string.digits) for _ in range(4096))
+
+
+def generate_corpus(size=100000, hosts=5000, seed=0):
+    """
+    Generate a list of ``size`` urls.
+
+    Parameters
+    ----------
+    size : int, optional
+        The number of urls. Default is 100000.
+    hosts : int, optional
+        The number of distinct hosts to draw from. Default is 5000.
+    seed : int, optional
+        The random seed. The same arguments always give the same corpus.
+
+    Returns
+    -------
+    list (string)
+    """
+    rng = random.Random(seed)
+    pool = [_host(rng) for _ in range(hosts)]
+    # Zipf-like weights, so the first hosts dominate like trackers do
+    weights = [1.0 / (rank + 1) for rank in range(hosts)]
+    chosen = rng.choices(pool, weights=weights, k=size)
+    urls = []
+    for host in chosen:
+        kind = rng.random()
+        if kind < 0.02:
+            urls.append(rng.choice(SPECIAL_URLS))
+            continue
+        netloc = host
+        if rng.random() < 0.05:
+            netloc += ':{}'.format(rng.choice([80, 443, 8080, 8443, 3000]))
+        if kind < 0.07:
+            scheme = ''
+        elif kind < 0.1:
+            scheme = rng.choice(['ws://', 'wss://'])
+        else:
+            scheme = rng.choice(['http://', 'https://', 'https://', 'https://'])
+        url = scheme + netloc + _path(rng) + _query(rng)
+        if rng.random() < 0.05:
+            url += '#' + _word(rng)
+        urls.append(url)
+    return urls
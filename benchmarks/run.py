@@ -0,0 +1,227 @@
+"""
+Benchmark domain_utils on a synthetic crawl corpus.
+
+Run from the repository root::
+
+    python -m benchmarks.run                    # print results
+    python -m benchmarks.run --save             # also store them
+    python -m benchmarks.run --compare          # diff with the last stored run
+    python -m benchmarks.run --threads 1 2 4 8  # also measure thread scaling
+
+Everything runs offline against the Public Suffix List snapshot bundled
+with domain_utils. Stored runs are JSON files in ``benchmarks/results``,
+named after the git commit they ran on.
+"""
+import argparse
+import datetime
+import gc
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from .corpus import generate_corpus
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+COLD_START = (
+    'import time; start = time.perf_counter(); '
+    'import domain_utils; domain_utils.get_etld1("http://www.example.com"); '
+    'print(time.perf_counter() - start)'
+)
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(__file__), stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def _per_url(function, **kwargs):
+    def run(urls):
+        return [function(url, **kwargs) for url in urls]
+    return run
+
+
+def _benchmarks():
+    import domain_utils as du
+    return {
+        'stem_url': _per_url(du.stem_url),
+        'get_etld1': _per_url(du.get_etld1),
+        'hostname_subparts': _per_url(du.hostname_subparts),
+        'get_port': _per_url(du.get_port),
+        'get_scheme': _per_url(du.get_scheme),
+        'parse_url': _per_url(du.parse_url),
+        'get_etld1_many': du.get_etld1_many,
+        'stem_url_many': du.stem_url_many,
+        'hostname_subparts_many': du.hostname_subparts_many,
+    }
+
+
+def _use_extractor(name):
+    import domain_utils as du
+    from domain_utils.extractor import PSL_SNAPSHOT
+    if name == 'trie':
+        du.set_extractor(du.SuffixTrie.from_file(PSL_SNAPSHOT))
+    elif name == 'compiled':
+        import tempfile
+        from domain_utils.psl_binary import MappedSuffixTrie, compile_suffix_list
+        path = os.path.join(tempfile.mkdtemp(), 'psl.bin')
+        compile_suffix_list(PSL_SNAPSHOT, path)
+        du.set_extractor(MappedSuffixTrie(path))
+    else:
+        du.preload()
+
+
+def cold_start(repeat=5):
+    """Seconds for a fresh interpreter to import domain_utils and answer once."""
+    times = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', COLD_START])
+        times.append(float(output))
+    return min(times)
+
+
+def run(size, seed, repeat, extractor, only=None):
+    import domain_utils as du
+    urls = generate_corpus(size=size, seed=seed)
+    _use_extractor(extractor)
+    results = {}
+    for name, function in _benchmarks().items():
+        if only and name not in only:
+            continue
+        timings = []
+        for _ in range(repeat):
+            # Every repeat starts with a cold hostname cache
+            du.cache_clear()
+            gc.collect()
+            start = time.perf_counter()
+            function(urls)
+            timings.append(time.perf_counter() - start)
+        du.cache_clear()
+        gc.collect()
+        tracemalloc.start()
+        function(urls)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        best = min(timings)
+        results[name] = {
+            'seconds': best,
+            'urls_per_second': size / best,
+            'peak_memory_bytes': peak,
+        }
+    return results
+
+
+def thread_scaling(size, seed, repeat, counts):
+    """
+    ``get_etld1_many`` throughput in a thread pool of each size in ``counts``.
+
+    Threads only run in parallel on free-threaded Python builds, elsewhere
+    this shows what the pool costs.
+    """
+    import domain_utils as du
+    from domain_utils.parallel import THREAD, imap
+    urls = generate_corpus(size=size, seed=seed)
+    results = {}
+    for workers in counts:
+        timings = []
+        for _ in range(repeat):
+            du.cache_clear()
+            gc.collect()
+            start = time.perf_counter()
+            for _ in imap(du.get_etld1_many, urls, workers=workers, chunksize=1000,
+                          executor=THREAD):
+                pass
+            timings.append(time.perf_counter() - start)
+        results[str(workers)] = {'seconds': min(timings), 'urls_per_second': size / min(timings)}
+    return results
+
+
+def _latest():
+    paths = sorted(glob.glob(os.path.join(RESULTS_DIR, '*.json')), key=os.path.getmtime)
+    return paths[-1] if paths else None
+
+
+def _print(report, baseline=None):
+    print('commit {commit}, {size} urls, seed {seed}, extractor {extractor}'.format(**report))
+    print('cold start: {:.3f}s'.format(report['cold_start_seconds']))
+    header = '{:<24}{:>14}{:>14}'.format('function', 'urls/s', 'peak MiB')
+    if baseline:
+        header += '{:>14}'.format('vs ' + baseline['commit'])
+    print(header)
+    for name, result in report['results'].items():
+        line = '{:<24}{:>14,.0f}{:>14.1f}'.format(
+            name, result['urls_per_second'], result['peak_memory_bytes'] / 2 ** 20)
+        if baseline and name in baseline['results']:
+            change = result['urls_per_second'] / baseline['results'][name]['urls_per_second']
+            line += '{:>+13.1f}%'.format((change - 1) * 100)
+        print(line)
+    scaling = report.get('thread_scaling')
+    if scaling:
+        base = next(iter(scaling.values()))['urls_per_second']
+        print('{:<24}{:>14}{:>14}'.format('get_etld1_many threads', 'urls/s', 'speedup'))
+        for workers, result in scaling.items():
+            print('{:<24}{:>14,.0f}{:>13.2f}x'.format(
+                workers, result['urls_per_second'], result['urls_per_second'] / base))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--size', type=int, default=50000, help='number of urls')
+    parser.add_argument('--seed', type=int, default=0, help='corpus random seed')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per function')
+    parser.add_argument(
+        '--extractor', choices=['tldextract', 'trie', 'compiled'], default='tldextract',
+        help='shared extractor to benchmark')
+    parser.add_argument('--only', nargs='*', help='functions to run')
+    parser.add_argument(
+        '--threads', nargs='*', type=int, metavar='N',
+        help='thread pool sizes to measure get_etld1_many scaling with')
+    parser.add_argument('--save', action='store_true', help='store results')
+    parser.add_argument(
+        '--compare', nargs='?', const='latest', metavar='RESULTS',
+        help='compare with a stored results file, default the latest')
+    args = parser.parse_args(argv)
+
+    report = {
+        'commit': _git_commit(),
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'size': args.size,
+        'seed': args.seed,
+        'extractor': args.extractor,
+        'cold_start_seconds': cold_start(),
+        'results': run(args.size, args.seed, args.repeat, args.extractor, args.only),
+    }
+    if args.threads:
+        report['thread_scaling'] = thread_scaling(
+            args.size, args.seed, args.repeat, args.threads)
+
+    baseline = None
+    if args.compare:
+        path = _latest() if args.compare == 'latest' else args.compare
+        if path:
+            with open(path) as f:
+                baseline = json.load(f)
+    _print(report, baseline)
+
+    if args.save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, '{commit}-{extractor}-{timestamp}.json'.format(
+            **dict(report, timestamp=report['timestamp'].replace(':', ''))))
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print('saved', path)
+
+
+if __name__ == '__main__':
+    main()
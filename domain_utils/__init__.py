@@ -5,3 +5,13 @@ __email__ = 'sbird@mozilla.com'
 __version__ = '0.7.1'
 
 from .domain_utils import *  # noqa
+from .batch import (  # noqa
+    get_etld1_many,
+    get_port_many,
+    get_scheme_many,
+    hostname_subparts_many,
+    is_third_party_many,
+    stem_url_many,
+)
+from .table import DomainTable  # noqa
+from .matcher import DomainMatcher  # noqa
@@ -0,0 +1,172 @@
+"""
+domain_utils functions over Apache Arrow arrays of urls.
+
+Each function takes a ``pyarrow.Array`` or ``pyarrow.ChunkedArray`` of
+strings and returns an array of the same kind and length. Every chunk is
+dictionary encoded by Arrow first, so only its distinct values are turned
+into Python strings, and the results are mapped back to rows with
+``pyarrow.compute.take``. Null urls give null results.
+
+``stem_url_arrow`` encodes whole urls. The eTLD+1, port and scheme of a
+plain ``http(s)://`` or ``ws(s)://`` url only depend on its scheme and
+netloc, which Arrow extracts, so the other functions encode one
+``scheme://netloc`` per distinct host of such urls, and the url itself for
+any other.
+"""
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .batch import RAISE, get_etld1_many, get_port_many, get_scheme_many, stem_url_many
+from .domain_utils import NO_SCHEME
+
+
+# ``_PLAIN_URL`` of domain_utils.domain_utils in RE2 syntax, capturing the
+# scheme and netloc
+_PLAIN_URL_RE2 = (
+    r'^(?P<scheme>https?|wss?)://'
+    r'(?P<netloc>[^/?#\[\]\t\r\n\x{80}-\x{10FFFF}]*)'
+    r'(?:/[^?#\t\r\n]*)?'
+    r'(?:\?[^#\t\r\n]*)?'
+    r'(?:#[^\t\r\n]*)?$'
+)
+
+
+def _map_chunks(urls, function, dictionary, by_host=False):
+    if isinstance(urls, pa.ChunkedArray):
+        chunks = [_map_chunk(chunk, function, dictionary, by_host) for chunk in urls.chunks]
+        if not chunks:
+            return pa.chunked_array([], type=_result_type(function, dictionary))
+        return pa.chunked_array(chunks)
+    return _map_chunk(urls, function, dictionary, by_host)
+
+
+def _result_type(function, dictionary):
+    value_type = function([]).type
+    if dictionary:
+        return pa.dictionary(pa.int32(), value_type)
+    return value_type
+
+
+def _by_host(chunk):
+    # ``chunk`` dictionary encoded on ``scheme://netloc`` for plain urls and
+    # on the url itself for the rest
+    if pa.types.is_dictionary(chunk.type):
+        hosts = _by_host(chunk.dictionary)
+        return pa.DictionaryArray.from_arrays(
+            pc.take(hosts.indices, chunk.indices), hosts.dictionary)
+    parts = pc.extract_regex(chunk, _PLAIN_URL_RE2)
+    hosts = pc.binary_join_element_wise(
+        pc.struct_field(parts, 'scheme'), pc.struct_field(parts, 'netloc'), '://')
+    return pc.coalesce(hosts, chunk).dictionary_encode()
+
+
+def _map_chunk(chunk, function, dictionary, by_host):
+    if by_host:
+        chunk = _by_host(chunk)
+    elif not pa.types.is_dictionary(chunk.type):
+        chunk = chunk.dictionary_encode()
+    values = function(chunk.dictionary.to_pylist())
+    if dictionary:
+        # Urls of the chunk can share a result, so encode the results again
+        values = values.dictionary_encode()
+        indices = pc.take(values.indices, chunk.indices)
+        return pa.DictionaryArray.from_arrays(indices, values.dictionary)
+    return pc.take(values, chunk.indices)
+
+
+def get_etld1_arrow(urls, errors=RAISE, **kwargs):
+    """
+    The ``get_etld1`` of each url.
+
+    Parameters
+    ----------
+    urls : pyarrow.Array or pyarrow.ChunkedArray
+        String or dictionary encoded string urls.
+    errors : string, optional
+        See ``get_etld1_many``. Coerced errors become nulls.
+    kwargs:
+        Passed to ``get_etld1_many``, e.g. ``extractor``.
+
+    Returns
+    -------
+    pyarrow.Array or pyarrow.ChunkedArray
+        Dictionary encoded strings.
+    """
+    def etld1(values):
+        return pa.array(get_etld1_many(values, errors=errors, **kwargs), type=pa.string())
+
+    return _map_chunks(urls, etld1, dictionary=True, by_host=True)
+
+
+def stem_url_arrow(urls, errors=RAISE, **kwargs):
+    """
+    The ``stem_url`` of each url.
+
+    Parameters
+    ----------
+    urls : pyarrow.Array or pyarrow.ChunkedArray
+        String or dictionary encoded string urls.
+    errors : string, optional
+        See ``stem_url_many``. Coerced errors become nulls.
+    kwargs:
+        ``stem_url`` parameters, e.g. ``scheme=True``.
+
+    Returns
+    -------
+    pyarrow.Array or pyarrow.ChunkedArray
+        Strings.
+    """
+    def stem(values):
+        return pa.array(stem_url_many(values, errors=errors, **kwargs), type=pa.string())
+
+    return _map_chunks(urls, stem, dictionary=False)
+
+
+def get_port_arrow(urls, errors=RAISE, **kwargs):
+    """
+    The ``get_port`` of each url.
+
+    Parameters
+    ----------
+    urls : pyarrow.Array or pyarrow.ChunkedArray
+        String or dictionary encoded string urls.
+    errors : string, optional
+        See ``get_port_many``. Coerced errors become nulls.
+    kwargs:
+        Passed to ``get_port_many``, e.g. ``extractor``.
+
+    Returns
+    -------
+    pyarrow.Array or pyarrow.ChunkedArray
+        int32, null where the url has no port.
+    """
+    def port(values):
+        return pa.array(get_port_many(values, errors=errors, **kwargs), type=pa.int32())
+
+    return _map_chunks(urls, port, dictionary=False, by_host=True)
+
+
+def get_scheme_arrow(urls, no_scheme=NO_SCHEME, errors=RAISE):
+    """
+    The ``get_scheme`` of each url.
+
+    Parameters
+    ----------
+    urls : pyarrow.Array or pyarrow.ChunkedArray
+        String or dictionary encoded string urls.
+    no_scheme : string, optional
+        The value to use if no scheme is detected.
+        Default is ``no_scheme``.
+    errors : string, optional
+        See ``get_scheme_many``. Coerced errors become nulls.
+
+    Returns
+    -------
+    pyarrow.Array or pyarrow.ChunkedArray
+        Dictionary encoded strings.
+    """
+    def scheme(values):
+        return pa.array(
+            get_scheme_many(values, no_scheme=no_scheme, errors=errors), type=pa.string())
+
+    return _map_chunks(urls, scheme, dictionary=True, by_host=True)
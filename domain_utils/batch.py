@@ -0,0 +1,291 @@
+from .domain_utils import (
+    HTTP,
+    NO_SCHEME,
+    _defer_shared_extractor,
+    _subparts,
+    _use_shared_extractor,
+    get_scheme,
+    parse_url,
+)
+from .instrumentation import timed
+
+RAISE = 'raise'
+COERCE = 'coerce'
+
+# What urlparse and friends raise on malformed input, e.g. an unclosed
+# IPv6 bracket, an invalid port, or a non-string value
+_URL_ERRORS = (ValueError, TypeError, AttributeError)
+
+
+def _map_unique(function, urls, errors, default):
+    # Computes ``function`` once per distinct url and returns the results
+    # in input order.
+    if errors not in (RAISE, COERCE):
+        raise ValueError(
+            f"errors must be '{RAISE}' or '{COERCE}', not {errors!r}")
+    results = []
+    seen = {}
+    for url in urls:
+        try:
+            result = seen[url]
+        except KeyError:
+            try:
+                result = function(url)
+            except _URL_ERRORS:
+                if errors == RAISE:
+                    raise
+                result = default
+            seen[url] = result
+        except TypeError:
+            # Unhashable values can not be deduplicated
+            if errors == RAISE:
+                raise
+            result = default
+        results.append(result)
+    return results
+
+
+@timed('get_etld1_many')
+@_use_shared_extractor
+def get_etld1_many(urls, errors=RAISE, default=None, extractor=None):
+    """
+    Returns the eTLD+1 (aka PS+1) of each url in ``urls``.
+
+    Each distinct url is parsed once and each distinct host is passed to the
+    extractor once, so this is much faster than calling ``get_etld1`` in a
+    loop over data with many repeated hosts.
+
+    Parameters
+    ----------
+    urls : iterable (string)
+        The urls from which to extract the eTLD+1 / PS+1
+    errors : string, optional
+        If ``raise``, a malformed url raises as it would in ``get_etld1``.
+        If ``coerce``, its result is ``default`` instead.
+        Default is ``raise``.
+    default : any, optional
+        The result for malformed urls when ``errors`` is ``coerce``.
+        Default is ``None``.
+    extractor : tldextract::TLDExtract or SuffixTrie, optional
+        An (optional) tldextract::TLDExtract or SuffixTrie instance can be
+        passed with keyword `extractor`, otherwise the shared extractor is used.
+
+    Returns
+    -------
+    list (string)
+        The eTLD+1 / PS+1 of each url, in input order.
+    """
+    hosts = {}
+
+    def etld1(url):
+        parsed = parse_url(url, extractor=extractor)
+        parsed._extract(cache=hosts)
+        return parsed.etld1
+
+    return _map_unique(etld1, urls, errors, default)
+
+
+@_use_shared_extractor
+def _site_ids(url_lists, errors=RAISE, extractor=None):
+    # The eTLD+1 of each url as a small int, numbered across all of
+    # ``url_lists`` so ids from different lists can be compared. Malformed
+    # urls get ``None`` when ``errors`` is ``coerce``.
+    hosts = {}
+    site_ids = {}
+
+    def site_id(url):
+        parsed = parse_url(url, extractor=extractor)
+        parsed._extract(cache=hosts)
+        return site_ids.setdefault(parsed.etld1, len(site_ids))
+
+    return [_map_unique(site_id, urls, errors, None) for urls in url_lists]
+
+
+@timed('is_third_party_many')
+def is_third_party_many(urls, top_level_urls, errors=RAISE, default=None, **kwargs):
+    """
+    Returns the ``is_third_party`` of each pair of ``urls`` and ``top_level_urls``.
+
+    Each distinct url and top level url is resolved to its eTLD+1 once, and
+    pairs are compared by interned eTLD+1 ids rather than by string.
+
+    Parameters
+    ----------
+    urls : iterable (string)
+        The urls of the requests.
+    top_level_urls : iterable (string)
+        The url of the page each request was made from.
+    errors : string, optional
+        If ``raise``, a malformed url raises as it would in
+        ``is_third_party``. If ``coerce``, the result for a pair with a
+        malformed url is ``default`` instead. Default is ``raise``.
+    default : any, optional
+        The result for pairs with a malformed url when ``errors`` is
+        ``coerce``. Default is ``None``.
+    extractor : tldextract::TLDExtract or SuffixTrie, optional
+        An (optional) tldextract::TLDExtract or SuffixTrie instance can be
+        passed with keyword `extractor`, otherwise the shared extractor is used.
+
+    Returns
+    -------
+    list (boolean)
+        Whether each request is third party, in input order.
+    """
+    url_ids, top_level_ids = _site_ids([urls, top_level_urls], errors=errors, **kwargs)
+    if len(url_ids) != len(top_level_ids):
+        raise ValueError('urls and top_level_urls must have the same length')
+    return [
+        default if url_id is None or top_level_id is None else url_id != top_level_id
+        for url_id, top_level_id in zip(url_ids, top_level_ids)
+    ]
+
+
+@timed('hostname_subparts_many')
+@_use_shared_extractor
+def hostname_subparts_many(
+        urls, include_ps=False, errors=RAISE, default=None, extractor=None):
+    """
+    Returns the ``hostname_subparts`` of each url in ``urls``.
+
+    Each distinct url is parsed once and each distinct host is passed to the
+    extractor once.
+
+    Parameters
+    ----------
+    urls : iterable (string)
+        The urls from which to extract the hostname parts
+    include_ps : boolean, optional
+        See ``hostname_subparts``.
+    errors : string, optional
+        If ``raise``, a malformed url raises as it would in
+        ``hostname_subparts``. If ``coerce``, its result is ``default``
+        instead. Default is ``raise``.
+    default : any, optional
+        The result for malformed urls when ``errors`` is ``coerce``.
+        Default is ``None``.
+    extractor : tldextract::TLDExtract or SuffixTrie, optional
+        An (optional) tldextract::TLDExtract or SuffixTrie instance can be
+        passed with keyword `extractor`, otherwise the shared extractor is used.
+
+    Returns
+    -------
+    list (list (string))
+        The hostname subparts of each url, in input order. Urls that share
+        a result share the same list object.
+    """
+    hosts = {}
+
+    def subparts(url):
+        parsed = parse_url(url, extractor=extractor)
+        return _subparts(parsed._extract(cache=hosts), include_ps)
+
+    return _map_unique(subparts, urls, errors, default)
+
+
+@timed('stem_url_many')
+@_defer_shared_extractor
+def stem_url_many(
+        urls,
+        return_unparsed=True,
+        scheme_default=HTTP,
+        parse_ws=True,
+        scheme=False,
+        path=True,
+        use_netloc=True,
+        errors=RAISE,
+        default=None,
+        extractor=None):
+    """
+    Returns the ``stem_url`` of each url in ``urls``.
+
+    Each distinct url is parsed once. The parameters are those of
+    ``stem_url``, plus:
+
+    Parameters
+    ----------
+    errors : string, optional
+        If ``raise``, a malformed url raises as it would in ``stem_url``.
+        If ``coerce``, its result is ``default`` instead.
+        Default is ``raise``.
+    default : any, optional
+        The result for malformed urls when ``errors`` is ``coerce``.
+        Default is ``None``.
+
+    Returns
+    -------
+    list (string)
+        The stemmed urls, in input order.
+    """
+    def stem(url):
+        return parse_url(url, scheme_default=scheme_default, extractor=extractor).stem(
+            return_unparsed=return_unparsed,
+            parse_ws=parse_ws,
+            scheme=scheme,
+            path=path,
+            use_netloc=use_netloc,
+        )
+
+    return _map_unique(stem, urls, errors, default)
+
+
+@timed('get_port_many')
+@_defer_shared_extractor
+def get_port_many(urls, errors=RAISE, default=None, extractor=None):
+    """
+    Returns the ``get_port`` of each url in ``urls``.
+
+    Parameters
+    ----------
+    urls : iterable (string)
+        The urls from where we want to get the port
+    errors : string, optional
+        If ``raise``, a malformed url, including one with an invalid port,
+        raises as it would in ``get_port``. If ``coerce``, its result is
+        ``default`` instead. Default is ``raise``.
+    default : any, optional
+        The result for malformed urls when ``errors`` is ``coerce``.
+        Default is ``None``.
+    extractor : tldextract::TLDExtract or SuffixTrie, optional
+        An (optional) tldextract::TLDExtract or SuffixTrie instance can be
+        passed with keyword `extractor`, otherwise the shared extractor is used.
+
+    Returns
+    -------
+    list (int)
+        The port of each url, or ``None`` if it has none, in input order.
+    """
+    def port(url):
+        return parse_url(url, extractor=extractor).port
+
+    return _map_unique(port, urls, errors, default)
+
+
+@timed('get_scheme_many')
+def get_scheme_many(urls, no_scheme=NO_SCHEME, errors=RAISE, default=None):
+    """
+    Returns the ``get_scheme`` of each url in ``urls``.
+
+    Parameters
+    ----------
+    urls : iterable (string)
+        The urls from where we want to get the scheme
+    no_scheme : any, optional
+        The value to use if no scheme is detected.
+        Default is ``no_scheme``.
+    errors : string, optional
+        If ``raise``, a malformed url raises as it would in ``get_scheme``.
+        If ``coerce``, its result is ``default`` instead.
+        Default is ``raise``.
+    default : any, optional
+        The result for malformed urls when ``errors`` is ``coerce``.
+        Default is ``None``.
+
+    Returns
+    -------
+    list (string)
+        The scheme of each url, in input order.
+    """
+    def scheme(url):
+        return get_scheme(url, no_scheme=no_scheme)
+
+    return _map_unique(scheme, urls, errors, default)
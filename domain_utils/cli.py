@@ -0,0 +1,257 @@
+"""
+Command line interface to domain_utils.
+
+Reads urls as a stream and writes derived columns, e.g.::
+
+    $ python -m domain_utils --fields etld1,port < urls.txt
+    $ domain_utils --csv url --fields etld1,stem crawl.csv > enriched.csv
+    $ domain_utils --jsonl url --workers 8 requests.jsonl > enriched.jsonl
+
+Plain lines are written back as tab separated url and field columns.
+CSV and JSONL records are written back with the field columns added.
+Input is processed in chunks, so memory use does not grow with input size.
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+from collections import deque
+from itertools import islice
+
+from .batch import (
+    COERCE,
+    RAISE,
+    get_etld1_many,
+    get_port_many,
+    get_scheme_many,
+    hostname_subparts_many,
+    stem_url_many,
+)
+
+FIELDS = ('etld1', 'stem', 'port', 'scheme', 'subparts')
+CHUNKSIZE = 10000
+
+
+def derive(urls, fields, scheme=False, strict=False):
+    """
+    Compute the requested ``fields`` for a list of urls.
+
+    Parameters
+    ----------
+    urls : list (string)
+        The urls to process.
+    fields : list (string)
+        Any of ``etld1``, ``stem``, ``port``, ``scheme`` and ``subparts``.
+    scheme : boolean, optional
+        Passed to ``stem_url`` for the ``stem`` field. Default is ``False``.
+    strict : boolean, optional
+        If ``True``, a malformed url raises. Otherwise its fields are
+        ``None``. Default is ``False``.
+
+    Returns
+    -------
+    list (tuple)
+        One tuple of field values per url.
+    """
+    errors = RAISE if strict else COERCE
+    columns = []
+    for field in fields:
+        if field == 'etld1':
+            columns.append(get_etld1_many(urls, errors=errors))
+        elif field == 'stem':
+            columns.append(stem_url_many(urls, scheme=scheme, errors=errors))
+        elif field == 'port':
+            columns.append(get_port_many(urls, errors=errors))
+        elif field == 'scheme':
+            columns.append(get_scheme_many(urls, errors=errors))
+        elif field == 'subparts':
+            columns.append(hostname_subparts_many(urls, errors=errors))
+        else:
+            raise ValueError(f'Unknown field {field!r}')
+    return list(zip(*columns)) if columns else [()] * len(urls)
+
+
+def _format(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return ','.join(value)
+    return str(value)
+
+
+class _Lines(object):
+
+    def __init__(self, args):
+        self.fields = args.fields
+
+    def records(self, stream):
+        for line in stream:
+            yield line.rstrip('\r\n')
+
+    def url(self, record):
+        return record
+
+    def writer(self, out):
+        def write(records, rows):
+            out.write(''.join(
+                '\t'.join([record] + [_format(value) for value in row]) + '\n'
+                for record, row in zip(records, rows)))
+        return write
+
+
+class _CSV(object):
+
+    def __init__(self, args):
+        self.column = args.csv
+        self.fields = args.fields
+        self.header = None
+
+    def records(self, stream):
+        reader = csv.reader(stream)
+        header = next(reader, None)
+        if header is None:
+            return
+        if self.header is None:
+            if self.column not in header:
+                raise SystemExit(f'CSV column {self.column!r} not found')
+            self.header = header
+            self.index = header.index(self.column)
+        elif header != self.header:
+            # Rows are written under the header of the first file
+            name = getattr(stream, 'name', '-')
+            raise SystemExit(f'CSV header of {name} does not match the first file')
+        yield from reader
+
+    def url(self, record):
+        return record[self.index] if len(record) > self.index else None
+
+    def writer(self, out):
+        writer = csv.writer(out)
+        written = []
+
+        def write(records, rows):
+            if not written:
+                writer.writerow(self.header + list(self.fields))
+                written.append(True)
+            writer.writerows(
+                record + [_format(value) for value in row]
+                for record, row in zip(records, rows))
+        return write
+
+
+class _JSONL(object):
+
+    def __init__(self, args):
+        self.field = args.jsonl
+        self.fields = args.fields
+
+    def records(self, stream):
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+    def url(self, record):
+        return record.get(self.field)
+
+    def writer(self, out):
+        def write(records, rows):
+            for record, row in zip(records, rows):
+                record.update(zip(self.fields, row))
+            out.write(''.join(json.dumps(record) + '\n' for record in records))
+        return write
+
+
+def _chunks(iterable, size):
+    iterable = iter(iterable)
+    while True:
+        chunk = list(islice(iterable, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _inputs(paths):
+    for path in paths or ['-']:
+        if path == '-':
+            # Read like the files, so quoted CSV fields keep their newlines
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+            try:
+                yield stream
+            finally:
+                # Leave stdin open
+                stream.detach()
+            continue
+        with open(path, encoding='utf-8', newline='') as stream:
+            yield stream
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog='domain_utils',
+        description='Derive eTLD+1s, stemmed urls, ports and schemes from urls.')
+    parser.add_argument(
+        'files', nargs='*', help='input files, default is stdin (or -)')
+    formats = parser.add_mutually_exclusive_group()
+    formats.add_argument('--csv', metavar='COLUMN', help='read CSV, with urls in COLUMN')
+    formats.add_argument('--jsonl', metavar='FIELD', help='read JSON lines, with urls in FIELD')
+    parser.add_argument(
+        '--fields', default='etld1',
+        help=f'comma separated fields to write, from {",".join(FIELDS)} (default: etld1)')
+    parser.add_argument(
+        '--scheme', action='store_true', help='keep the scheme in the stem field')
+    parser.add_argument(
+        '--strict', action='store_true',
+        help='fail on malformed urls instead of writing empty fields')
+    parser.add_argument(
+        '--workers', type=int, default=0,
+        help='number of worker processes, default is to run in this process')
+    parser.add_argument(
+        '--chunksize', type=int, default=CHUNKSIZE,
+        help=f'number of urls processed at a time (default: {CHUNKSIZE})')
+    args = parser.parse_args(argv)
+    args.fields = [field.strip() for field in args.fields.split(',') if field.strip()]
+    unknown = [field for field in args.fields if field not in FIELDS]
+    if unknown:
+        parser.error(f'unknown fields: {",".join(unknown)}')
+    return args
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    if args.csv:
+        fmt = _CSV(args)
+    elif args.jsonl:
+        fmt = _JSONL(args)
+    else:
+        fmt = _Lines(args)
+
+    records = (record for stream in _inputs(args.files) for record in fmt.records(stream))
+    out = sys.stdout
+    write = fmt.writer(out)
+    kwargs = dict(fields=args.fields, scheme=args.scheme, strict=args.strict)
+
+    try:
+        if args.workers > 0:
+            from .parallel import imap_chunks
+
+            # Records wait here until the results for their urls come back
+            in_flight = deque()
+
+            def urls():
+                for record in records:
+                    in_flight.append(record)
+                    yield fmt.url(record)
+
+            for rows in imap_chunks(
+                    derive, urls(), workers=args.workers, chunksize=args.chunksize, **kwargs):
+                write([in_flight.popleft() for _ in rows], rows)
+        else:
+            for chunk in _chunks(records, args.chunksize):
+                write(chunk, derive([fmt.url(record) for record in chunk], **kwargs))
+    finally:
+        out.flush()
+
+
+if __name__ == '__main__':
+    main()
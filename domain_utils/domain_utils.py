@@ -1,7 +1,32 @@
+import re
 from functools import wraps
-from ipaddress import ip_address
+from time import perf_counter
 from tldextract import TLDExtract
-from urllib.parse import urlparse
+from tldextract.remote import SCHEME_RE
+from tldextract.tldextract import ExtractResult
+from urllib.parse import ParseResult, scheme_chars, urlparse
+
+from . import instrumentation
+from .extractor import (  # noqa: F401
+    cache_clear,
+    cache_info,
+    get_extractor,
+    load_extractor,
+    preload,
+    set_cache_size,
+    set_extractor,
+    split_hostname,
+)
+from .hosts import (  # noqa: F401
+    ASCII, BRACKETED_IPV6, IPV4, IPV6, UNICODE, _canonical, classify_host, classify_hosts,
+    normalize_hostname,
+)
+from .suffix_trie import SuffixTrie, _hostname
+
+# ``classify_host`` and the canonical form of ``normalize_hostname`` without
+# their caches
+_classify_host = classify_host.__wrapped__
+_canonical_host = _canonical.__wrapped__
 
 NO_SCHEME = 'no_scheme'
 HTTP = 'http'
@@ -9,31 +34,106 @@ HTTPS = 'https'
 WS = 'ws'
 WSS = 'wss'
 
+# A url urlparse would split without any special casing: a lowercase
+# http(s) or ws(s) scheme, an ASCII netloc without IPv6 brackets, and no
+# tab or newline characters, which urlparse silently removes.
+_PLAIN_URL = re.compile(
+    r'(https?|wss?)://'
+    r'([^/?#\[\]\t\r\n\x80-\U0010ffff]*)'
+    r'((?:/[^?#\t\r\n]*)?)'
+    r'(?:\?([^#\t\r\n]*))?'
+    r'(?:#([^\t\r\n]*))?\Z'
+)
 
-def _load_and_update_extractor(function):
+
+def _use_shared_extractor(function):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        if 'extractor' not in kwargs:
+            return function(*args, extractor=get_extractor(), **kwargs)
+        else:
+            return function(*args, **kwargs)
+    return wrapper
+
+
+# Passed in place of the shared extractor by ``_defer_shared_extractor``
+_SHARED = object()
+
+
+def _defer_shared_extractor(function):
+    # Like ``_use_shared_extractor``, but the shared extractor is only
+    # loaded by ``_resolve_extractor`` once it is actually needed
     @wraps(function)
     def wrapper(*args, **kwargs):
         if 'extractor' not in kwargs:
-            if wrapper.extractor is None:
-                _extractor = TLDExtract(include_psl_private_domains=True)
-                _extractor.update()
-                wrapper.extractor = _extractor
-            return function(*args, extractor=wrapper.extractor, **kwargs)
+            return function(*args, extractor=_SHARED, **kwargs)
         else:
             return function(*args, **kwargs)
-    wrapper.extractor = None
     return wrapper
 
 
+def _resolve_extractor(extractor):
+    if extractor is _SHARED:
+        return get_extractor()
+    return extractor
+
+
 def is_ip_address(hostname):
     """
     Check if the given string is a valid IP address
     """
-    try:
-        ip_address(str(hostname))
-        return True
-    except ValueError:
-        return False
+    return classify_host(str(hostname)) in (IPV4, IPV6)
+
+
+def _bracketed_address(host):
+    # The address of a ``[IPv6 address]:port`` host, or ``None``
+    if host.startswith('[') and classify_host(host) == BRACKETED_IPV6:
+        return host[1:].partition(']')[0]
+    return None
+
+
+def _split_host(extractor, hostname, batch=False):
+    # IP addresses are their own domain, so the extractor is skipped.
+    # Batches look up each of their hosts once through their own dict, so
+    # they skip the process wide caches of ``classify_host`` and
+    # ``normalize_hostname``, which threads running batches would contend
+    # on. The bounded hostname cache stays shared by all threads.
+    if batch:
+        if _classify_host(hostname) in (IPV4, IPV6):
+            return ExtractResult('', hostname, '')
+        return split_hostname(extractor, hostname, _canonical_host(hostname))
+    if classify_host(hostname) in (IPV4, IPV6):
+        return ExtractResult('', hostname, '')
+    return split_hostname(extractor, hostname)
+
+
+def _split_plain_url(url):
+    # The ``urlparse`` result for the common ``http://host/path?query`` form
+    # by direct matching, or ``None`` for anything that needs urlparse
+    if not isinstance(url, str):
+        return None
+    match = _PLAIN_URL.match(url)
+    if match is None:
+        return None
+    scheme, netloc, path, query, fragment = match.groups()
+    if ';' in path and scheme in (HTTP, HTTPS):
+        # urlparse splits ``;params`` off the last path segment
+        return None
+    return ParseResult(scheme, netloc, path, '', query or '', fragment or '')
+
+
+def _legacy_scheme(url):
+    # The scheme urlsplit detected up to Python 3.8, which ``stem_url`` and
+    # ``get_port`` were written against: a scheme may start with a digit,
+    # e.g. ``127.0.0.1:80/path``, but ``host:port`` alone has no scheme.
+    # Returns the scheme and whether the url is ``host:port`` alone.
+    i = url.find(':')
+    if i > 0 and not url[:i].strip(scheme_chars):
+        rest = url[i + 1:]
+        if not rest or rest.strip('0123456789'):
+            return url[:i].lower(), False
+        return '', True
+    return '', False
 
 
 def _adapt_url_for_port_and_scheme(url, extractor):
@@ -44,28 +144,270 @@ def _adapt_url_for_port_and_scheme(url, extractor):
     # then it's probably a domain without an http.
 
     purl = urlparse(url)
-    _scheme = purl.scheme
+    _scheme, host_and_port = _legacy_scheme(url)
 
-    if '.' in str(_scheme):
+    if '.' in _scheme:
         # From the docs: "urlparse recognizes a netloc only
         # if it is properly introduced by ‘//’". So we
         # prepend to get results we expect.
-        if extractor(_scheme).suffix != '' or is_ip_address(_scheme):
+        if instrumentation.enabled:
+            instrumentation.count('adapt.scheme_lookup')
+        extractor = _resolve_extractor(extractor)
+        if split_hostname(extractor, _scheme).suffix != '' or is_ip_address(_scheme):
             url = '//{url}'.format(url=url)
-    elif url == purl.path:
+    elif host_and_port or (not _scheme and url == purl.path):
         # this is the case where the url has no scheme
         # and we are trying to access the root. Ex: localhost:5000
+        if instrumentation.enabled:
+            instrumentation.count('adapt.root_added')
         url = '//{url}/'.format(url=url)
     return url
 
 
-@_load_and_update_extractor
+def _check_extractor(extractor):
+    if not isinstance(extractor, (TLDExtract, SuffixTrie)):
+        raise ValueError(
+            "A tldextract::TLDExtract or domain_utils::SuffixTrie instance "
+            "must be passed using the `extractor` keyword argument.")
+
+
+def _join_etld1(parts):
+    if parts.suffix == '':
+        return parts.domain
+    else:
+        return f'{parts.domain}.{parts.suffix}'
+
+
+def _schemes_to_parse(parse_ws):
+    if parse_ws is True:
+        return (HTTP, HTTPS, WS, WSS)
+    return (HTTP, HTTPS)
+
+
+class ParsedURL(object):
+    """
+    A url decomposed once by ``parse_url``.
+
+    All attributes are derived from a single split of the url and, for
+    ``subdomain``, ``domain``, ``suffix`` and ``etld1``, a single extractor
+    lookup that is only made the first time one of them is read.
+
+    Attributes
+    ----------
+    url : string
+        The url as passed to ``parse_url``.
+    scheme : string
+        The scheme, or ``scheme_default`` if the url has none.
+    netloc : string
+        The netloc, including any port and user info.
+    hostname : string
+        The lowercased hostname, or ``None``.
+    port : int
+        The port, or ``None``. Reading it raises ``ValueError`` if the url
+        contains an invalid port.
+    path : string
+        The path.
+    subdomain, domain, suffix : string
+        The hostname split by the extractor. Empty strings for urls that are
+        not parsed, see ``stem_url``.
+    etld1 : string
+        The eTLD+1 / PS+1, as returned by ``get_etld1``.
+    """
+
+    __slots__ = ('url', '_adapted', '_split', '_extractor', '_parts')
+
+    def __init__(self, url, adapted, split, extractor):
+        self.url = url
+        self._adapted = adapted
+        self._split = split
+        self._extractor = extractor
+        self._parts = None
+
+    def __repr__(self):
+        return f'ParsedURL({self.url!r})'
+
+    @property
+    def scheme(self):
+        return self._split.scheme
+
+    @property
+    def netloc(self):
+        return self._split.netloc
+
+    @property
+    def hostname(self):
+        return self._split.hostname
+
+    @property
+    def port(self):
+        return self._split.port
+
+    @property
+    def path(self):
+        return self._split.path
+
+    def _lookup_hostname(self):
+        # The hostname passed to the extractor, or ``None`` for urls that
+        # are not parsed
+        split = self._split
+        if split.scheme not in _schemes_to_parse(True):
+            return None
+        netloc = split.netloc
+        if netloc:
+            host = netloc.rpartition('@')[2]
+            address = _bracketed_address(host)
+            if address is not None:
+                return address
+            # What the extractor would isolate from the stemmed url
+            return host.partition(':')[0].strip().rstrip('.')
+        # e.g. ``foo.com?a=1``, where the hostname is in the path
+        return _hostname(f'{split.scheme}://{split.path}')
+
+    def _extract(self, cache=None):
+        # ``cache`` is an optional dict of hostname to extractor split, on
+        # top of the shared cache in ``split_hostname``.
+        if self._parts is None:
+            self._extractor = _resolve_extractor(self._extractor)
+            _check_extractor(self._extractor)
+            hostname = self._lookup_hostname()
+            if hostname is None:
+                self._parts = ExtractResult('', '', '')
+                return self._parts
+            if cache is None:
+                self._parts = _split_host(self._extractor, hostname)
+            else:
+                parts = cache.get(hostname)
+                if parts is None:
+                    parts = cache[hostname] = _split_host(
+                        self._extractor, hostname, batch=True)
+                    if instrumentation.enabled:
+                        instrumentation.count('batch_cache.misses')
+                elif instrumentation.enabled:
+                    instrumentation.count('batch_cache.hits')
+                self._parts = parts
+        return self._parts
+
+    @property
+    def subdomain(self):
+        return self._extract().subdomain
+
+    @property
+    def domain(self):
+        return self._extract().domain
+
+    @property
+    def suffix(self):
+        return self._extract().suffix
+
+    @property
+    def etld1(self):
+        return _join_etld1(self._extract())
+
+    def stem(
+            self,
+            return_unparsed=True,
+            parse_ws=True,
+            scheme=False,
+            path=True,
+            use_netloc=True,
+            normalize=None):
+        """
+        Returns the url stripped to ``(scheme)?+(netloc|hostname)+(path)?``.
+
+        The parameters are those of ``stem_url``.
+        """
+        split = self._split
+        _scheme = split.scheme
+
+        # Will we parse
+        if _scheme not in _schemes_to_parse(parse_ws):
+            if instrumentation.enabled:
+                instrumentation.count('stem_url.unparsed')
+            if return_unparsed is True:
+                return self._adapted
+            return ''
+
+        scheme_out = ''
+        loc_out = ''
+        path_out = ''
+
+        if scheme is True:
+            scheme_out = '{scheme}://'.format(scheme=_scheme)
+
+        if path is True:
+            path_out = split.path
+
+        if use_netloc is True:
+            loc_out = split.netloc
+        else:
+            loc_out = split.hostname
+
+        if normalize is not None and loc_out:
+            loc_out = _normalize_netloc(loc_out, normalize)
+
+        return '{scheme_out}{loc_out}{path_out}'.format(
+            scheme_out=scheme_out,
+            loc_out=loc_out,
+            path_out=path_out,
+        )
+
+
+def _normalize_netloc(netloc, form):
+    userinfo, at, host_and_port = netloc.rpartition('@')
+    if host_and_port.startswith('['):
+        return netloc
+    host, colon, port = host_and_port.partition(':')
+    return f'{userinfo}{at}{normalize_hostname(host, form)}{colon}{port}'
+
+
+@_defer_shared_extractor
+def parse_url(url, scheme_default=HTTP, extractor=None):
+    """
+    Decompose a url once into a ``ParsedURL`` record.
+
+    ``stem_url``, ``get_etld1``, ``get_port`` and ``hostname_subparts`` are
+    views over this record. Use it directly when several of them are needed
+    for the same url, so the url is only parsed once.
+
+    Urls of the usual ``http(s)://`` and ``ws(s)://`` form are split without
+    ``urlparse``. The extractor is only loaded once the hostname needs to be
+    split, or to tell whether a url without a scheme starts with a hostname.
+
+    Parameters
+    ----------
+    url : string
+        The URL to be parsed
+    scheme_default : string, optional
+        The scheme to assume for urls without one. Default is ``http``.
+    extractor : tldextract::TLDExtract or SuffixTrie, optional
+        An (optional) tldextract::TLDExtract or SuffixTrie instance can be
+        passed with keyword `extractor`, otherwise the shared extractor is used.
+
+    Returns
+    -------
+    ParsedURL
+    """
+    start = perf_counter() if instrumentation.enabled else None
+    try:
+        split = _split_plain_url(url)
+        if split is not None:
+            if instrumentation.enabled:
+                instrumentation.count('parse_url.plain')
+            return ParsedURL(url, url, split, extractor)
+        if instrumentation.enabled:
+            instrumentation.count('parse_url.heuristic')
+        adapted = _adapt_url_for_port_and_scheme(url, extractor)
+        split = urlparse(adapted, scheme=scheme_default or '')
+        return ParsedURL(url, adapted, split, extractor)
+    finally:
+        if start is not None:
+            instrumentation.add_time('parse_url', perf_counter() - start)
+
+
+@_use_shared_extractor
 def _get_tld_extract(url, **kwargs):
     extractor = kwargs.get('extractor')
-    if not isinstance(extractor, TLDExtract):
-        raise ValueError(
-            "A tldextract::TLDExtract instance must be passed using the "
-            "`extractor` keyword argument.")
+    _check_extractor(extractor)
 
     scheme = kwargs.get('scheme', True)
     path = kwargs.get('path', True)
@@ -81,7 +423,9 @@ def _get_tld_extract(url, **kwargs):
             use_netloc=use_netloc,
             extractor=extractor,
     )
-    return extractor(stemmed)
+    address = _bracketed_address(
+        SCHEME_RE.sub('', stemmed).partition('/')[0].rpartition('@')[2])
+    return _split_host(extractor, _hostname(stemmed) if address is None else address)
 
 
 def get_etld1(url, **kwargs):
@@ -92,9 +436,14 @@ def get_etld1(url, **kwargs):
     ----------
     url : string
         The url from which to extract the eTLD+1 / PS+1
-    extractor : tldextract::TLDExtract, optional
-        An (optional) tldextract::TLDExtract instance can be passed with
-        keyword `extractor`, otherwise we create and update one automatically.
+    extractor : tldextract::TLDExtract or SuffixTrie, optional
+        An (optional) tldextract::TLDExtract or SuffixTrie instance can be
+        passed with keyword `extractor`, otherwise the shared extractor is used.
+    normalize : string, optional
+        ``unicode`` or ``ascii`` to return the eTLD+1 lowercased, without a
+        trailing dot and with internationalized labels in that form, see
+        ``normalize_hostname``. Default is ``None``, to keep the spelling of
+        the url.
     kwargs:
         The method preprocesses the url with ``stem_url`` before
         extracting the domain. You can pass in ``stem_url`` parameters
@@ -107,11 +456,19 @@ def get_etld1(url, **kwargs):
         an empty string will be returned. Returns an IP address if the hostname
         of the url is a valid IP address.
     """
-    parsed = _get_tld_extract(url, **kwargs)
-    if parsed.suffix == '':
-        return parsed.domain
-    else:
-        return f'{parsed.domain}.{parsed.suffix}'
+    start = perf_counter() if instrumentation.enabled else None
+    try:
+        normalize = kwargs.pop('normalize', None)
+        if kwargs.keys() <= {'extractor'}:
+            etld1 = parse_url(url, **kwargs).etld1
+        else:
+            etld1 = _join_etld1(_get_tld_extract(url, **kwargs))
+        if normalize is None:
+            return etld1
+        return normalize_hostname(etld1, normalize)
+    finally:
+        if start is not None:
+            instrumentation.add_time('get_etld1', perf_counter() - start)
 
 
 def get_ps_plus_1(url, **kwargs):
@@ -119,33 +476,8 @@ def get_ps_plus_1(url, **kwargs):
     return get_etld1(url, **kwargs)
 
 
-@_load_and_update_extractor
-def hostname_subparts(url, include_ps=False, **kwargs):
-    """
-    Returns a list of slices of a url's hostname down to the eTLD+1 / PS+1.
-
-
-    Parameters
-    ----------
-    url : string
-        The url from which to extract the hostname parts
-    include_ps : boolean, optional
-        If ``include_ps`` is set, the hostname slices will include the public suffix
-        For example, ``http://a.b.c.d.com/path?query#frag`` would yield:
-
-        * ``["a.b.c.d.com", "b.c.d.com", "c.d.com", "d.com"]`` if ``include_ps == False``
-        * ``["a.b.c.d.com", "b.c.d.com", "c.d.com", "d.com", "com"]`` if ``include_ps == True``
-    kwargs:
-        Additionally, all kwargs for ``get_etld1`` can be passed to this
-        method.
-
-    Returns
-    -------
-    list (string)
-        List of slices of of a url's hostname down to the eTLD+1 / PS+1.
-    """
-    ext = _get_tld_extract(url, **kwargs)
-    etld1 = get_etld1(url, **kwargs)
+def _subparts(ext, include_ps):
+    etld1 = _join_etld1(ext)
 
     # If an IP address, just return a single item list with the IP
     if is_ip_address(ext.domain):
@@ -180,7 +512,83 @@ def hostname_subparts(url, include_ps=False, **kwargs):
     return subparts
 
 
-@_load_and_update_extractor
+@_use_shared_extractor
+def is_third_party(url, top_level_url, extractor=None):
+    """
+    Whether a request to ``url`` is third party on the page ``top_level_url``.
+
+    A request is third party if the two urls have different eTLD+1s, as
+    returned by ``get_etld1``. Like there, IP hosts are their own eTLD+1 and
+    urls without one, e.g. ``about:blank``, have an empty eTLD+1.
+
+    Parameters
+    ----------
+    url : string
+        The url of the request.
+    top_level_url : string
+        The url of the page the request was made from.
+    extractor : tldextract::TLDExtract or SuffixTrie, optional
+        An (optional) tldextract::TLDExtract or SuffixTrie instance can be
+        passed with keyword `extractor`, otherwise the shared extractor is used.
+
+    Returns
+    -------
+    boolean
+    """
+    start = perf_counter() if instrumentation.enabled else None
+    try:
+        return (parse_url(url, extractor=extractor).etld1
+                != parse_url(top_level_url, extractor=extractor).etld1)
+    finally:
+        if start is not None:
+            instrumentation.add_time('is_third_party', perf_counter() - start)
+
+
+@_use_shared_extractor
+def hostname_subparts(url, include_ps=False, **kwargs):
+    """
+    Returns a list of slices of a url's hostname down to the eTLD+1 / PS+1.
+
+
+    Parameters
+    ----------
+    url : string
+        The url from which to extract the hostname parts
+    include_ps : boolean, optional
+        If ``include_ps`` is set, the hostname slices will include the public suffix
+        For example, ``http://a.b.c.d.com/path?query#frag`` would yield:
+
+        * ``["a.b.c.d.com", "b.c.d.com", "c.d.com", "d.com"]`` if ``include_ps == False``
+        * ``["a.b.c.d.com", "b.c.d.com", "c.d.com", "d.com", "com"]`` if ``include_ps == True``
+    normalize : string, optional
+        ``unicode`` or ``ascii`` to normalize each slice, see ``get_etld1``.
+        Default is ``None``.
+    kwargs:
+        Additionally, all kwargs for ``get_etld1`` can be passed to this
+        method.
+
+    Returns
+    -------
+    list (string)
+        List of slices of of a url's hostname down to the eTLD+1 / PS+1.
+    """
+    start = perf_counter() if instrumentation.enabled else None
+    try:
+        normalize = kwargs.pop('normalize', None)
+        if kwargs.keys() <= {'extractor'}:
+            ext = parse_url(url, **kwargs)._extract()
+        else:
+            ext = _get_tld_extract(url, **kwargs)
+        subparts = _subparts(ext, include_ps)
+        if normalize is None:
+            return subparts
+        return [normalize_hostname(subpart, normalize) for subpart in subparts]
+    finally:
+        if start is not None:
+            instrumentation.add_time('hostname_subparts', perf_counter() - start)
+
+
+@_defer_shared_extractor
 def stem_url(
         url,
         return_unparsed=True,
@@ -189,6 +597,7 @@ def stem_url(
         scheme=False,
         path=True,
         use_netloc=True,
+        normalize=None,
         extractor=None):
     """
     Returns a url stripped to just the beginning and end.
@@ -240,9 +649,14 @@ def stem_url(
         If ``False`` urlparse's host will be returned. Using netloc means
         that a port is included, for example, if it was in the path.
         Default is ``True``.
-    extractor : tldextract::TLDExtract, optional
-        An (optional) tldextract::TLDExtract instance can be passed with
-        keyword `extractor`, otherwise we create and update one automatically.
+    normalize : string, optional
+        ``unicode`` or ``ascii`` to lowercase the hostname of parsed urls,
+        strip its trailing dot and convert its internationalized labels to
+        that form, see ``normalize_hostname``. Default is ``None``, to keep
+        the hostname as it is.
+    extractor : tldextract::TLDExtract or SuffixTrie, optional
+        An (optional) tldextract::TLDExtract or SuffixTrie instance can be
+        passed with keyword `extractor`, otherwise the shared extractor is used.
 
     Returns
     -------
@@ -250,41 +664,19 @@ def stem_url(
         Returns a url stripped to (scheme)?+(netloc|hostname)+(path)?.
         Returns empty string if appropriate.
     """
-    url = _adapt_url_for_port_and_scheme(url, extractor)
-
-    purl = urlparse(url, scheme=scheme_default)
-    _scheme = purl.scheme
-
-    # Will we parse
-    schemes_to_parse = [HTTP, HTTPS]
-    if parse_ws is True:
-        schemes_to_parse += [WS, WSS]
-    if _scheme not in schemes_to_parse:
-        if return_unparsed is True:
-            return url
-        return ''
-
-    scheme_out = ''
-    loc_out = ''
-    path_out = ''
-
-    if scheme is True:
-        if _scheme in schemes_to_parse:
-            scheme_out = '{scheme}://'.format(scheme=_scheme)
-
-    if path is True:
-        path_out = purl.path
-
-    if use_netloc is True:
-        loc_out = purl.netloc
-    else:
-        loc_out = purl.hostname
-
-    return '{scheme_out}{loc_out}{path_out}'.format(
-        scheme_out=scheme_out,
-        loc_out=loc_out,
-        path_out=path_out,
-    )
+    start = perf_counter() if instrumentation.enabled else None
+    try:
+        return parse_url(url, scheme_default=scheme_default, extractor=extractor).stem(
+            return_unparsed=return_unparsed,
+            parse_ws=parse_ws,
+            scheme=scheme,
+            path=path,
+            use_netloc=use_netloc,
+            normalize=normalize,
+        )
+    finally:
+        if start is not None:
+            instrumentation.add_time('stem_url', perf_counter() - start)
 
 
 def get_stripped_url(url, **kwargs):
@@ -310,16 +702,21 @@ def get_scheme(url, no_scheme=NO_SCHEME):
         Returns the scheme with a default of ``no_scheme`` if no scheme
         is provided
     """
+    start = perf_counter() if instrumentation.enabled else None
+    try:
+        split = _split_plain_url(url)
+        scheme = (split or urlparse(url)).scheme
 
-    scheme = urlparse(url).scheme
-
-    if scheme:
-        return scheme
-    else:
-        return no_scheme
+        if scheme:
+            return scheme
+        else:
+            return no_scheme
+    finally:
+        if start is not None:
+            instrumentation.add_time('get_scheme', perf_counter() - start)
 
 
-@_load_and_update_extractor
+@_defer_shared_extractor
 def get_port(url, extractor=None):
     """
     Given a url, extract from it the port if present.
@@ -328,15 +725,18 @@ def get_port(url, extractor=None):
     ----------
     url: string
         The URL from where we want to get the port
-    extractor : tldextract::TLDExtract, optional
-        An (optional) tldextract::TLDExtract instance can be passed with
-        keyword `extractor`, otherwise we create and update one automatically.
+    extractor : tldextract::TLDExtract or SuffixTrie, optional
+        An (optional) tldextract::TLDExtract or SuffixTrie instance can be
+        passed with keyword `extractor`, otherwise the shared extractor is used.
 
     Returns
     ----------
     int
         Returns port in the url. If port not found, returns ``None``.
     """
-
-    url = _adapt_url_for_port_and_scheme(url, extractor)
-    return urlparse(url).port
+    start = perf_counter() if instrumentation.enabled else None
+    try:
+        return parse_url(url, extractor=extractor).port
+    finally:
+        if start is not None:
+            instrumentation.add_time('get_port', perf_counter() - start)
@@ -0,0 +1,267 @@
+import os
+import threading
+from functools import lru_cache, partial
+from pathlib import Path
+from time import perf_counter
+
+from tldextract import TLDExtract
+from tldextract.tldextract import PUBLIC_SUFFIX_LIST_URLS, ExtractResult
+
+from . import instrumentation
+from .hosts import _canonical
+from .psl_binary import MappedSuffixTrie, is_compiled_suffix_list
+
+PSL_SNAPSHOT = os.path.join(os.path.dirname(__file__), 'public_suffix_list.dat')
+
+DEFAULT_CACHE_SIZE = 2 ** 16
+
+
+class _Shared(object):
+    # The shared extractor and the hostname cache of its splits. They are
+    # only ever replaced together, by assigning a new ``_shared``, so a
+    # reader sees either the old pair or the new one without locking, and
+    # splits made with an old list never land in the new list's cache.
+    __slots__ = ('extractor', 'split')
+
+    def __init__(self, extractor, maxsize):
+        self.extractor = extractor
+
+        def split(hostname):
+            return extractor(hostname)
+
+        self.split = lru_cache(maxsize=maxsize)(split)
+
+
+_cache_size = DEFAULT_CACHE_SIZE
+_shared = _Shared(None, _cache_size)
+# Held while the bundled list is loaded, so concurrent first calls load it once
+_load_lock = threading.Lock()
+
+
+def _remote_extractor(suffix_list_urls):
+    return TLDExtract(
+        cache_file=False,
+        suffix_list_urls=suffix_list_urls,
+        fallback_to_snapshot=False,
+        include_psl_private_domains=True,
+    )
+
+
+def _local_extractor(suffix_list_file=PSL_SNAPSHOT):
+    return _remote_extractor([Path(suffix_list_file).resolve().as_uri()])
+
+
+def _load(build):
+    # Builds an extractor and reads its suffix list now rather than on the
+    # first lookup, timing both as ``extractor.load``
+    start = perf_counter()
+    extractor = build()
+    if isinstance(extractor, TLDExtract):
+        # Accessing the suffix set forces the list to be read and parsed
+        extractor.tlds
+    if instrumentation.enabled:
+        instrumentation.add_time('extractor.load', perf_counter() - start)
+    return extractor
+
+
+def get_extractor():
+    """
+    Returns the process-wide extractor used by all domain_utils functions.
+
+    The extractor is built from the bundled Public Suffix List snapshot the
+    first time it is needed. No network access is made. Threads calling this
+    at the same time wait for a single load.
+
+    Returns
+    -------
+    tldextract::TLDExtract
+        The shared extractor instance.
+    """
+    global _shared
+    extractor = _shared.extractor
+    if extractor is None:
+        with _load_lock:
+            extractor = _shared.extractor
+            if extractor is None:
+                extractor = _load(_local_extractor)
+                _shared = _Shared(extractor, _cache_size)
+    return extractor
+
+
+def load_extractor(source=None):
+    """
+    Load a new extractor without making it the shared one.
+
+    The list is read and parsed before this returns, so it can run in a
+    background thread and the result be passed to ``set_extractor``.
+
+    Parameters
+    ----------
+    source : string, optional
+        A url to fetch a Public Suffix List from, a path to a list, or a path
+        to a file written by ``compile_suffix_list``. Default is to fetch the
+        latest list from publicsuffix.org.
+
+    Returns
+    -------
+    tldextract::TLDExtract or SuffixTrie
+        The loaded extractor.
+    """
+    if source is None:
+        return _load(partial(_remote_extractor, PUBLIC_SUFFIX_LIST_URLS))
+    if '://' in source:
+        return _load(partial(_remote_extractor, [source]))
+    if is_compiled_suffix_list(source):
+        return _load(partial(MappedSuffixTrie, source))
+    return _load(partial(_local_extractor, source))
+
+
+def set_extractor(extractor):
+    """
+    Replace the process-wide extractor.
+
+    The hostname cache is replaced along with it. Calls already running
+    finish with the extractor they started with, calls made afterwards use
+    the new one and never see splits cached from the old one.
+
+    Parameters
+    ----------
+    extractor : tldextract::TLDExtract or SuffixTrie
+        The extractor all functions should use when no ``extractor``
+        keyword argument is passed. Pass ``None`` to fall back to the
+        bundled Public Suffix List snapshot on next use.
+    """
+    global _shared
+    _shared = _Shared(extractor, _cache_size)
+
+
+def _restore(hostname, parts):
+    # Maps the split of the canonical form of ``hostname`` back onto the
+    # labels of ``hostname``, which has as many
+    labels = hostname.strip().rstrip('.').split('.')
+    suffix_index = len(labels) - (parts.suffix.count('.') + 1 if parts.suffix else 0)
+    if suffix_index == 0:
+        return ExtractResult('', '', '.'.join(labels))
+    return ExtractResult(
+        '.'.join(labels[:suffix_index - 1]),
+        labels[suffix_index - 1],
+        '.'.join(labels[suffix_index:]))
+
+
+def split_hostname(extractor, hostname, canonical=None):
+    """
+    Split a bare hostname into subdomain, domain and suffix.
+
+    Lookups with the shared extractor go through a bounded LRU cache keyed
+    on the canonical form of the hostname, see ``normalize_hostname``, so
+    ``WWW.Example.COM.`` and ``www.example.com`` share one entry and one
+    lookup. The parts keep the spelling of ``hostname``. See ``cache_info``.
+
+    Parameters
+    ----------
+    extractor : tldextract::TLDExtract or SuffixTrie
+        The extractor to split ``hostname`` with.
+    hostname : string
+        A hostname without scheme, user info, port or path.
+    canonical : string, optional
+        ``normalize_hostname(hostname)``, if the caller has it already.
+
+    Returns
+    -------
+    tldextract::ExtractResult
+    """
+    shared = _shared
+    if extractor is shared.extractor:
+        if canonical is None:
+            canonical = _canonical(hostname)
+        parts = shared.split(canonical)
+        if canonical == hostname:
+            return parts
+        if '.' in parts.domain:
+            # An IP address, which is returned whole as the domain
+            return shared.split(hostname)
+        return _restore(hostname, parts)
+    return extractor(hostname)
+
+
+def cache_info():
+    """
+    Report statistics of the hostname cache in front of the shared extractor.
+
+    Returns
+    -------
+    functools._CacheInfo
+        A named tuple of ``hits``, ``misses``, ``maxsize`` and ``currsize``.
+    """
+    return _shared.split.cache_info()
+
+
+def cache_clear():
+    """
+    Empty the hostname cache in front of the shared extractor.
+
+    This happens automatically when the shared extractor is replaced, but
+    must be called after changing the rules of the shared extractor in place.
+    """
+    _shared.split.cache_clear()
+
+
+def set_cache_size(maxsize=DEFAULT_CACHE_SIZE):
+    """
+    Resize the hostname cache in front of the shared extractor.
+
+    The cache is emptied and its statistics are reset.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        The number of hostnames to keep, evicting the least recently used.
+        ``0`` disables caching and ``None`` lets the cache grow without
+        bound. Default is 65536.
+    """
+    global _cache_size, _shared
+    _cache_size = maxsize
+    _shared = _Shared(_shared.extractor, maxsize)
+
+
+def preload(suffix_list_file=None, update=False):
+    """
+    Load and parse the Public Suffix List now rather than on first use.
+
+    Call this before forking worker processes so that children inherit
+    a ready extractor instead of each parsing the list themselves.
+
+    Parameters
+    ----------
+    suffix_list_file : string, optional
+        Path to a pinned Public Suffix List file to use instead of the
+        snapshot bundled with domain_utils. It can also be a file written
+        by ``compile_suffix_list``, which is memory-mapped rather than
+        parsed, so loading it is nearly free.
+    update : boolean, optional
+        If ``True``, fetch the latest Public Suffix List from publicsuffix.org,
+        falling back to ``suffix_list_file`` or the bundled snapshot if it
+        can not be reached. Default is ``False``, in which case the network
+        is never touched.
+
+    Returns
+    -------
+    tldextract::TLDExtract or SuffixTrie
+        The loaded shared extractor.
+    """
+    local_file = suffix_list_file or PSL_SNAPSHOT
+    if update:
+        extractor = _load(partial(
+            _remote_extractor,
+            PUBLIC_SUFFIX_LIST_URLS + (Path(local_file).resolve().as_uri(),),
+        ))
+    elif suffix_list_file is not None:
+        extractor = load_extractor(suffix_list_file)
+    else:
+        # The shared extractor is kept, along with its warm hostname cache
+        extractor = get_extractor()
+        if isinstance(extractor, TLDExtract):
+            extractor.tlds
+        return extractor
+    set_extractor(extractor)
+    return extractor
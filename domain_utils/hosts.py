@@ -0,0 +1,164 @@
+"""
+Classify url hosts as IP addresses, localhost or DNS names, and normalize
+hostnames to a canonical form.
+
+Most hosts are DNS names, which are told apart from IP addresses by their
+characters alone, so ``ipaddress`` is only consulted, and only fails, for
+hosts that could be an address. Results are cached.
+"""
+from functools import lru_cache
+from ipaddress import ip_address
+
+import idna
+
+from . import instrumentation
+
+IPV4 = 'ipv4'
+IPV6 = 'ipv6'
+BRACKETED_IPV6 = 'bracketed_ipv6'
+LOCALHOST = 'localhost'
+DNS = 'dns'
+
+# Forms of internationalized labels in normalized hostnames
+UNICODE = 'unicode'
+ASCII = 'ascii'
+
+CACHE_SIZE = 2 ** 14
+
+
+def _ip_version(text):
+    try:
+        return ip_address(text).version
+    except ValueError:
+        if instrumentation.enabled:
+            instrumentation.count('ip_address.value_error')
+        return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def classify_host(host):
+    """
+    Classify a host.
+
+    Parameters
+    ----------
+    host : string
+        A host as found in a url, e.g. ``example.com``, ``127.0.0.1``,
+        ``::1`` or ``[::1]:8080``.
+
+    Returns
+    -------
+    string
+        ``ipv4``, ``ipv6``, ``bracketed_ipv6`` for an IPv6 address in
+        brackets, optionally followed by a port, ``localhost`` for
+        ``localhost`` and its subdomains, and ``dns`` for anything else.
+        ``None`` for an empty host.
+    """
+    if not host:
+        return None
+    if host[0] == '[':
+        address, bracket, rest = host[1:].partition(']')
+        if bracket and (not rest or rest[0] == ':') and _ip_version(address) == 6:
+            return BRACKETED_IPV6
+    elif ':' in host:
+        # Only IPv6 addresses have colons, DNS names with a port aside
+        if _ip_version(host) == 6:
+            return IPV6
+    elif host[-1].isdigit():
+        # No top level domain is numeric, so only these can be IPv4
+        if _ip_version(host) == 4:
+            return IPV4
+    lowered = host.lower().rstrip('.')
+    if lowered == 'localhost' or lowered.endswith('.localhost'):
+        return LOCALHOST
+    return DNS
+
+
+def classify_hosts(hosts):
+    """
+    Classify each host in ``hosts``. See ``classify_host``.
+
+    Returns
+    -------
+    list (string)
+        The class of each host, in input order.
+    """
+    return [classify_host(host) for host in hosts]
+
+
+def _to_unicode(label):
+    # Decodes punycode as the extractors do when matching suffixes
+    if label.startswith('xn--'):
+        try:
+            return idna.decode(label.encode('ascii')).lower()
+        except UnicodeError:
+            pass
+    return label
+
+
+def _is_ascii(text):
+    # ``str.isascii`` is Python 3.7+
+    try:
+        text.encode('ascii')
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _to_ascii(label):
+    if not _is_ascii(label):
+        try:
+            return idna.encode(label).decode('ascii')
+        except UnicodeError:
+            pass
+    return label
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _canonical(hostname):
+    # The lowercased Unicode form of a bare hostname, without surrounding
+    # whitespace and trailing dots. Every label maps to one label, and the
+    # extractors split a hostname and its canonical form at the same label.
+    # Anything with url delimiters is not a bare hostname and is returned as
+    # it is.
+    if any(c in hostname for c in ':/@?#'):
+        return hostname
+    host = hostname.strip().rstrip('.').lower()
+    if 'xn--' in host:
+        host = '.'.join([_to_unicode(label) for label in host.split('.')])
+    return host
+
+
+def normalize_hostname(hostname, form=UNICODE):
+    """
+    Normalize a hostname, so equivalent spellings compare equal.
+
+    The hostname is lowercased and stripped of trailing dots, and its
+    internationalized labels are converted to one form. ``WWW.Example.COM.``
+    becomes ``www.example.com``, and ``xn--bcher-kva.de`` and ``BÜCHER.de``
+    both become ``bücher.de``. Labels that are not valid IDNA are kept as
+    they are. Results are cached.
+
+    Parameters
+    ----------
+    hostname : string
+        A hostname without scheme, user info, port or path.
+    form : string, optional
+        ``unicode`` to decode punycode labels, ``ascii`` to encode Unicode
+        labels as punycode, or ``None`` to only lowercase and strip trailing
+        dots. Default is ``unicode``.
+
+    Returns
+    -------
+    string
+    """
+    if form == UNICODE:
+        return _canonical(hostname)
+    if form == ASCII:
+        host = _canonical(hostname)
+        if _is_ascii(host):
+            return host
+        return '.'.join([_to_ascii(label) for label in host.split('.')])
+    if form is None:
+        return hostname.strip().rstrip('.').lower()
+    raise ValueError(f"form must be '{UNICODE}', '{ASCII}' or None, not {form!r}")
@@ -0,0 +1,130 @@
+"""
+Opt-in counters and timers for the domain_utils hot paths.
+
+Instrumentation is off by default, when it costs one flag check per call.
+The per-url functions check it inline, so they make no extra function call;
+the batch functions are wrapped with ``timed``::
+
+    from domain_utils import instrumentation
+
+    instrumentation.enable()
+    ...
+    metrics = instrumentation.snapshot()
+
+``snapshot`` returns plain dicts of numbers, ready to export:
+
+* ``calls`` and ``seconds``: the number of calls of each public function and
+  their cumulative wall time. Times are inclusive, so a ``get_etld1`` call
+  also counts towards ``parse_url``. ``extractor.load`` is the time taken to
+  read and parse the Public Suffix List.
+* ``counters``: how often each branch was taken, e.g. ``parse_url.plain``
+  for urls split without ``urlparse`` against ``parse_url.heuristic``,
+  ``adapt.scheme_lookup`` for scheme-less urls checked with the extractor,
+  ``ip_address.value_error`` and ``stem_url.unparsed``.
+* ``cache``: the statistics of the shared hostname cache, see ``cache_info``,
+  and its ``hit_rate``.
+
+Counts are updated under a lock, so they are exact when several threads
+call domain_utils at once. The lock is only taken while enabled.
+"""
+import threading
+from collections import Counter
+from functools import wraps
+from time import perf_counter
+
+# Read on every instrumented call, only ever set by enable and disable
+enabled = False
+
+_calls = Counter()
+_seconds = Counter()
+_counters = Counter()
+_lock = threading.Lock()
+
+
+def enable():
+    """Start counting. Counts gathered before a ``disable`` are kept."""
+    global enabled
+    enabled = True
+
+
+def disable():
+    """Stop counting, keeping the counts gathered so far."""
+    global enabled
+    enabled = False
+
+
+def reset():
+    """Zero all counts and timers. The hostname cache statistics are kept."""
+    with _lock:
+        _calls.clear()
+        _seconds.clear()
+        _counters.clear()
+
+
+def count(name, n=1):
+    """Add ``n`` to counter ``name``. Callers check ``enabled`` first."""
+    with _lock:
+        _counters[name] += n
+
+
+def add_time(name, seconds):
+    """Record one call of ``name`` that took ``seconds``."""
+    with _lock:
+        _calls[name] += 1
+        _seconds[name] += seconds
+
+
+def timed(name):
+    """
+    Decorate a function to record its calls and time under ``name``.
+
+    Parameters
+    ----------
+    name : string
+        The key in the ``calls`` and ``seconds`` snapshot dicts.
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                add_time(name, perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    """
+    Return the current counts and timers.
+
+    Returns
+    -------
+    dict
+        ``enabled`` (boolean), ``calls`` (dict of int), ``seconds`` (dict of
+        float), ``counters`` (dict of int) and ``cache``, a dict of the
+        shared hostname caches' ``hits``, ``misses``, ``maxsize``,
+        ``currsize`` and ``hit_rate``, which is ``None`` before any lookup.
+    """
+    from .extractor import cache_info
+
+    info = cache_info()
+    lookups = info.hits + info.misses
+    with _lock:
+        calls, seconds, counters = dict(_calls), dict(_seconds), dict(_counters)
+    return {
+        'enabled': enabled,
+        'calls': calls,
+        'seconds': seconds,
+        'counters': counters,
+        'cache': {
+            'hits': info.hits,
+            'misses': info.misses,
+            'maxsize': info.maxsize,
+            'currsize': info.currsize,
+            'hit_rate': info.hits / lookups if lookups else None,
+        },
+    }
@@ -0,0 +1,222 @@
+"""
+Match request hosts against large domain lists, such as tracker blocklists.
+
+A listed domain also matches all of its subdomains, down to the eTLD+1, the
+same candidates ``hostname_subparts`` returns::
+
+    matcher = DomainMatcher.from_file('trackers.txt')
+    matcher.match('https://www.google-analytics.com/collect')
+    # 'google-analytics.com'
+"""
+import sys
+
+from .batch import RAISE, _map_unique
+from .domain_utils import _bracketed_address, _split_host, get_extractor, is_ip_address, parse_url
+from .hosts import normalize_hostname
+
+_ENTRY = None
+
+
+class _Node(dict):
+    # An inner trie node, keyed on labels, with the value of the domain
+    # ending at it, if it is listed, under the ``None`` key. Leaves are
+    # stored as their bare values, so most listed domains cost no dict.
+    __slots__ = ()
+
+
+class DomainMatcher(object):
+    """
+    A set of domains matched against hosts and their parent domains.
+
+    The domains are stored in a trie of reversed hostname labels, so a
+    lookup walks one node per label of the host rather than joining and
+    probing every candidate parent domain.
+
+    Parameters
+    ----------
+    domains : iterable (string), optional
+        The domains to match, e.g. ``tracker.com``. Leading ``*.`` and
+        ``.`` and trailing dots are ignored. Domains and hosts are compared
+        as ``normalize_hostname`` spells them, so ``bücher.de`` also matches
+        ``www.xn--bcher-kva.de``.
+    include_ps : boolean, optional
+        If ``True``, a listed public suffix, e.g. ``cloudfront.net``, also
+        matches hosts under it. See ``hostname_subparts``.
+        Default is ``False``.
+    extractor : tldextract::TLDExtract or SuffixTrie, optional
+        The extractor used to find the eTLD+1 of hosts. Default is the
+        shared extractor at the time the matcher is created.
+    """
+
+    def __init__(self, domains=(), include_ps=False, extractor=None):
+        self.include_ps = include_ps
+        self.extractor = get_extractor() if extractor is None else extractor
+        self._root = _Node()
+        self._size = 0
+        for domain in domains:
+            self.add(domain)
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """
+        Build a matcher from a file of one domain per line.
+
+        Blank lines and lines starting with ``#`` are skipped. ``kwargs`` are
+        passed to ``DomainMatcher``.
+        """
+        with open(path, encoding='utf-8') as f:
+            return cls(
+                (line for line in (line.strip() for line in f)
+                 if line and not line.startswith('#')),
+                **kwargs)
+
+    def __len__(self):
+        return self._size
+
+    def add(self, domain, value=None):
+        """
+        Add a domain.
+
+        Parameters
+        ----------
+        domain : string
+            The domain to match.
+        value : any, optional
+            What ``match`` returns for hosts matching ``domain``. Default is
+            the normalized domain itself.
+        """
+        normalized = domain.strip().lower().rstrip('.')
+        address = _bracketed_address(normalized)
+        if address is not None:
+            normalized = address
+        if normalized.startswith('*'):
+            normalized = normalized[1:]
+        normalized = normalize_hostname(normalized.lstrip('.'))
+        if not normalized:
+            raise ValueError(f'{domain!r} is not a domain')
+        if value is None:
+            value = normalized
+        labels = normalized.split('.')
+        node = self._root
+        for label in reversed(labels[1:]):
+            child = node.get(label)
+            if type(child) is not _Node:
+                leaf = child
+                child = _Node()
+                if leaf is not None:
+                    child[_ENTRY] = leaf
+                node[sys.intern(label)] = child
+            node = child
+        label = labels[0]
+        child = node.get(label)
+        if type(child) is _Node:
+            self._size += _ENTRY not in child
+            child[_ENTRY] = value
+        else:
+            self._size += child is None
+            node[sys.intern(label)] = value
+
+    def match_hostname(self, hostname):
+        """
+        Match a bare hostname.
+
+        Parameters
+        ----------
+        hostname : string
+            A hostname without scheme, user info, port or path. IPv6
+            addresses may be in brackets, e.g. ``[::1]``.
+
+        Returns
+        -------
+        any
+            The value of the most specific listed domain that is the host or
+            one of its parents down to the eTLD+1, or ``None``.
+        """
+        address = _bracketed_address(hostname)
+        if address is not None:
+            hostname = address
+        hostname = normalize_hostname(hostname)
+        parts = _split_host(self.extractor, hostname)
+        # IPv6 addresses are not lowercased by ``normalize_hostname``
+        labels = hostname.lower().split('.')
+        if is_ip_address(parts.domain):
+            # Only the address itself can match
+            etld1_index = suffix_index = 0
+        elif not parts.suffix:
+            return None
+        else:
+            suffix_index = len(labels) - parts.suffix.count('.') - 1
+            etld1_index = suffix_index - 1
+        if not self.include_ps:
+            suffix_index = etld1_index
+        found = None
+        node = self._root
+        for i in range(len(labels) - 1, -1, -1):
+            child = node.get(labels[i])
+            if child is None:
+                break
+            if type(child) is _Node:
+                value = child.get(_ENTRY)
+                node = child
+            else:
+                value = child
+                node = None
+            if value is not None and (i <= etld1_index or i == suffix_index):
+                found = value
+            if node is None:
+                break
+        return found
+
+    def match(self, url):
+        """
+        Match the hostname of ``url``, parsed as ``get_etld1`` does.
+
+        Returns
+        -------
+        any
+            See ``match_hostname``. ``None`` for urls without a hostname.
+        """
+        hostname = parse_url(url, extractor=self.extractor)._lookup_hostname()
+        if not hostname:
+            return None
+        return self.match_hostname(hostname)
+
+    def __contains__(self, url):
+        return self.match(url) is not None
+
+    def match_many(self, urls, errors=RAISE, default=None):
+        """
+        Match each url in ``urls``.
+
+        Each distinct url is parsed once and each distinct hostname is
+        matched once.
+
+        Parameters
+        ----------
+        urls : iterable (string)
+            The urls to match.
+        errors : string, optional
+            If ``raise``, a malformed url raises. If ``coerce``, its result
+            is ``default`` instead. Default is ``raise``.
+        default : any, optional
+            The result for malformed urls when ``errors`` is ``coerce``.
+            Default is ``None``.
+
+        Returns
+        -------
+        list
+            The ``match`` of each url, in input order.
+        """
+        hosts = {}
+
+        def match(url):
+            hostname = parse_url(url, extractor=self.extractor)._lookup_hostname()
+            if not hostname:
+                return None
+            try:
+                return hosts[hostname]
+            except KeyError:
+                hosts[hostname] = found = self.match_hostname(hostname)
+                return found
+
+        return _map_unique(match, urls, errors, default)
@@ -0,0 +1,184 @@
+"""
+A ``du`` accessor for pandas Series of urls.
+
+Importing this module registers the accessor::
+
+    import domain_utils.pandas_accessor  # noqa
+    df['etld1'] = df.url.du.etld1()
+
+Each method computes its result once per distinct url and broadcasts it
+back over the Series, so it is much faster and leaner than
+``df.url.apply(get_etld1)`` on crawl data with many repeated urls.
+"""
+import numpy as np
+import pandas as pd
+
+from .batch import (
+    RAISE,
+    _site_ids,
+    get_etld1_many,
+    get_port_many,
+    get_scheme_many,
+    hostname_subparts_many,
+    stem_url_many,
+)
+from .domain_utils import NO_SCHEME
+
+
+def _object_array(values):
+    # One slot per distinct url, plus a trailing missing value that the -1
+    # code of missing urls indexes. Filled one by one so that list values
+    # are not turned into extra dimensions.
+    array = np.empty(len(values) + 1, dtype=object)
+    for i, value in enumerate(values):
+        array[i] = value
+    return array
+
+
+def _categorical(codes, values):
+    # Re-encode the per-url ``values``, which may repeat, as categories
+    value_codes, categories = pd.factorize(_object_array(values)[:-1])
+    value_codes = np.append(value_codes, -1)
+    return pd.Categorical.from_codes(value_codes[codes], categories=categories)
+
+
+@pd.api.extensions.register_series_accessor('du')
+class DomainUtilsAccessor(object):
+    """
+    Vectorized domain_utils functions for a Series of urls.
+
+    Missing values in the Series stay missing in the results.
+    """
+
+    def __init__(self, series):
+        self._series = series
+
+    def _factorize(self):
+        # Not cached: pandas caches the accessor on the Series, which can
+        # be changed in place between calls
+        codes, uniques = pd.factorize(self._series)
+        return codes, list(uniques)
+
+    def _wrap(self, values):
+        return pd.Series(values, index=self._series.index, name=self._series.name)
+
+    def _broadcast(self, codes, values):
+        return self._wrap(_object_array(values)[codes])
+
+    def etld1(self, errors=RAISE, **kwargs):
+        """
+        The ``get_etld1`` of each url, as a categorical Series.
+
+        Parameters
+        ----------
+        errors : string, optional
+            See ``get_etld1_many``. Coerced errors become missing values.
+        kwargs:
+            Passed to ``get_etld1_many``, e.g. ``extractor``.
+        """
+        codes, uniques = self._factorize()
+        values = get_etld1_many(uniques, errors=errors, **kwargs)
+        return self._wrap(_categorical(codes, values))
+
+    def stem(self, categorical=False, errors=RAISE, **kwargs):
+        """
+        The ``stem_url`` of each url.
+
+        Parameters
+        ----------
+        categorical : boolean, optional
+            If ``True``, return a categorical Series. Stemmed urls keep
+            their path so are often distinct. Default is ``False``.
+        errors : string, optional
+            See ``stem_url_many``. Coerced errors become missing values.
+        kwargs:
+            ``stem_url`` parameters, e.g. ``scheme=True``.
+        """
+        codes, uniques = self._factorize()
+        values = stem_url_many(uniques, errors=errors, **kwargs)
+        if categorical:
+            return self._wrap(_categorical(codes, values))
+        return self._broadcast(codes, values)
+
+    def port(self, errors=RAISE, **kwargs):
+        """
+        The ``get_port`` of each url, as a nullable ``Int32`` Series.
+
+        Parameters
+        ----------
+        errors : string, optional
+            See ``get_port_many``. Coerced errors become missing values.
+        kwargs:
+            Passed to ``get_port_many``, e.g. ``extractor``.
+        """
+        codes, uniques = self._factorize()
+        values = get_port_many(uniques, errors=errors, **kwargs)
+        return self._broadcast(codes, values).astype('Int32')
+
+    def scheme(self, no_scheme=NO_SCHEME, errors=RAISE):
+        """
+        The ``get_scheme`` of each url, as a categorical Series.
+
+        Parameters
+        ----------
+        no_scheme : any, optional
+            The value to use if no scheme is detected.
+            Default is ``no_scheme``.
+        errors : string, optional
+            See ``get_scheme_many``. Coerced errors become missing values.
+        """
+        codes, uniques = self._factorize()
+        values = get_scheme_many(uniques, no_scheme=no_scheme, errors=errors)
+        return self._wrap(_categorical(codes, values))
+
+    def subparts(self, include_ps=False, errors=RAISE, **kwargs):
+        """
+        The ``hostname_subparts`` of each url, as a Series of lists.
+
+        Urls with the same result share the same list object.
+
+        Parameters
+        ----------
+        include_ps : boolean, optional
+            See ``hostname_subparts``.
+        errors : string, optional
+            See ``hostname_subparts_many``. Coerced errors become missing
+            values.
+        kwargs:
+            Passed to ``hostname_subparts_many``, e.g. ``extractor``.
+        """
+        codes, uniques = self._factorize()
+        values = hostname_subparts_many(
+            uniques, include_ps=include_ps, errors=errors, **kwargs)
+        return self._broadcast(codes, values)
+
+    def is_third_party(self, top_level_urls, errors=RAISE, **kwargs):
+        """
+        The ``is_third_party`` of each url, as a nullable ``boolean`` Series.
+
+        Each distinct url and top level url is resolved once and pairs are
+        compared by interned eTLD+1 ids.
+
+        Parameters
+        ----------
+        top_level_urls : Series or array-like (string)
+            The url of the page each request was made from, by position.
+        errors : string, optional
+            See ``is_third_party_many``. Pairs with a coerced error, or with
+            a missing url, are missing.
+        kwargs:
+            Passed to ``is_third_party_many``, e.g. ``extractor``.
+        """
+        top_level_urls = np.asarray(top_level_urls, dtype=object)
+        if len(top_level_urls) != len(self._series):
+            raise ValueError('top_level_urls must have the same length as the Series')
+        codes, uniques = self._factorize()
+        top_level_codes, top_level_uniques = pd.factorize(top_level_urls)
+        ids, top_level_ids = (
+            np.array([-1 if site_id is None else site_id for site_id in site_ids] + [-1])
+            for site_ids in _site_ids([uniques, list(top_level_uniques)], errors=errors, **kwargs)
+        )
+        ids = ids[codes]
+        top_level_ids = top_level_ids[top_level_codes]
+        return self._wrap(pd.arrays.BooleanArray(
+            ids != top_level_ids, (ids == -1) | (top_level_ids == -1)))
@@ -0,0 +1,187 @@
+"""
+Add domain_utils columns to Parquet tables too large to load at once.
+
+``enrich_parquet`` streams a Parquet file, or a directory of them, one row
+group at a time, and writes each row group back with new columns derived
+from its url columns::
+
+    enrich_parquet('crawl/http_requests', 'enriched/http_requests', workers=8)
+    # url -> url_etld1, url_stem and url_port
+
+Only the row groups in flight are held in memory: one without ``workers``,
+and at most two per worker with them. The output has the input schema
+plus the new columns, and the same row groups.
+"""
+import os
+from collections import deque
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .arrow import get_etld1_arrow, get_port_arrow, get_scheme_arrow, stem_url_arrow
+from .batch import RAISE
+from .extractor import preload
+from .parallel import PROCESS, _executor
+
+ETLD1 = 'etld1'
+STEM = 'stem'
+PORT = 'port'
+SCHEME = 'scheme'
+
+DEFAULT_FIELDS = (ETLD1, STEM, PORT)
+
+
+def _derive(field, urls, errors, kwargs):
+    if field == ETLD1:
+        return get_etld1_arrow(urls, errors=errors).cast(pa.string())
+    if field == STEM:
+        return stem_url_arrow(urls, errors=errors, **kwargs)
+    if field == PORT:
+        return get_port_arrow(urls, errors=errors)
+    if field == SCHEME:
+        return get_scheme_arrow(urls, errors=errors).cast(pa.string())
+    raise ValueError(f'Unknown field {field!r}')
+
+
+def _url_columns(url_columns):
+    return [url_columns] if isinstance(url_columns, str) else list(url_columns)
+
+
+def enrich_table(table, url_columns='url', fields=DEFAULT_FIELDS, errors=RAISE, **kwargs):
+    """
+    Append derived columns to an Arrow table.
+
+    Parameters
+    ----------
+    table : pyarrow.Table
+        A table with string url columns.
+    url_columns : string or list (string), optional
+        The columns holding urls. Default is ``url``.
+    fields : list (string), optional
+        What to derive from each url column, out of ``etld1``, ``stem``,
+        ``port`` and ``scheme``, into ``<url column>_<field>`` columns.
+        Default is ``etld1``, ``stem`` and ``port``.
+    errors : string, optional
+        If ``raise``, a malformed url raises. If ``coerce``, its derived
+        values are null. Default is ``raise``.
+    kwargs:
+        ``stem_url`` parameters for the ``stem`` field, e.g. ``scheme=True``.
+
+    Returns
+    -------
+    pyarrow.Table
+    """
+    for url_column in _url_columns(url_columns):
+        urls = table.column(url_column)
+        for field in fields:
+            name = f'{url_column}_{field}'
+            if name in table.column_names:
+                raise ValueError(f'The table already has a {name!r} column')
+            table = table.append_column(name, _derive(field, urls, errors, kwargs))
+    return table
+
+
+def _enrich_row_group(path, index, url_columns, fields, errors, kwargs):
+    table = pq.ParquetFile(path).read_row_group(index)
+    return enrich_table(table, url_columns, fields, errors, **kwargs)
+
+
+def _files(source, destination):
+    # (input, output) paths, mirroring a directory of Parquet files
+    source = Path(source)
+    if not source.is_dir():
+        return [(source, Path(destination))]
+    return [
+        (path, Path(destination) / path.relative_to(source))
+        for path in sorted(source.rglob('*.parquet'))]
+
+
+def enrich_parquet(
+        source,
+        destination,
+        url_columns='url',
+        fields=DEFAULT_FIELDS,
+        errors=RAISE,
+        workers=None,
+        executor=PROCESS,
+        compression='snappy',
+        mp_context=None,
+        **kwargs):
+    """
+    Write a copy of a Parquet file or dataset with derived url columns.
+
+    Parameters
+    ----------
+    source : string or os.PathLike
+        A Parquet file, or a directory whose ``*.parquet`` files, at any
+        depth, are read in path order.
+    destination : string or os.PathLike
+        The file to write, or the directory to write the files of a
+        ``source`` directory to, under the same relative paths.
+    url_columns, fields, errors, kwargs:
+        See ``enrich_table``.
+    workers : int, optional
+        The number of row groups processed at once by a pool of
+        ``executor``. Default is ``None``, to process them one at a time
+        in this process.
+    executor : string, optional
+        ``process`` or ``thread``, see ``domain_utils.parallel``.
+        Default is ``process``.
+    compression : string, optional
+        The Parquet compression of the output. Default is ``snappy``.
+    mp_context : multiprocessing context, optional
+        See ``domain_utils.parallel.imap_chunks``.
+
+    Returns
+    -------
+    int
+        The number of rows written.
+    """
+    files = _files(source, destination)
+    tasks = []
+    for path, _ in files:
+        metadata = pq.read_metadata(path)
+        tasks.extend((path, index) for index in range(metadata.num_row_groups))
+    args = (_url_columns(url_columns), list(fields), errors, kwargs)
+
+    if workers is None:
+        results = (_enrich_row_group(path, index, *args) for path, index in tasks)
+        return _write(files, results, args, compression)
+    with _executor(executor, workers, preload(), mp_context) as pool:
+        return _write(files, _submit(pool, tasks, args, workers), args, compression)
+
+
+def _submit(pool, tasks, args, workers):
+    pending = deque()
+    for path, index in tasks:
+        pending.append(pool.submit(_enrich_row_group, path, index, *args))
+        if len(pending) >= 2 * workers:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _write(files, results, args, compression):
+    # ``results`` are the enriched row groups of ``files``, in order
+    rows = 0
+    for path, output in files:
+        os.makedirs(output.parent, exist_ok=True)
+        writer = None
+        try:
+            for _ in range(pq.read_metadata(path).num_row_groups):
+                table = next(results)
+                if writer is None:
+                    writer = pq.ParquetWriter(output, table.schema, compression=compression)
+                writer.write_table(table, row_group_size=max(table.num_rows, 1))
+                rows += table.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            # No row groups, so write the enriched schema alone
+            url_columns, fields, errors, kwargs = args
+            table = enrich_table(
+                pq.read_schema(path).empty_table(), url_columns, fields, errors, **kwargs)
+            pq.write_table(table, output, compression=compression)
+    return rows
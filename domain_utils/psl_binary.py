@@ -0,0 +1,268 @@
+"""
+A compiled, memory-mapped form of the Public Suffix List.
+
+``compile_suffix_list`` turns a ``public_suffix_list.dat`` file into a
+binary file holding the suffix trie as an open addressing hash table of
+``(parent node, label) -> (child node, flags)`` entries. ``MappedSuffixTrie``
+memory-maps that file and queries it in place, so loading it costs next to
+nothing and every process on a machine that maps the same file shares the
+same physical pages.
+
+File layout, all integers little endian:
+
+* header: magic ``DUPSL\\0\\0\\0``, format version (u16), reserved (u16),
+  slot count (u32), label blob size (u32), CRC32 of everything after the
+  header (u32), SHA-256 of the source list (32 bytes)
+* slots: ``slot count`` entries of parent node (u32), label offset (u32),
+  child node (u32), label length (u16) and flags (u16). Empty slots have
+  child node 0, which is the root and never a child.
+* labels: the UTF-8 labels that slots point into
+"""
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+from .suffix_trie import (
+    _FLAGS, EXCEPTION, PRIVATE, RULE, WILDCARD, SuffixTrie, parse_suffix_list,
+)
+
+MAGIC = b'DUPSL\0\0\0'
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<8sHHIII32s')
+_SLOT = struct.Struct('<IIIHH')
+
+# The number of ``(node, label)`` lookups each ``MappedSuffixTrie`` keeps
+CHILD_CACHE_SIZE = 2 ** 14
+
+
+class CompiledSuffixListError(ValueError):
+    """Raised when a compiled suffix list is corrupt or of another version."""
+
+
+def _slot_hash(parent, label):
+    return zlib.crc32(label, parent)
+
+
+def _edges(trie):
+    # Yields (parent id, label, child id, flags) for every node of the
+    # dict trie, numbering nodes breadth first from the root's 0
+    next_id = 1
+    queue = [(0, trie._root)]
+    while queue:
+        parent_id, node = queue.pop(0)
+        for label, child in node.items():
+            if label is _FLAGS:
+                continue
+            child_id = next_id
+            next_id += 1
+            if isinstance(child, dict):
+                yield parent_id, label, child_id, child.get(_FLAGS, 0)
+                queue.append((child_id, child))
+            else:
+                yield parent_id, label, child_id, child
+
+
+def compile_suffix_list(source, destination, include_private=True):
+    """
+    Compile a Public Suffix List file into the binary format.
+
+    Parameters
+    ----------
+    source : string
+        Path to a ``public_suffix_list.dat`` file.
+    destination : string
+        Path of the compiled file to write.
+    include_private : boolean, optional
+        If ``False``, rules from the private section of the list are left
+        out. Default is ``True``.
+    """
+    with open(source, 'rb') as f:
+        raw = f.read()
+    trie = SuffixTrie(parse_suffix_list(raw.decode('utf-8'), include_private=include_private))
+    edges = list(_edges(trie))
+
+    slot_count = 1
+    while slot_count < 2 * len(edges):
+        slot_count *= 2
+    mask = slot_count - 1
+
+    labels = bytearray()
+    label_offsets = {}
+    slots = [None] * slot_count
+    for parent_id, label, child_id, flags in edges:
+        encoded = label.encode('utf-8')
+        if encoded not in label_offsets:
+            label_offsets[encoded] = len(labels)
+            labels += encoded
+        slot = _slot_hash(parent_id, encoded) & mask
+        while slots[slot] is not None:
+            slot = (slot + 1) & mask
+        slots[slot] = (parent_id, label_offsets[encoded], child_id, len(encoded), flags)
+
+    payload = bytearray(slot_count * _SLOT.size)
+    for i, entry in enumerate(slots):
+        if entry is not None:
+            _SLOT.pack_into(payload, i * _SLOT.size, *entry)
+    payload += labels
+
+    header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, 0, slot_count, len(labels),
+        zlib.crc32(payload), hashlib.sha256(raw).digest())
+    with open(destination, 'wb') as f:
+        f.write(header)
+        f.write(payload)
+
+
+def is_compiled_suffix_list(path):
+    """Whether ``path`` starts like a file written by ``compile_suffix_list``."""
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class MappedSuffixTrie(SuffixTrie):
+    """
+    A ``SuffixTrie`` queried in place from a memory-mapped compiled file.
+
+    It gives the same results as a ``SuffixTrie`` built from the source list
+    and can be used wherever an ``extractor`` is accepted. It is pickled by
+    path, so worker processes map the same file rather than copying it.
+    The results of the most recent ``CHILD_CACHE_SIZE`` node lookups are
+    kept per process, which makes lookups about as fast as a ``SuffixTrie``.
+
+    Parameters
+    ----------
+    path : string
+        A file written by ``compile_suffix_list``.
+    verify : boolean, optional
+        If ``True``, check the CRC32 of the file when it is opened.
+        Default is ``True``.
+
+    Attributes
+    ----------
+    source_sha256 : string
+        Hex SHA-256 of the Public Suffix List the file was compiled from.
+    """
+
+    def __init__(self, path, verify=True):
+        self.path = path
+        self._wire = None
+        with open(path, 'rb') as f:
+            # Empty files can not be mapped
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise CompiledSuffixListError(
+                    f'{path} is too short to be a compiled suffix list')
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, slot_count, labels_size, crc, source_sha256 = \
+            _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise CompiledSuffixListError(f'{path} is not a compiled suffix list')
+        if version != FORMAT_VERSION:
+            raise CompiledSuffixListError(
+                f'{path} has format version {version}, expected {FORMAT_VERSION}')
+        if len(self._map) != _HEADER.size + slot_count * _SLOT.size + labels_size:
+            raise CompiledSuffixListError(f'{path} is truncated')
+        if verify and zlib.crc32(memoryview(self._map)[_HEADER.size:]) != crc:
+            raise CompiledSuffixListError(f'{path} failed its checksum')
+        self.source_sha256 = source_sha256.hex()
+        self._mask = slot_count - 1
+        self._labels = _HEADER.size + slot_count * _SLOT.size
+        self._words = None
+        if sys.byteorder == 'little':
+            # The slots as u32 words, read without unpacking structs
+            self._words = memoryview(self._map)[_HEADER.size:self._labels].cast('I')
+        self._children = {}
+
+    def __reduce__(self):
+        return (self.__class__, (self.path, False))
+
+    def __copy__(self):
+        # Read only, so a copy can be the trie itself
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def add_rule(self, rule, private=False):
+        raise TypeError('A MappedSuffixTrie is read only, compile a new file instead')
+
+    def rules(self):
+        """Yield the ``(rule, private)`` pairs of the file. See ``SuffixTrie.rules``."""
+        mapped = self._map
+        nodes = {}
+        for slot in range(self._mask + 1):
+            parent, offset, child, length, flags = _SLOT.unpack_from(
+                mapped, _HEADER.size + slot * _SLOT.size)
+            if child:
+                start = self._labels + offset
+                nodes[child] = (parent, mapped[start:start + length].decode('utf-8'), flags)
+        for parent, label, flags in nodes.values():
+            labels = [label]
+            while parent:
+                parent, label, _ = nodes[parent]
+                labels.append(label)
+            name = '.'.join(labels)
+            private = bool(flags & PRIVATE)
+            if flags & RULE:
+                yield name, private
+            if flags & WILDCARD:
+                yield f'*.{name}', private
+            if flags & EXCEPTION:
+                yield f'!{name}', private
+
+    def _child(self, parent, label):
+        key = (parent, label)
+        try:
+            return self._children[key]
+        except KeyError:
+            pass
+        found = self._probe(parent, label)
+        if len(self._children) >= CHILD_CACHE_SIZE:
+            self._children.clear()
+        self._children[key] = found
+        return found
+
+    def _probe(self, parent, label):
+        encoded = label.encode('utf-8')
+        length = len(encoded)
+        mapped = self._map
+        words = self._words
+        mask = self._mask
+        slot = _slot_hash(parent, encoded) & mask
+        while True:
+            if words is None:
+                child_parent, offset, child, child_length, flags = _SLOT.unpack_from(
+                    mapped, _HEADER.size + slot * _SLOT.size)
+            else:
+                i = slot * 4
+                child_parent, offset, child, packed = words[i:i + 4]
+                child_length, flags = packed & 0xffff, packed >> 16
+            if child == 0:
+                return None
+            if child_parent == parent and child_length == length:
+                start = self._labels + offset
+                if mapped[start:start + length] == encoded:
+                    return child, flags
+            slot = (slot + 1) & mask
+
+    def _match(self, labels):
+        # The same walk as ``SuffixTrie._match``, one hash probe per label
+        suffix_index = len(labels)
+        flags = 0
+        node = 0
+        node_flags = 0
+        for i in range(len(labels) - 1, -1, -1):
+            if node_flags & WILDCARD:
+                suffix_index, flags = i, node_flags
+            found = self._child(node, labels[i])
+            if found is None:
+                break
+            node, node_flags = found
+            if node_flags & EXCEPTION:
+                suffix_index, flags = i + 1, node_flags
+            elif node_flags & RULE:
+                suffix_index, flags = i, node_flags
+        return suffix_index, flags
@@ -0,0 +1,152 @@
+"""
+Find the hosts whose eTLD+1 may change between two Public Suffix Lists.
+
+Only hosts with a suffix matched by an added or removed rule can be split
+differently, so a stored eTLD+1 column can be patched rather than rebuilt
+after a list update::
+
+    diff = diff_suffix_lists('old/public_suffix_list.dat', 'public_suffix_list.dat')
+    changes = diff.changed_etld1s(table, extractor=load_extractor('public_suffix_list.dat'))
+    # {host id: new eTLD+1} for the hosts of ``table`` whose eTLD+1 changed
+"""
+from array import array
+
+from .domain_utils import _join_etld1, is_ip_address, normalize_hostname, split_hostname
+from .suffix_trie import parse_suffix_list
+
+
+class SuffixListDiff(object):
+    """
+    The rules added and removed between two versions of a suffix list.
+
+    A rule that only moves between the ICANN and private sections of the
+    list is not a change, as it splits hosts the same way.
+
+    Parameters
+    ----------
+    old_rules : iterable of (string, boolean)
+        The rules of the old list, each paired with whether it comes from
+        the private section, as returned by ``parse_suffix_list``.
+    new_rules : iterable of (string, boolean)
+        The rules of the new list.
+    """
+
+    def __init__(self, old_rules, new_rules):
+        old = {normalize_hostname(rule) for rule, _ in old_rules}
+        new = {normalize_hostname(rule) for rule, _ in new_rules}
+        self.added = frozenset(new - old)
+        self.removed = frozenset(old - new)
+        self.rules = self.added | self.removed
+
+    @classmethod
+    def from_text(cls, old_text, new_text, include_private=True):
+        """
+        Diff the texts of two Public Suffix Lists.
+
+        Parameters
+        ----------
+        old_text : string
+            Contents of the old ``public_suffix_list.dat``.
+        new_text : string
+            Contents of the new ``public_suffix_list.dat``.
+        include_private : boolean, optional
+            If ``False``, rules from the private section of the lists are
+            skipped, as by extractors built without them. Default is ``True``.
+
+        Returns
+        -------
+        SuffixListDiff
+        """
+        return cls(
+            parse_suffix_list(old_text, include_private=include_private),
+            parse_suffix_list(new_text, include_private=include_private))
+
+    def __len__(self):
+        return len(self.rules)
+
+    def __repr__(self):
+        return f'SuffixListDiff({len(self.added)} added, {len(self.removed)} removed)'
+
+    def affects(self, hostname):
+        """
+        Whether the eTLD+1 of ``hostname`` may differ between the two lists.
+
+        A host is affected if a changed rule matches one of its suffixes. Its
+        eTLD+1 may still be the same, e.g. when a longer unchanged rule
+        prevails, but the eTLD+1 of a host that is not affected never
+        changes.
+
+        Parameters
+        ----------
+        hostname : string
+            A hostname without scheme, user info, port or path.
+
+        Returns
+        -------
+        boolean
+        """
+        rules = self.rules
+        if not rules or not hostname or is_ip_address(hostname):
+            return False
+        labels = normalize_hostname(hostname).split('.')
+        for i in range(len(labels)):
+            suffix = '.'.join(labels[i:])
+            if suffix in rules or f'!{suffix}' in rules or (i and f'*.{suffix}' in rules):
+                return True
+        return False
+
+    def affected_ids(self, table):
+        """
+        The ids of the hostnames of a ``DomainTable`` that are affected.
+
+        Parameters
+        ----------
+        table : DomainTable
+
+        Returns
+        -------
+        array.array('q')
+            Hostname ids in increasing order.
+        """
+        affects = self.affects
+        return array('q', [
+            host_id for host_id, hostname in enumerate(table._hostnames) if affects(hostname)])
+
+    def changed_etld1s(self, table, extractor):
+        """
+        The new eTLD+1 of each hostname of a ``DomainTable`` whose eTLD+1
+        changed.
+
+        Only affected hostnames are split again, with ``extractor``. The
+        table itself is not modified.
+
+        Parameters
+        ----------
+        table : DomainTable
+            A table built with an extractor of the old list.
+        extractor : tldextract::TLDExtract or SuffixTrie
+            An extractor of the new list.
+
+        Returns
+        -------
+        dict (int, string)
+            The new eTLD+1 by hostname id.
+        """
+        changed = {}
+        for host_id in self.affected_ids(table):
+            etld1 = _join_etld1(split_hostname(extractor, table.hostname(host_id)))
+            if etld1 != table.etld1(table.parent(host_id)):
+                changed[host_id] = etld1
+        return changed
+
+
+def diff_suffix_lists(old_path, new_path, include_private=True):
+    """
+    Diff two Public Suffix List files. See ``SuffixListDiff.from_text``.
+
+    Returns
+    -------
+    SuffixListDiff
+    """
+    with open(old_path, encoding='utf-8') as old, open(new_path, encoding='utf-8') as new:
+        return SuffixListDiff.from_text(old.read(), new.read(), include_private=include_private)
@@ -0,0 +1,264 @@
+"""
+Refresh the shared Public Suffix List while domain_utils is in use.
+
+A new list is loaded off to the side, then swapped in together with an empty
+hostname cache by ``set_extractor``. Readers never take a lock: calls that
+are running finish with the old list and later calls use the new one.
+
+In threaded code::
+
+    refresher = Refresher('https://example.org/public_suffix_list.dat')
+    refresher.start()
+
+In asyncio code, where loading must not block the event loop::
+
+    await refresh_async('/etc/psl/public_suffix_list.dat')
+    task = asyncio.ensure_future(refresh_periodically(interval=24 * 3600))
+
+A new list is checked before it is swapped in: it must have at least
+``MIN_RULES`` rules and split hosts under each of ``KNOWN_SUFFIXES`` at that
+suffix, so a truncated download or an error page never replaces a good
+list. A refresh that fails in the background, or loads a list that fails
+these checks, keeps the current list and logs the error to the
+``domain_utils.refresh`` logger.
+"""
+import asyncio
+import logging
+import threading
+import time
+
+from .extractor import load_extractor, set_extractor
+from .suffix_trie import SuffixTrie
+
+DEFAULT_INTERVAL = 24 * 3600
+
+# The checks a new list must pass, see ``check_suffix_list``. The full list
+# has about 10000 rules.
+MIN_RULES = 1000
+KNOWN_SUFFIXES = ('com', 'co.uk')
+
+logger = logging.getLogger(__name__)
+
+# ``get_running_loop`` is Python 3.7+. Earlier, ``get_event_loop`` returns
+# the running loop when called from a coroutine.
+_running_loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)
+
+
+class InvalidSuffixListError(ValueError):
+    """Raised when a loaded suffix list fails ``check_suffix_list``."""
+
+
+def _rule_count(extractor):
+    if isinstance(extractor, SuffixTrie):
+        return sum(1 for _ in extractor.rules())
+    return len(extractor.tlds)
+
+
+def check_suffix_list(extractor, min_rules=MIN_RULES, known_suffixes=KNOWN_SUFFIXES):
+    """
+    Check that a loaded suffix list looks complete.
+
+    Parameters
+    ----------
+    extractor : tldextract::TLDExtract or SuffixTrie
+        The loaded list, e.g. from ``load_extractor``.
+    min_rules : int, optional
+        The fewest rules the list may have. Default is ``MIN_RULES``.
+    known_suffixes : iterable (string), optional
+        Suffixes the list must have. Default is ``KNOWN_SUFFIXES``.
+
+    Raises
+    ------
+    InvalidSuffixListError
+        If the list has too few rules or misses a known suffix.
+    """
+    rules = _rule_count(extractor)
+    if rules < min_rules:
+        raise InvalidSuffixListError(
+            f'The suffix list has {rules} rules, expected at least {min_rules}')
+    for suffix in known_suffixes:
+        found = extractor(f'example.{suffix}').suffix
+        if found != suffix:
+            raise InvalidSuffixListError(
+                f'The suffix list splits example.{suffix} at {found!r}, expected {suffix!r}')
+
+
+def _load(source, min_rules, known_suffixes):
+    extractor = load_extractor(source)
+    check_suffix_list(extractor, min_rules, known_suffixes)
+    return extractor
+
+
+def refresh(source=None, min_rules=MIN_RULES, known_suffixes=KNOWN_SUFFIXES):
+    """
+    Load a suffix list and make it the shared one.
+
+    Parameters
+    ----------
+    source : string, optional
+        A url, a path to a list or a path to a compiled list, see
+        ``load_extractor``. Default is the latest list from publicsuffix.org.
+    min_rules, known_suffixes : optional
+        See ``check_suffix_list``.
+
+    Returns
+    -------
+    tldextract::TLDExtract or SuffixTrie
+        The new shared extractor.
+
+    Raises
+    ------
+    InvalidSuffixListError
+        If the new list fails ``check_suffix_list``. The shared list is kept.
+    """
+    extractor = _load(source, min_rules, known_suffixes)
+    set_extractor(extractor)
+    return extractor
+
+
+async def refresh_async(
+        source=None, executor=None, min_rules=MIN_RULES, known_suffixes=KNOWN_SUFFIXES):
+    """
+    Like ``refresh``, but the list is loaded and checked in an executor.
+
+    Parameters
+    ----------
+    source, min_rules, known_suffixes : optional
+        See ``refresh``.
+    executor : concurrent.futures.Executor, optional
+        Where to load the list. Default is the event loop's default executor.
+
+    Returns
+    -------
+    tldextract::TLDExtract or SuffixTrie
+        The new shared extractor.
+    """
+    loop = _running_loop()
+    extractor = await loop.run_in_executor(
+        executor, _load, source, min_rules, known_suffixes)
+    set_extractor(extractor)
+    return extractor
+
+
+async def refresh_periodically(
+        source=None,
+        interval=DEFAULT_INTERVAL,
+        executor=None,
+        min_rules=MIN_RULES,
+        known_suffixes=KNOWN_SUFFIXES):
+    """
+    Refresh the shared list now and then every ``interval`` seconds.
+
+    Runs until cancelled. Failed refreshes are logged and retried at the
+    next interval.
+
+    Parameters
+    ----------
+    source, min_rules, known_suffixes : optional
+        See ``refresh``.
+    interval : float, optional
+        Seconds between refreshes. Default is one day.
+    executor : concurrent.futures.Executor, optional
+        See ``refresh_async``.
+    """
+    while True:
+        try:
+            await refresh_async(source, executor, min_rules, known_suffixes)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception('Refreshing the Public Suffix List failed, keeping the current one')
+        await asyncio.sleep(interval)
+
+
+class Refresher(object):
+    """
+    Refresh the shared list from a daemon thread every ``interval`` seconds.
+
+    Can be used as a context manager, which starts and stops the thread.
+
+    Parameters
+    ----------
+    source, min_rules, known_suffixes : optional
+        See ``refresh``.
+    interval : float, optional
+        Seconds between refreshes. Default is one day.
+
+    Attributes
+    ----------
+    last_refresh : float
+        ``time.time()`` of the last successful refresh, or ``None``.
+    last_error : Exception
+        The error of the last refresh if it failed, or ``None``.
+    """
+
+    def __init__(
+            self,
+            source=None,
+            interval=DEFAULT_INTERVAL,
+            min_rules=MIN_RULES,
+            known_suffixes=KNOWN_SUFFIXES):
+        self.source = source
+        self.interval = interval
+        self.min_rules = min_rules
+        self.known_suffixes = known_suffixes
+        self.last_refresh = None
+        self.last_error = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def refresh(self):
+        """
+        Refresh now, in the calling thread.
+
+        Returns
+        -------
+        boolean
+            Whether the new list was swapped in.
+        """
+        try:
+            refresh(self.source, self.min_rules, self.known_suffixes)
+        except Exception as e:
+            self.last_error = e
+            logger.exception('Refreshing the Public Suffix List failed, keeping the current one')
+            return False
+        self.last_error = None
+        self.last_refresh = time.time()
+        return True
+
+    def start(self, now=True):
+        """
+        Start the refresh thread.
+
+        Parameters
+        ----------
+        now : boolean, optional
+            If ``True``, refresh straight away rather than after the first
+            interval. Default is ``True``.
+        """
+        if self._thread is not None:
+            raise RuntimeError('Refresher is already started')
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(now,), name='domain_utils-refresh', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the refresh thread, waiting for a running refresh to finish."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self, now):
+        if now:
+            self.refresh()
+        while not self._stopped.wait(self.interval):
+            self.refresh()
@@ -0,0 +1,414 @@
+"""
+Streaming group-by rollups of url records, keyed on eTLD+1.
+
+A ``Rollup`` consumes records one at a time, e.g. rows of a crawl export
+read with ``csv.DictReader``, and keeps running counts, sums and distinct
+counts per key::
+
+    rollup = Rollup(site_field='top_level_url', sums=['bytes'], distinct=['hostname'])
+    rollup.update(records)
+    for row in rollup.rows():
+        # {'etld1': ..., 'site': ..., 'count': ..., 'bytes': ...,
+        #  'distinct_hostname': ...}
+
+Memory is bounded by ``max_keys``. Past it, partial aggregates are spilled
+to temporary files partitioned by key, and ``rows`` merges them back one
+partition at a time. Distinct counts are exact up to ``exact_limit`` values
+per key and estimated with a HyperLogLog sketch beyond that.
+
+Rollups built by several workers over parts of the input are combined with
+``merge``. Pickling a rollup, e.g. to return it from a worker process, loads
+any spilled partials back into memory.
+"""
+import hashlib
+import math
+import os
+import pickle
+import shutil
+import tempfile
+import weakref
+
+from .batch import COERCE, RAISE
+from .domain_utils import _subparts, parse_url
+
+ETLD1 = 'etld1'
+SUBPARTS = 'subparts'
+
+# The name of the ``distinct`` field holding the hostname of each url
+HOSTNAME = 'hostname'
+
+_URL_ERRORS = (ValueError, TypeError, AttributeError)
+
+
+def _hash(value):
+    digest = hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class _Distinct(object):
+    # A set of values until it holds more than ``limit`` of them, then a
+    # HyperLogLog sketch of ``2 ** precision`` one byte registers.
+    __slots__ = ('values', 'registers')
+
+    def __init__(self):
+        self.values = set()
+        self.registers = None
+
+    def _to_sketch(self, precision):
+        self.registers = bytearray(2 ** precision)
+        for value in self.values:
+            self._add_hash(_hash(value))
+        self.values = None
+
+    def _add_hash(self, hashed):
+        registers = self.registers
+        bits = 64 - (len(registers).bit_length() - 1)
+        index = hashed >> bits
+        rank = bits - (hashed & ((1 << bits) - 1)).bit_length() + 1
+        if rank > registers[index]:
+            registers[index] = rank
+
+    def add(self, value, limit, precision):
+        if self.registers is None:
+            self.values.add(value)
+            if len(self.values) > limit:
+                self._to_sketch(precision)
+        else:
+            self._add_hash(_hash(value))
+
+    def copy(self):
+        distinct = _Distinct()
+        if self.registers is None:
+            distinct.values = set(self.values)
+        else:
+            distinct.values = None
+            distinct.registers = bytearray(self.registers)
+        return distinct
+
+    def merge(self, other, limit, precision):
+        if other.registers is None:
+            if len(other.values) > limit:
+                raise ValueError('Distinct counts of different exact limits can not be merged')
+            for value in other.values:
+                self.add(value, limit, precision)
+            return
+        if len(other.registers) != 2 ** precision:
+            raise ValueError('Distinct counts of different precisions can not be merged')
+        if self.registers is None:
+            self._to_sketch(precision)
+        registers = self.registers
+        for i, rank in enumerate(other.registers):
+            if rank > registers[i]:
+                registers[i] = rank
+
+    def estimate(self):
+        if self.registers is None:
+            return len(self.values)
+        registers = self.registers
+        m = len(registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -rank for rank in registers)
+        zeros = registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class _Aggregate(object):
+    __slots__ = ('count', 'sums', 'distinct')
+
+    def __init__(self, sums, distinct):
+        self.count = 0
+        self.sums = [0] * sums
+        self.distinct = [_Distinct() for _ in range(distinct)]
+
+    def copy(self):
+        aggregate = _Aggregate(0, 0)
+        aggregate.count = self.count
+        aggregate.sums = list(self.sums)
+        aggregate.distinct = [distinct.copy() for distinct in self.distinct]
+        return aggregate
+
+
+class Rollup(object):
+    """
+    Running aggregates of url records grouped by eTLD+1.
+
+    Parameters
+    ----------
+    url_field : string, optional
+        The record field holding the url. Default is ``url``.
+    key : string, optional
+        ``etld1`` to group by the eTLD+1 of the url, in a ``etld1`` column,
+        or ``subparts`` to count each record under every
+        ``hostname_subparts`` of its url, in a ``domain`` column. Records
+        whose url has no subparts, e.g. ``about:blank`` or
+        ``http://localhost/``, are counted under its eTLD+1, ``''`` and
+        ``localhost`` there, so every record is counted under its eTLD+1
+        in both cases. Default is ``etld1``.
+    site_field : string, optional
+        A record field holding a top level url. If given, records are also
+        grouped by its eTLD+1, in a ``site`` column.
+    by : list (string), optional
+        Further record fields to group by, as they are.
+    sums : list (string), optional
+        Numeric record fields to sum. Missing and empty values are skipped
+        and strings are converted with ``float``.
+    distinct : list (string), optional
+        Record fields to count the distinct values of, in
+        ``distinct_<field>`` columns. ``hostname`` counts the distinct
+        hostnames of the urls.
+    max_keys : int, optional
+        The number of keys to hold in memory before spilling to disk.
+        ``None`` never spills. Default is 1000000.
+    partitions : int, optional
+        The number of spill files. Merging spilled partials holds about
+        ``1 / partitions`` of all keys in memory at a time. Default is 16.
+    exact_limit : int, optional
+        The number of distinct values per key and field counted exactly.
+        Default is 64.
+    precision : int, optional
+        HyperLogLog sketches have ``2 ** precision`` registers, with a
+        standard error of about ``1.04 / sqrt(2 ** precision)``.
+        Default is 10, about 3%.
+    errors : string, optional
+        If ``raise``, a record with a malformed url raises. If ``coerce``,
+        its key is ``None``. Default is ``raise``.
+    extractor : tldextract::TLDExtract or SuffixTrie, optional
+        An (optional) tldextract::TLDExtract or SuffixTrie instance,
+        otherwise the shared extractor is used.
+    """
+
+    def __init__(
+            self,
+            url_field='url',
+            key=ETLD1,
+            site_field=None,
+            by=(),
+            sums=(),
+            distinct=(),
+            max_keys=1000000,
+            partitions=16,
+            exact_limit=64,
+            precision=10,
+            errors=RAISE,
+            extractor=None):
+        if key not in (ETLD1, SUBPARTS):
+            raise ValueError(f"key must be '{ETLD1}' or '{SUBPARTS}', not {key!r}")
+        if errors not in (RAISE, COERCE):
+            raise ValueError(f"errors must be '{RAISE}' or '{COERCE}', not {errors!r}")
+        if not 4 <= precision <= 16:
+            raise ValueError('precision must be between 4 and 16')
+        self.url_field = url_field
+        self.key = key
+        self.site_field = site_field
+        self.by = list(by)
+        self.sums = list(sums)
+        self.distinct = list(distinct)
+        self.max_keys = max_keys
+        self.partitions = partitions
+        self.exact_limit = exact_limit
+        self.precision = precision
+        self.errors = errors
+        self.extractor = extractor
+        self._aggregates = {}
+        self._spill_dir = None
+        self._finalizer = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_aggregates'] = dict(self.partials())
+        state['_spill_dir'] = None
+        state['_finalizer'] = None
+        return state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Delete any spill files. The rollup is empty afterwards."""
+        self._aggregates = {}
+        if self._finalizer is not None:
+            self._finalizer()
+        self._spill_dir = None
+        self._finalizer = None
+
+    @property
+    def spilled(self):
+        """Whether partial aggregates have been spilled to disk."""
+        return self._spill_dir is not None
+
+    def _parse(self, url):
+        if self.extractor is None:
+            return parse_url(url)
+        return parse_url(url, extractor=self.extractor)
+
+    def _keys(self, record):
+        # The group keys of a record and the hostname of its url
+        try:
+            parsed = self._parse(record.get(self.url_field))
+            parts = parsed._extract()
+            hostname = parsed._lookup_hostname()
+            if self.key == ETLD1:
+                domains = [parsed.etld1]
+            else:
+                domains = _subparts(parts, False) or [parsed.etld1]
+            site = None
+            if self.site_field is not None:
+                site = self._parse(record.get(self.site_field)).etld1
+        except _URL_ERRORS:
+            if self.errors == RAISE:
+                raise
+            return [None], None
+        extra = tuple(record.get(field) for field in self.by)
+        if self.site_field is not None:
+            extra = (site,) + extra
+        return [(domain,) + extra for domain in domains], hostname
+
+    def _aggregate(self, key):
+        aggregate = self._aggregates.get(key)
+        if aggregate is None:
+            if self.max_keys is not None and len(self._aggregates) >= self.max_keys:
+                self._spill()
+            aggregate = self._aggregates[key] = _Aggregate(len(self.sums), len(self.distinct))
+        return aggregate
+
+    def add(self, record):
+        """
+        Add one record.
+
+        Parameters
+        ----------
+        record : mapping
+            A dict-like record with at least the ``url_field``.
+        """
+        keys, hostname = self._keys(record)
+        sums = []
+        for field in self.sums:
+            value = record.get(field)
+            if isinstance(value, str):
+                value = float(value) if value else None
+            sums.append(value)
+        distinct = [
+            hostname if field == HOSTNAME else record.get(field) for field in self.distinct]
+        for key in keys:
+            aggregate = self._aggregate(key)
+            aggregate.count += 1
+            for i, value in enumerate(sums):
+                if value is not None:
+                    aggregate.sums[i] += value
+            for i, value in enumerate(distinct):
+                if value is not None:
+                    aggregate.distinct[i].add(value, self.exact_limit, self.precision)
+
+    def update(self, records):
+        """Add each record of an iterable of records."""
+        for record in records:
+            self.add(record)
+
+    def _merge_aggregate(self, key, other, copy=False):
+        # ``copy`` if ``other`` belongs to another rollup, which must not
+        # change with this one
+        aggregate = self._aggregates.get(key)
+        if aggregate is None:
+            if self.max_keys is not None and len(self._aggregates) >= self.max_keys:
+                self._spill()
+            self._aggregates[key] = other.copy() if copy else other
+            return
+        aggregate.count += other.count
+        for i, value in enumerate(other.sums):
+            aggregate.sums[i] += value
+        for distinct, other_distinct in zip(aggregate.distinct, other.distinct):
+            distinct.merge(other_distinct, self.exact_limit, self.precision)
+
+    def merge(self, other):
+        """
+        Add the partial aggregates of another rollup into this one.
+
+        ``other`` must have the same ``key``, ``site_field``, ``by``,
+        ``sums``, ``distinct``, ``exact_limit`` and ``precision``. It is
+        not changed.
+        """
+        if (other.key, other.site_field, other.by, other.sums, other.distinct) != \
+                (self.key, self.site_field, self.by, self.sums, self.distinct):
+            raise ValueError('Only rollups of the same fields can be merged')
+        if (other.exact_limit, other.precision) != (self.exact_limit, self.precision):
+            raise ValueError('Only rollups of the same exact_limit and precision can be merged')
+        for key, aggregate in other.partials():
+            self._merge_aggregate(key, aggregate, copy=True)
+
+    def _partition_path(self, partition):
+        return os.path.join(self._spill_dir, f'{partition}.pickle')
+
+    def _spill(self):
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix='domain_utils-rollup-')
+            self._finalizer = weakref.finalize(self, shutil.rmtree, self._spill_dir, True)
+        chunks = [[] for _ in range(self.partitions)]
+        for item in self._aggregates.items():
+            chunks[hash(item[0]) % self.partitions].append(item)
+        for partition, chunk in enumerate(chunks):
+            if chunk:
+                with open(self._partition_path(partition), 'ab') as f:
+                    pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self._aggregates = {}
+
+    def _load_partition(self, partition):
+        path = self._partition_path(partition)
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb') as f:
+            while True:
+                try:
+                    yield from pickle.load(f)
+                except EOFError:
+                    return
+
+    def partials(self):
+        """
+        Yield every key with its partial aggregate.
+
+        Spilled keys are merged one partition at a time.
+        """
+        if self._spill_dir is None:
+            yield from self._aggregates.items()
+            return
+        if self._aggregates:
+            self._spill()
+        for partition in range(self.partitions):
+            merged = Rollup(
+                key=self.key, site_field=self.site_field, by=self.by, sums=self.sums,
+                distinct=self.distinct, max_keys=None, exact_limit=self.exact_limit,
+                precision=self.precision)
+            for key, aggregate in self._load_partition(partition):
+                merged._merge_aggregate(key, aggregate)
+            yield from merged._aggregates.items()
+
+    def _columns(self):
+        columns = [ETLD1 if self.key == ETLD1 else 'domain']
+        if self.site_field is not None:
+            columns.append('site')
+        return columns + self.by
+
+    def rows(self):
+        """
+        Yield one dict per key.
+
+        Each dict has the key columns, ``count``, one column per ``sums``
+        field and a ``distinct_<field>`` column per ``distinct`` field.
+        """
+        columns = self._columns()
+        for key, aggregate in self.partials():
+            if key is None:
+                row = dict.fromkeys(columns)
+            else:
+                row = dict(zip(columns, key))
+            row['count'] = aggregate.count
+            row.update(zip(self.sums, aggregate.sums))
+            for field, distinct in zip(self.distinct, aggregate.distinct):
+                row[f'distinct_{field}'] = distinct.estimate()
+            yield row
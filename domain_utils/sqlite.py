@@ -0,0 +1,124 @@
+"""
+SQL functions over urls for SQLite databases, such as OpenWPM's
+``crawl-data.sqlite``.
+
+``register`` installs the functions on a connection, so urls are processed
+inside the database rather than read into Python and written back::
+
+    conn = sqlite3.connect('crawl-data.sqlite')
+    register(conn)
+    conn.execute('''
+        SELECT etld1(url), count(*) FROM http_requests
+        GROUP BY 1 ORDER BY 2 DESC
+    ''')
+
+On Python 3.8 and later the functions are registered as deterministic, so
+they can be used in expression indexes and generated columns::
+
+    CREATE INDEX http_requests_etld1 ON http_requests (etld1(url));
+
+Every connection that reads such an index or column must register the
+functions with the same suffix list.
+"""
+import sys
+
+from .batch import _URL_ERRORS, COERCE, RAISE
+from .domain_utils import HTTP, NO_SCHEME, _join_etld1, get_extractor, get_scheme, parse_url
+
+DEFAULT_CACHE_SIZE = 2 ** 16
+
+# ``create_function`` takes ``deterministic`` from Python 3.8
+_FUNCTION_OPTIONS = {'deterministic': True} if sys.version_info >= (3, 8) else {}
+
+
+def _null_safe(function, errors):
+    # SQL NULL arguments give NULL, and so do malformed urls when coercing
+    def sql_function(url, *args):
+        if url is None:
+            return None
+        try:
+            return function(url, *args)
+        except _URL_ERRORS:
+            if errors == RAISE:
+                raise
+            return None
+    return sql_function
+
+
+def register(conn, extractor=None, errors=COERCE, cache_size=DEFAULT_CACHE_SIZE):
+    """
+    Install the domain_utils SQL functions on a connection.
+
+    The functions are:
+
+    * ``etld1(url)``: ``get_etld1``.
+    * ``stem_url(url[, return_unparsed[, scheme_default[, parse_ws[, scheme
+      [, path[, use_netloc]]]]]])``: ``stem_url``, with the arguments in the
+      same order. Booleans are SQL integers, e.g. ``stem_url(url, 1, 'http',
+      1, 1)`` to keep the scheme.
+    * ``url_port(url)``: ``get_port``.
+    * ``url_scheme(url)``: ``get_scheme``.
+    * ``is_third_party(url, top_level_url)``: ``is_third_party``, as 0 or 1.
+
+    A NULL url gives NULL.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        The connection to install the functions on.
+    extractor : tldextract::TLDExtract or SuffixTrie, optional
+        The extractor the functions use. Default is the shared extractor at
+        the time of registration, so results do not change if it is replaced
+        later.
+    errors : string, optional
+        If ``coerce``, a malformed url gives NULL. If ``raise``, it fails the
+        statement. Default is ``coerce``.
+    cache_size : int, optional
+        The number of hostname splits the connection's functions keep. The
+        cache is emptied when it is full. Default is 65536.
+    """
+    if errors not in (RAISE, COERCE):
+        raise ValueError(f"errors must be '{RAISE}' or '{COERCE}', not {errors!r}")
+    if extractor is None:
+        extractor = get_extractor()
+    hosts = {}
+
+    def etld1(url):
+        if len(hosts) >= cache_size:
+            hosts.clear()
+        return _join_etld1(parse_url(url, extractor=extractor)._extract(cache=hosts))
+
+    def stem_url(
+            url,
+            return_unparsed=True,
+            scheme_default=HTTP,
+            parse_ws=True,
+            scheme=False,
+            path=True,
+            use_netloc=True):
+        return parse_url(url, scheme_default=scheme_default, extractor=extractor).stem(
+            return_unparsed=bool(return_unparsed),
+            parse_ws=bool(parse_ws),
+            scheme=bool(scheme),
+            path=bool(path),
+            use_netloc=bool(use_netloc),
+        )
+
+    def url_port(url):
+        return parse_url(url, extractor=extractor).port
+
+    def url_scheme(url):
+        return get_scheme(url, no_scheme=NO_SCHEME)
+
+    def is_third_party(url, top_level_url):
+        if top_level_url is None:
+            return None
+        return int(etld1(url) != etld1(top_level_url))
+
+    for name, narg, function in [
+            ('etld1', 1, etld1),
+            ('stem_url', -1, stem_url),
+            ('url_port', 1, url_port),
+            ('url_scheme', 1, url_scheme),
+            ('is_third_party', 2, is_third_party)]:
+        conn.create_function(name, narg, _null_safe(function, errors), **_FUNCTION_OPTIONS)
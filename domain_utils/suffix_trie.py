@@ -0,0 +1,405 @@
+import struct
+import sys
+import threading
+import zlib
+from collections import OrderedDict
+
+import idna
+from tldextract.remote import SCHEME_RE, looks_like_ip
+from tldextract.tldextract import ExtractResult
+
+# Flags are stored on each inner trie node under the ``None`` key, which
+# can never collide with a hostname label.
+RULE = 1
+EXCEPTION = 2
+WILDCARD = 4
+PRIVATE = 8
+
+_FLAGS = None
+_PRIVATE_MARKER = '===BEGIN PRIVATE DOMAINS==='
+
+# The wire format of ``SuffixTrie.dumps``: magic, format version (u16) and
+# CRC32 of the payload (u32), little endian, then the zlib compressed UTF-8
+# rules, ICANN rules first, one per line, then the private rules after a
+# ``// ===BEGIN PRIVATE DOMAINS===`` line
+WIRE_MAGIC = b'DUSFX\0'
+WIRE_VERSION = 1
+
+_WIRE_HEADER = struct.Struct('<6sHI')
+
+# The roots of the tries most recently loaded from the wire format in this
+# process, by their serialized bytes. Loaded tries share them until a rule
+# is added.
+LOADED_CACHE_SIZE = 4
+_loaded = OrderedDict()
+_loaded_lock = threading.Lock()
+
+
+def _decode_label(label):
+    # ``label`` is already lowercased
+    if label.startswith('xn--'):
+        try:
+            return idna.decode(label.encode('ascii')).lower()
+        except UnicodeError:
+            pass
+    return label
+
+
+def _hostname(url):
+    # Mirrors how tldextract::TLDExtract isolates the hostname of a url
+    return SCHEME_RE.sub('', url) \
+        .partition('/')[0] \
+        .partition('?')[0] \
+        .partition('#')[0] \
+        .split('@')[-1] \
+        .partition(':')[0] \
+        .strip() \
+        .rstrip('.')
+
+
+class SuffixTrie(object):
+    """
+    A public suffix matcher backed by a trie of reversed hostname labels.
+
+    A ``SuffixTrie`` is a drop-in replacement for tldextract::TLDExtract
+    wherever domain_utils accepts an ``extractor`` keyword argument. It
+    returns the same results as a ``TLDExtract`` built from the same list,
+    but walks at most one trie node per hostname label instead of probing
+    a set with every candidate suffix string.
+
+    Parameters
+    ----------
+    rules : iterable of (string, boolean)
+        Public Suffix List rules, e.g. ``*.ck`` or ``!www.ck``, each paired
+        with whether it comes from the private section of the list.
+    """
+
+    def __init__(self, rules=()):
+        self._root = {}
+        self._wire = None
+        # Whether ``_root`` may be shared with other tries, and must be
+        # copied before it is changed
+        self._shared = False
+        for rule, private in rules:
+            self.add_rule(rule, private)
+
+    def __reduce__(self):
+        return (_load_wire, (self.dumps(),))
+
+    @classmethod
+    def _sharing(cls, root, wire):
+        # A trie over the nodes of another, copied before its first change
+        trie = cls.__new__(cls)
+        trie._root = root
+        trie._wire = wire
+        trie._shared = True
+        return trie
+
+    def __copy__(self):
+        # Both tries copy the nodes before their next change
+        self._shared = True
+        return self._sharing(self._root, self._wire)
+
+    def __deepcopy__(self, memo):
+        return self.__copy__()
+
+    @classmethod
+    def from_text(cls, text, include_private=True):
+        """
+        Build a trie from the text of a Public Suffix List.
+
+        Parameters
+        ----------
+        text : string
+            Contents of a ``public_suffix_list.dat`` file.
+        include_private : boolean, optional
+            If ``False``, rules from the private section of the list, such as
+            ``cloudfront.net``, are skipped. Default is ``True``.
+
+        Returns
+        -------
+        SuffixTrie
+        """
+        return cls(parse_suffix_list(text, include_private=include_private))
+
+    @classmethod
+    def from_file(cls, path, include_private=True):
+        """Build a trie from a Public Suffix List file. See ``from_text``."""
+        with open(path, encoding='utf-8') as suffix_list:
+            return cls.from_text(suffix_list.read(), include_private=include_private)
+
+    def add_rule(self, rule, private=False):
+        """
+        Add a single Public Suffix List rule to the trie.
+
+        Parameters
+        ----------
+        rule : string
+            A rule such as ``com``, ``*.ck`` or ``!www.ck``.
+        private : boolean, optional
+            Whether the rule comes from the private section of the list.
+        """
+        self._wire = None
+        if self._shared:
+            self._root = _copy_nodes(self._root)
+            self._shared = False
+        flag = RULE
+        if rule.startswith('!'):
+            flag = EXCEPTION
+            rule = rule[1:]
+        labels = rule.split('.')
+        if flag == RULE and labels[0] == '*' and len(labels) > 1:
+            flag = WILDCARD
+            labels = labels[1:]
+        flag |= PRIVATE if private else 0
+        # Leaf nodes are stored as their bare flags, which are small ints
+        # shared by the interpreter, and only become dicts once a longer
+        # rule passes through them.
+        node = self._root
+        for label in reversed(labels[1:]):
+            child = node.get(label)
+            if not isinstance(child, dict):
+                child = {_FLAGS: child} if child else {}
+                node[sys.intern(label)] = child
+            node = child
+        child = node.get(labels[0])
+        if isinstance(child, dict):
+            child[_FLAGS] = child.get(_FLAGS, 0) | flag
+        else:
+            node[sys.intern(labels[0])] = (child or 0) | flag
+
+    def rules(self):
+        """
+        Yield the rules of the trie.
+
+        Rules ending at the same label share their ``private`` flag, so a
+        rule added as ICANN can come back as private if a private rule ends
+        at the same label, e.g. ``*.ck`` and ``ck``.
+
+        Yields
+        ------
+        tuple (string, boolean)
+            ``(rule, private)`` pairs, in no particular order.
+        """
+        stack = [((), self._root)]
+        while stack:
+            labels, node = stack.pop()
+            for label, child in node.items():
+                if label is _FLAGS:
+                    continue
+                path = (label,) + labels
+                if isinstance(child, dict):
+                    stack.append((path, child))
+                    flags = child.get(_FLAGS, 0)
+                else:
+                    flags = child
+                name = '.'.join(path)
+                private = bool(flags & PRIVATE)
+                if flags & RULE:
+                    yield name, private
+                if flags & WILDCARD:
+                    yield f'*.{name}', private
+                if flags & EXCEPTION:
+                    yield f'!{name}', private
+
+    def dumps(self):
+        """
+        Serialize the trie to a compact, versioned byte string.
+
+        The bytes hold the compressed rules, about a fifth of the size of
+        the Public Suffix List, and are the same for tries of the same
+        rules. Pickling a ``SuffixTrie`` uses this format, so sending one to
+        Spark, Dask or multiprocessing workers is cheap.
+
+        Returns
+        -------
+        bytes
+        """
+        if self._wire is None:
+            icann, private = [], []
+            for rule, is_private in self.rules():
+                (private if is_private else icann).append(rule)
+            text = '\n'.join(sorted(icann) + [f'// {_PRIVATE_MARKER}'] + sorted(private))
+            payload = zlib.compress(text.encode('utf-8'))
+            header = _WIRE_HEADER.pack(WIRE_MAGIC, WIRE_VERSION, zlib.crc32(payload))
+            self._wire = header + payload
+        return self._wire
+
+    @classmethod
+    def loads(cls, data):
+        """
+        Rebuild a trie from the bytes of ``dumps``.
+
+        The few most recently loaded lists are kept per process, so loading
+        one again, e.g. when every task of a Spark executor unpickles the
+        same trie, returns a new trie sharing the nodes already built. The
+        nodes are copied the first time a rule is added to it.
+
+        Parameters
+        ----------
+        data : bytes
+            The output of ``dumps``.
+
+        Returns
+        -------
+        SuffixTrie
+
+        Raises
+        ------
+        ValueError
+            If ``data`` is not in the wire format, is of another format
+            version or is corrupt.
+        """
+        data = bytes(data)
+        if len(data) < _WIRE_HEADER.size:
+            raise ValueError('Too short to be a serialized SuffixTrie')
+        magic, version, crc = _WIRE_HEADER.unpack_from(data)
+        if magic != WIRE_MAGIC:
+            raise ValueError('Not a serialized SuffixTrie')
+        if version != WIRE_VERSION:
+            raise ValueError(
+                f'Serialized SuffixTrie has format version {version}, expected {WIRE_VERSION}')
+        payload = memoryview(data)[_WIRE_HEADER.size:]
+        if zlib.crc32(payload) != crc:
+            raise ValueError('Serialized SuffixTrie failed its checksum')
+        # Keyed on the bytes themselves, so that only an identical list can
+        # reuse a cached root, whatever its checksum
+        with _loaded_lock:
+            root = _loaded.get(data)
+            if root is not None:
+                _loaded.move_to_end(data)
+        if root is None:
+            root = SuffixTrie.from_text(zlib.decompress(payload).decode('utf-8'))._root
+            with _loaded_lock:
+                _loaded[data] = root
+                while len(_loaded) > LOADED_CACHE_SIZE:
+                    _loaded.popitem(last=False)
+        return cls._sharing(root, data)
+
+    def _match(self, labels):
+        # Returns the index of the first suffix label and the flags of the
+        # matching rule. Like tldextract, the smallest index for which an
+        # exception, a rule or a wildcard applies wins, in that order of
+        # precedence.
+        suffix_index = len(labels)
+        flags = 0
+        node = self._root
+        for i in range(len(labels) - 1, -1, -1):
+            if node.get(_FLAGS, 0) & WILDCARD:
+                suffix_index, flags = i, node[_FLAGS]
+            child = node.get(labels[i])
+            if child is None:
+                break
+            if isinstance(child, dict):
+                node = child
+                child = node.get(_FLAGS, 0)
+            else:
+                node = None
+            if child & EXCEPTION:
+                suffix_index, flags = i + 1, child
+            elif child & RULE:
+                suffix_index, flags = i, child
+            if node is None:
+                # A leaf of the trie: no longer rule can match
+                if i and child & WILDCARD:
+                    suffix_index, flags = i - 1, child
+                break
+        return suffix_index, flags
+
+    def suffix_index(self, labels):
+        """
+        Returns the index of the first public suffix label.
+
+        Parameters
+        ----------
+        labels : list (string)
+            Lowercased, unicode hostname labels.
+
+        Returns
+        -------
+        int
+            ``len(labels)`` if no suffix is found.
+        """
+        return self._match(labels)[0]
+
+    def __call__(self, url):
+        """
+        Split the hostname of ``url`` into subdomain, domain and suffix.
+
+        Returns
+        -------
+        tldextract::ExtractResult
+        """
+        netloc = _hostname(url)
+        labels = netloc.split('.')
+        lowered = netloc.lower()
+        if 'xn--' in lowered:
+            translations = [_decode_label(label) for label in lowered.split('.')]
+        else:
+            translations = lowered.split('.')
+        suffix_index = self._match(translations)[0]
+
+        suffix = '.'.join(labels[suffix_index:])
+        if not suffix and netloc and looks_like_ip(netloc):
+            return ExtractResult('', netloc, '')
+
+        subdomain = '.'.join(labels[:suffix_index - 1]) if suffix_index else ''
+        domain = labels[suffix_index - 1] if suffix_index else ''
+        return ExtractResult(subdomain, domain, suffix)
+
+    def is_private(self, url):
+        """
+        Whether the public suffix of ``url`` comes from the private section
+        of the Public Suffix List, e.g. ``cloudfront.net``.
+
+        Returns
+        -------
+        boolean
+            ``False`` for ICANN suffixes and for urls without a suffix.
+        """
+        labels = _hostname(url).lower().split('.')
+        labels = [_decode_label(label) for label in labels]
+        return bool(self._match(labels)[1] & PRIVATE)
+
+
+def _copy_nodes(node):
+    return {
+        label: _copy_nodes(child) if isinstance(child, dict) else child
+        for label, child in node.items()}
+
+
+def _load_wire(data):
+    # Unpickles a ``SuffixTrie``
+    return SuffixTrie.loads(data)
+
+
+def parse_suffix_list(text, include_private=True):
+    """
+    Extract the rules from the text of a Public Suffix List.
+
+    Parameters
+    ----------
+    text : string
+        Contents of a ``public_suffix_list.dat`` file.
+    include_private : boolean, optional
+        If ``False``, stop at the start of the private section of the list.
+        Default is ``True``.
+
+    Returns
+    -------
+    list (tuple)
+        ``(rule, private)`` pairs in the order they appear in the list.
+    """
+    rules = []
+    private = False
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith('//'):
+            if _PRIVATE_MARKER in line:
+                if not include_private:
+                    break
+                private = True
+            continue
+        if line:
+            rules.append((line.split()[0], private))
+    return rules
@@ -0,0 +1,194 @@
+"""
+A symbol table of hostnames and eTLD+1s for large crawl tables.
+
+``DomainTable`` interns each distinct hostname and eTLD+1 once and hands out
+small integer ids, so a column of 10^8 urls becomes an 8 byte id per row
+plus one string per distinct host::
+
+    table = DomainTable()
+    host_ids = table.add_many(df.url)
+    df['host_id'] = numpy.frombuffer(host_ids, dtype=numpy.int64)
+    df['etld1_id'] = numpy.frombuffer(table.parents(host_ids), dtype=numpy.int64)
+
+Ids are assigned in order of first appearance, starting at 0. Id arrays are
+``array.array('q')`` of int64, which numpy and pandas wrap without copying.
+"""
+from array import array
+
+from .batch import RAISE, _map_unique
+from .domain_utils import _bracketed_address, _join_etld1, _split_host, get_extractor, parse_url
+
+# The id of a url that failed to parse when ``errors`` is ``coerce``
+MISSING = -1
+
+
+class DomainTable(object):
+    """
+    Interns hostnames and eTLD+1s as integer ids.
+
+    Every hostname id has a parent eTLD+1 id, the ``get_etld1`` of the
+    hostname. Urls that are not parsed, e.g. ``about:blank``, have the empty
+    hostname, whose eTLD+1 is the empty string.
+
+    Parameters
+    ----------
+    extractor : tldextract::TLDExtract or SuffixTrie, optional
+        The extractor to split hostnames with. Default is the shared
+        extractor at the time the table is created.
+    """
+
+    def __init__(self, extractor=None):
+        self.extractor = get_extractor() if extractor is None else extractor
+        self._hostnames = []
+        self._hostname_ids = {}
+        self._etld1s = []
+        self._etld1_ids = {}
+        self._parents = array('q')
+
+    def __len__(self):
+        return len(self._hostnames)
+
+    def __repr__(self):
+        return f'DomainTable({len(self._hostnames)} hostnames, {len(self._etld1s)} eTLD+1s)'
+
+    @property
+    def etld1_count(self):
+        """The number of distinct eTLD+1s."""
+        return len(self._etld1s)
+
+    @property
+    def parent_ids(self):
+        """
+        The eTLD+1 id of every hostname id, as an ``array('q')``.
+
+        It is a copy, so numpy views of it do not stop the table growing.
+        """
+        return array('q', self._parents)
+
+    def add_hostname(self, hostname):
+        """
+        Intern a bare hostname and its eTLD+1.
+
+        Parameters
+        ----------
+        hostname : string
+            A hostname without scheme, user info, port or path. IPv6
+            addresses may be in brackets, e.g. ``[::1]``, and are interned
+            without them, as ``add`` does.
+
+        Returns
+        -------
+        int
+            The hostname id.
+        """
+        try:
+            return self._hostname_ids[hostname]
+        except KeyError:
+            pass
+        address = _bracketed_address(hostname)
+        if address is not None:
+            return self.add_hostname(address)
+        etld1 = _join_etld1(_split_host(self.extractor, hostname))
+        etld1_id = self._etld1_ids.get(etld1)
+        if etld1_id is None:
+            etld1_id = self._etld1_ids[etld1] = len(self._etld1s)
+            self._etld1s.append(etld1)
+        host_id = self._hostname_ids[hostname] = len(self._hostnames)
+        self._hostnames.append(hostname)
+        self._parents.append(etld1_id)
+        return host_id
+
+    def add(self, url):
+        """
+        Intern the hostname of ``url`` and its eTLD+1.
+
+        Parameters
+        ----------
+        url : string
+            The url, parsed as ``get_etld1`` does.
+
+        Returns
+        -------
+        int
+            The hostname id.
+        """
+        hostname = parse_url(url, extractor=self.extractor)._lookup_hostname()
+        return self.add_hostname('' if hostname is None else hostname)
+
+    def add_many(self, urls, errors=RAISE):
+        """
+        Intern the hostname of each url in ``urls``.
+
+        Parameters
+        ----------
+        urls : iterable (string)
+            The urls to intern.
+        errors : string, optional
+            If ``raise``, a malformed url raises. If ``coerce``, its id is
+            ``MISSING`` (-1) instead. Default is ``raise``.
+
+        Returns
+        -------
+        array.array('q')
+            The hostname id of each url, in input order.
+        """
+        return array('q', _map_unique(self.add, urls, errors, MISSING))
+
+    def hostname_id(self, hostname):
+        """The id of an interned hostname. Raises ``KeyError`` if it is not."""
+        return self._hostname_ids[hostname]
+
+    def etld1_id(self, etld1):
+        """The id of an interned eTLD+1. Raises ``KeyError`` if it is not."""
+        return self._etld1_ids[etld1]
+
+    def hostname(self, host_id):
+        """The hostname with id ``host_id``."""
+        return self._hostnames[host_id]
+
+    def etld1(self, etld1_id):
+        """The eTLD+1 with id ``etld1_id``."""
+        return self._etld1s[etld1_id]
+
+    def parent(self, host_id):
+        """The eTLD+1 id of the hostname with id ``host_id``."""
+        return self._parents[host_id]
+
+    def parents(self, host_ids):
+        """
+        The eTLD+1 id of each hostname id in ``host_ids``.
+
+        Parameters
+        ----------
+        host_ids : iterable (int)
+            Hostname ids, e.g. from ``add_many``. ``MISSING`` stays missing.
+
+        Returns
+        -------
+        array.array('q')
+        """
+        parents = self._parents
+        return array('q', [
+            MISSING if host_id == MISSING else parents[host_id] for host_id in host_ids])
+
+    def hostnames(self, host_ids):
+        """
+        The hostname of each id in ``host_ids``, ``None`` for ``MISSING``.
+
+        Returns
+        -------
+        list (string)
+        """
+        hostnames = self._hostnames
+        return [None if host_id == MISSING else hostnames[host_id] for host_id in host_ids]
+
+    def etld1s(self, etld1_ids):
+        """
+        The eTLD+1 of each id in ``etld1_ids``, ``None`` for ``MISSING``.
+
+        Returns
+        -------
+        list (string)
+        """
+        etld1s = self._etld1s
+        return [None if etld1_id == MISSING else etld1s[etld1_id] for etld1_id in etld1_ids]
@@ -11,9 +11,15 @@ with open('HISTORY.rst') as history_file:
     history = history_file.read()
 
 requirements = [
-    'tldextract==2.2.2'
+    'idna',
+    'tldextract==2.2.2',
 ]
 
+extras_requirements = {
+    'pandas': ['pandas'],
+    'arrow': ['pyarrow'],
+}
+
 setup(
     author="Sarah Bird",
     author_email='sbird@mozilla.com',
@@ -28,8 +34,14 @@ setup(
         'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
     ],
+    entry_points={
+        'console_scripts': [
+            'domain_utils=domain_utils.cli:main',
+        ],
+    },
     description="A collection of util functions for extracting domains from urls.",
     install_requires=requirements,
+    extras_require=extras_requirements,
     license="MPL 2.0",
     long_description=readme + '\n\n' + history,
     include_package_data=True,
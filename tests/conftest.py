@@ -1,7 +1,15 @@
 import pytest
+from domain_utils import get_extractor, set_extractor
 from tldextract import TLDExtract
 
 
+@pytest.fixture
+def restore_shared_extractor():
+    original = get_extractor()
+    yield
+    set_extractor(original)
+
+
 @pytest.fixture
 def custom_extractor(tmp_path):
     local_list_location = tmp_path / "list.txt"
@@ -0,0 +1,105 @@
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+from domain_utils import get_etld1, get_port, stem_url  # noqa: E402
+from domain_utils.arrow import (  # noqa: E402
+    _by_host,
+    get_etld1_arrow,
+    get_port_arrow,
+    get_scheme_arrow,
+    stem_url_arrow,
+)
+
+URLS = [
+    'https://my.domain.cloudfront.net/a/path?a=1',
+    'http://www.google.com#anchor',
+    None,
+    'about:blank',
+    'example.com:8080/path',
+    'http://www.google.com#anchor',
+    'wss://www.google.com/socket',
+]
+
+
+def test_get_etld1_arrow():
+    result = get_etld1_arrow(pa.array(URLS))
+    assert pa.types.is_dictionary(result.type)
+    assert result.to_pylist() == [None if url is None else get_etld1(url) for url in URLS]
+    # google.com appears three times but once in the dictionary
+    assert result.dictionary.to_pylist().count('google.com') == 1
+
+
+def test_stem_url_arrow():
+    result = stem_url_arrow(pa.array(URLS), scheme=True)
+    assert result.type == pa.string()
+    assert result.to_pylist() == [
+        None if url is None else stem_url(url, scheme=True) for url in URLS]
+
+
+def test_get_port_arrow():
+    result = get_port_arrow(pa.array(URLS))
+    assert result.type == pa.int32()
+    assert result.to_pylist() == [None if url is None else get_port(url) for url in URLS]
+
+
+def test_get_scheme_arrow():
+    result = get_scheme_arrow(pa.array(URLS))
+    assert result.to_pylist() == [
+        'https', 'http', None, 'about', 'example.com', 'http', 'wss']
+
+
+def test_chunked_array():
+    urls = pa.chunked_array([URLS[:3], URLS[3:]])
+    result = get_etld1_arrow(urls)
+    assert isinstance(result, pa.ChunkedArray)
+    assert result.num_chunks == 2
+    assert result.to_pylist() == [None if url is None else get_etld1(url) for url in URLS]
+
+
+def test_empty_chunked_array():
+    result = get_port_arrow(pa.chunked_array([], type=pa.string()))
+    assert result.type == pa.int32()
+    assert len(result) == 0
+
+
+def test_dictionary_input():
+    urls = pa.array(URLS).dictionary_encode()
+    assert get_etld1_arrow(urls).to_pylist() == get_etld1_arrow(pa.array(URLS)).to_pylist()
+
+
+def test_errors_coerced_to_null():
+    urls = pa.array(['http://[::1/path', 'http://www.google.com'])
+    with pytest.raises(ValueError):
+        get_etld1_arrow(urls)
+    assert get_etld1_arrow(urls, errors='coerce').to_pylist() == [None, 'google.com']
+    with pytest.raises(ValueError):
+        get_scheme_arrow(urls)
+    assert get_scheme_arrow(urls, errors='coerce').to_pylist() == [None, 'http']
+
+
+def test_urls_are_encoded_by_host():
+    urls = [
+        'https://www.google.com/a?x=1',
+        'https://www.google.com/b#c',
+        'https://www.google.com:8443/a',
+        'HTTP://WWW.Google.com/a',
+        'http://[::1]:8080/x',
+        'https://bücher.de/a',
+        'https://bücher.de/b',
+        'http://a.com/\tx',
+        'ws://localhost:5000/socket',
+        'data:text/plain,x',
+        None,
+    ]
+    hosts = _by_host(pa.array(urls))
+    assert hosts.dictionary.to_pylist()[:2] == [
+        'https://www.google.com', 'https://www.google.com:8443']
+    # Only plain urls, not the Unicode ones, share an entry
+    assert len(hosts.dictionary) == 9
+    expected = [None if url is None else get_etld1(url) for url in urls]
+    assert get_etld1_arrow(pa.array(urls)).to_pylist() == expected
+    assert get_etld1_arrow(pa.array(urls).dictionary_encode()).to_pylist() == expected
+    assert get_port_arrow(pa.array(urls)).to_pylist() == [
+        None if url is None else get_port(url) for url in urls]
+    assert get_scheme_arrow(pa.array(urls)).to_pylist()[:5] == [
+        'https', 'https', 'https', 'http', 'http']
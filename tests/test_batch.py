@@ -0,0 +1,121 @@
+import pytest
+from domain_utils import (
+    SuffixTrie,
+    get_etld1,
+    get_etld1_many,
+    get_port_many,
+    hostname_subparts,
+    hostname_subparts_many,
+    is_third_party,
+    is_third_party_many,
+    stem_url,
+    stem_url_many,
+)
+
+URLS = [
+    'https://my.domain.cloudfront.net/a/path?a=1',
+    'http://www.google.com#anchor',
+    'https://my.domain.cloudfront.net/other',
+    'about:blank',
+    'example.com:8080/path',
+    'http://127.0.0.1/foo.html',
+    'http://www.google.com#anchor',
+    'foo.com?x=1',
+]
+
+
+def test_get_etld1_many_matches_get_etld1():
+    assert get_etld1_many(URLS) == [get_etld1(url) for url in URLS]
+
+
+def test_stem_url_many_matches_stem_url():
+    assert stem_url_many(URLS, scheme=True) == [stem_url(url, scheme=True) for url in URLS]
+
+
+def test_hostname_subparts_many_matches_hostname_subparts():
+    result = hostname_subparts_many(URLS, include_ps=True)
+    assert result == [hostname_subparts(url, include_ps=True) for url in URLS]
+
+
+def test_get_port_many():
+    assert get_port_many(['example.com:5000', 'ws://example.com:80', 'domain.net']) == [
+        5000, 80, None]
+
+
+def test_accepts_generator():
+    assert get_etld1_many(url for url in URLS[:2]) == ['domain.cloudfront.net', 'google.com']
+
+
+def test_each_host_is_extracted_once():
+    calls = []
+
+    class CountingTrie(SuffixTrie):
+        def __call__(self, url):
+            calls.append(url)
+            return super().__call__(url)
+
+    trie = CountingTrie([('com', False)])
+    result = get_etld1_many(
+        ['http://a.domain.com/1', 'http://a.domain.com/2', 'https://a.domain.com/3'],
+        extractor=trie)
+    assert result == ['domain.com'] * 3
+    assert len(calls) == 1
+
+
+def test_malformed_url_raises_by_default():
+    with pytest.raises(ValueError):
+        get_etld1_many(['http://www.google.com', 'http://[::1/path'])
+
+
+def test_malformed_url_coerced():
+    result = get_etld1_many(['http://[::1/path', 'http://www.google.com', None], errors='coerce')
+    assert result == [None, 'google.com', None]
+
+
+def test_invalid_port_coerced_to_default():
+    assert get_port_many(['http://a.com:abc', 'http://a.com:1'], errors='coerce', default=-1) == [
+        -1, 1]
+
+
+def test_unhashable_value_coerced():
+    assert stem_url_many([['a'], 'http://a.com/x'], errors='coerce') == [None, 'a.com/x']
+
+
+def test_unknown_error_policy():
+    with pytest.raises(ValueError):
+        get_etld1_many(URLS, errors='ignore')
+
+
+def test_is_third_party():
+    assert is_third_party('https://cdn.example.com/a.js', 'https://www.example.com/') is False
+    assert is_third_party('https://tracker.net/p.gif', 'https://www.example.com/') is True
+    assert is_third_party('http://127.0.0.1/a', 'http://127.0.0.1:8080/') is False
+    assert is_third_party('about:blank', 'https://www.example.com/') is True
+
+
+def test_is_third_party_many():
+    urls = [
+        'https://cdn.example.com/a.js',
+        'https://tracker.net/p.gif',
+        'http://[::1/x',
+        'about:blank',
+        'https://tracker.net/q.gif',
+    ]
+    top_level_urls = [
+        'https://www.example.com/',
+        'https://www.example.com/',
+        'https://www.example.com/',
+        'about:srcdoc',
+        'https://tracker.net/',
+    ]
+    result = is_third_party_many(urls, top_level_urls, errors='coerce', default='bad')
+    assert result == [False, True, 'bad', False, False]
+    assert result == [
+        'bad' if url == 'http://[::1/x' else is_third_party(url, top_level_url)
+        for url, top_level_url in zip(urls, top_level_urls)
+    ]
+
+
+def test_is_third_party_many_length_mismatch():
+    with pytest.raises(ValueError):
+        is_third_party_many(['http://a.com'], [])
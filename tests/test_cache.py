@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+from domain_utils import (
+    SuffixTrie,
+    cache_clear,
+    cache_info,
+    get_etld1,
+    get_etld1_many,
+    hostname_subparts,
+    set_cache_size,
+    set_extractor,
+)
+
+
+@pytest.fixture
+def empty_cache():
+    cache_clear()
+    yield
+    set_cache_size()
+
+
+def test_repeated_host_hits_cache(empty_cache):
+    get_etld1('http://www.google-analytics.com/collect?v=1')
+    get_etld1('https://www.google-analytics.com/analytics.js')
+    hostname_subparts('http://www.google-analytics.com/')
+    info = cache_info()
+    assert info.misses == 1
+    assert info.hits == 2
+    assert info.currsize == 1
+
+
+def test_port_and_user_info_share_cache_entry(empty_cache):
+    get_etld1('http://www.google.com')
+    get_etld1('http://user@www.google.com:8080/path')
+    assert cache_info().currsize == 1
+
+
+def test_equivalent_hostnames_share_cache_entry(empty_cache):
+    urls = [
+        'http://www.bücher.de/',
+        'http://WWW.Bücher.DE./',
+        'http://www.xn--bcher-kva.de/',
+        'http://WWW.XN--BCHER-KVA.DE',
+    ]
+    assert [get_etld1(url) for url in urls] == [
+        'bücher.de', 'Bücher.DE', 'xn--bcher-kva.de', 'XN--BCHER-KVA.DE']
+    info = cache_info()
+    assert info.misses == 1
+    assert info.currsize == 1
+
+
+def test_eviction(empty_cache):
+    set_cache_size(2)
+    for url in ['http://a.com', 'http://b.com', 'http://c.com', 'http://a.com']:
+        get_etld1(url)
+    info = cache_info()
+    assert info.maxsize == 2
+    assert info.currsize == 2
+    assert info.misses == 4
+
+
+def test_explicit_extractor_bypasses_cache(empty_cache):
+    get_etld1('http://www.google.com', extractor=SuffixTrie([('com', False)]))
+    assert cache_info().currsize == 0
+
+
+def test_replacing_extractor_clears_cache(empty_cache, restore_shared_extractor):
+    assert get_etld1('http://foo.bar.moz.illa') == 'illa'
+    set_extractor(SuffixTrie([('moz.illa', False)]))
+    assert cache_info().currsize == 0
+    assert get_etld1('http://foo.bar.moz.illa') == 'bar.moz.illa'
+
+
+def test_threads_share_one_bounded_cache(empty_cache):
+    set_cache_size(10)
+
+    def lookup():
+        get_etld1('http://www.google-analytics.com/collect')
+
+    for _ in range(5):
+        thread = threading.Thread(target=lookup)
+        thread.start()
+        thread.join()
+    info = cache_info()
+    assert (info.misses, info.hits) == (1, 4)
+
+    def many():
+        get_etld1_many([f'http://www.site{i}.com/' for i in range(50)])
+
+    threads = [threading.Thread(target=many) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache_info().currsize == 10
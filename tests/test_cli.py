@@ -0,0 +1,98 @@
+import io
+import json
+
+import pytest
+from domain_utils.cli import main
+
+
+@pytest.fixture
+def stdin(monkeypatch):
+    def set_stdin(text):
+        monkeypatch.setattr('sys.stdin', io.TextIOWrapper(io.BytesIO(text.encode('utf-8'))))
+    return set_stdin
+
+
+def test_lines(stdin, capsys):
+    stdin('https://my.domain.cloudfront.net/a?b=1\nabout:blank\nexample.com:8080/x\n')
+    main(['--fields', 'etld1,port,scheme'])
+    assert capsys.readouterr().out.splitlines() == [
+        'https://my.domain.cloudfront.net/a?b=1\tdomain.cloudfront.net\t\thttps',
+        'about:blank\t\t\tabout',
+        'example.com:8080/x\texample.com\t8080\texample.com',
+    ]
+
+
+def test_malformed_url_gives_empty_fields(stdin, capsys):
+    stdin('http://[::1/x\nhttp://www.google.com\n')
+    main(['--fields', 'etld1,subparts'])
+    assert capsys.readouterr().out.splitlines() == [
+        'http://[::1/x\t\t',
+        'http://www.google.com\tgoogle.com\twww.google.com,google.com',
+    ]
+
+
+def test_strict(stdin):
+    stdin('http://[::1/x\n')
+    with pytest.raises(ValueError):
+        main(['--strict'])
+
+
+def test_csv_file(tmp_path, capsys):
+    path = tmp_path / 'crawl.csv'
+    path.write_text('id,url\n1,http://www.google.com/a\n2,"http://x.co.uk/a,b"\n')
+    main(['--csv', 'url', '--fields', 'etld1,stem', '--scheme', str(path)])
+    assert capsys.readouterr().out.splitlines() == [
+        'id,url,etld1,stem',
+        '1,http://www.google.com/a,google.com,http://www.google.com/a',
+        '2,"http://x.co.uk/a,b",x.co.uk,"http://x.co.uk/a,b"',
+    ]
+
+
+def test_csv_missing_column(stdin):
+    stdin('id,href\n1,http://www.google.com\n')
+    with pytest.raises(SystemExit):
+        main(['--csv', 'url'])
+
+
+def test_csv_stdin_keeps_quoted_newlines(stdin, capsys):
+    stdin('id,url\r\n1,"http://a.com/x\r\ny"\r\n2,http://b.co.uk\r\n')
+    main(['--csv', 'url'])
+    assert capsys.readouterr().out == (
+        'id,url,etld1\r\n1,"http://a.com/x\r\ny",a.com\r\n2,http://b.co.uk,b.co.uk\r\n')
+
+
+def test_csv_files_must_share_header(tmp_path, capsys):
+    first = tmp_path / 'a.csv'
+    first.write_text('id,url\n1,http://a.com\n')
+    second = tmp_path / 'b.csv'
+    second.write_text('id,url\n2,http://b.com\n')
+    main(['--csv', 'url', str(first), str(second)])
+    assert capsys.readouterr().out.splitlines() == [
+        'id,url,etld1', '1,http://a.com,a.com', '2,http://b.com,b.com']
+    second.write_text('url,id\nhttp://b.com,2\n')
+    with pytest.raises(SystemExit, match='b.csv'):
+        main(['--csv', 'url', str(first), str(second)])
+
+
+def test_jsonl(stdin, capsys):
+    stdin('{"url": "http://www.google.com/a", "id": 1}\n\n{"id": 2}\n')
+    main(['--jsonl', 'url', '--fields', 'etld1,subparts', '--chunksize', '1'])
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {'url': 'http://www.google.com/a', 'id': 1, 'etld1': 'google.com',
+         'subparts': ['www.google.com', 'google.com']},
+        {'id': 2, 'etld1': None, 'subparts': None},
+    ]
+
+
+def test_workers(stdin, capsys):
+    urls = ['http://a%d.example.com/' % i for i in range(25)]
+    stdin('\n'.join(urls) + '\n')
+    main(['--workers', '2', '--chunksize', '4'])
+    assert capsys.readouterr().out.splitlines() == [url + '\texample.com' for url in urls]
+
+
+def test_unknown_field(stdin):
+    stdin('')
+    with pytest.raises(SystemExit):
+        main(['--fields', 'etld1,bogus'])
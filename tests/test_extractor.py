@@ -0,0 +1,26 @@
+from domain_utils import get_etld1, get_extractor, preload, set_extractor
+
+
+def test_shared_extractor_is_reused():
+    assert get_extractor() is get_extractor()
+
+
+def test_bundled_snapshot_includes_private_domains():
+    assert get_extractor()('my.domain.cloudfront.net').suffix == 'cloudfront.net'
+
+
+def test_preload_returns_shared_extractor(restore_shared_extractor):
+    extractor = preload()
+    assert extractor is get_extractor()
+
+
+def test_preload_pinned_suffix_list(tmp_path, restore_shared_extractor):
+    suffix_list = tmp_path / 'list.dat'
+    suffix_list.write_text('moz.illa\n')
+    preload(suffix_list_file=str(suffix_list))
+    assert get_etld1('http://foo.bar.moz.illa') == 'bar.moz.illa'
+
+
+def test_set_extractor_none_restores_bundled_snapshot(restore_shared_extractor):
+    set_extractor(None)
+    assert get_etld1('https://my.domain.cloudfront.net') == 'domain.cloudfront.net'
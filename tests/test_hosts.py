@@ -0,0 +1,119 @@
+from ipaddress import ip_address
+
+import pytest
+from domain_utils import (
+    classify_host,
+    classify_hosts,
+    get_etld1,
+    get_extractor,
+    hostname_subparts,
+    is_ip_address,
+    normalize_hostname,
+    stem_url,
+)
+from domain_utils.extractor import split_hostname
+from domain_utils.hosts import BRACKETED_IPV6, DNS, IPV4, IPV6, LOCALHOST
+
+
+@pytest.mark.parametrize('host, expected', [
+    ('example.com', DNS),
+    ('www.example.co.uk', DNS),
+    ('127.0.0.1', IPV4),
+    ('999.1.2.3', DNS),
+    ('1.2.3', DNS),
+    ('::1', IPV6),
+    ('2001:db8::1', IPV6),
+    ('::ffff:1.2.3.4', IPV6),
+    ('[::1]', BRACKETED_IPV6),
+    ('[2001:db8::1]:8080', BRACKETED_IPV6),
+    ('[::1', DNS),
+    ('[example.com]', DNS),
+    ('localhost', LOCALHOST),
+    ('LocalHost.', LOCALHOST),
+    ('app.localhost', LOCALHOST),
+    ('localhost.com', DNS),
+    ('example.com:8080', DNS),
+    ('', None),
+])
+def test_classify_host(host, expected):
+    assert classify_host(host) == expected
+
+
+def test_classify_hosts():
+    assert classify_hosts(['a.com', '10.0.0.1', '[::1]:80']) == [DNS, IPV4, BRACKETED_IPV6]
+
+
+@pytest.mark.parametrize('host', [
+    'example.com', '127.0.0.1', '01.2.3.4', '1.2.3.4 ', '::1', ':::', '[::1]', '1', 'a1',
+    'fe80::1%eth0', '1.2.3.4.5', '255.255.255.255', '256.1.1.1', None, 12,
+])
+def test_is_ip_address_matches_ipaddress(host):
+    try:
+        ip_address(str(host))
+        expected = True
+    except ValueError:
+        expected = False
+    assert is_ip_address(host) is expected
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('http://[::1]:80/x', '::1'),
+    ('https://user@[2001:db8::1]/', '2001:db8::1'),
+    ('http://127.0.0.1:8080/', '127.0.0.1'),
+])
+def test_ip_hosts_are_their_own_etld1(url, expected):
+    assert get_etld1(url) == expected
+    assert get_etld1(url, scheme=False) == expected
+    assert hostname_subparts(url) == [expected]
+
+
+@pytest.mark.parametrize('hostname, form, expected', [
+    ('WWW.Example.COM.', 'unicode', 'www.example.com'),
+    ('WWW.Example.COM.', 'ascii', 'www.example.com'),
+    ('WWW.Example.COM.', None, 'www.example.com'),
+    ('www.XN--BCHER-KVA.de', 'unicode', 'www.bücher.de'),
+    ('www.Bücher.de', 'unicode', 'www.bücher.de'),
+    ('www.Bücher.de', 'ascii', 'www.xn--bcher-kva.de'),
+    ('www.xn--bcher-kva.de', None, 'www.xn--bcher-kva.de'),
+    ('xn--zz.com', 'unicode', 'xn--zz.com'),
+    ('127.0.0.1', 'unicode', '127.0.0.1'),
+    ('', 'unicode', ''),
+])
+def test_normalize_hostname(hostname, form, expected):
+    assert normalize_hostname(hostname, form) == expected
+
+
+def test_normalize_hostname_rejects_unknown_form():
+    with pytest.raises(ValueError):
+        normalize_hostname('example.com', 'idna')
+
+
+@pytest.mark.parametrize('hostname', [
+    'WWW.Example.COM.',
+    'A.B.XN--P1AI',
+    'www.Bücher.DE',
+    'Foo.Bar.CloudFront.NET.',
+    'CO.UK',
+    'Www.CK',
+    'A.Localhost',
+    '1.2.3.4.',
+    ' Spaced.Com ',
+    'a..COM',
+])
+def test_split_keeps_spelling_of_hostname(hostname):
+    # The shared cache splits the canonical form, mapped back onto the labels
+    # of the hostname, which must agree with splitting the hostname itself
+    extractor = get_extractor()
+    assert split_hostname(extractor, hostname) == extractor(hostname)
+
+
+def test_normalize_outputs():
+    url = 'http://user@WWW.XN--BCHER-KVA.DE.:8080/Path'
+    assert get_etld1(url) == 'XN--BCHER-KVA.DE'
+    assert get_etld1(url, normalize='unicode') == 'bücher.de'
+    assert get_etld1(url, normalize='ascii', scheme=False) == 'xn--bcher-kva.de'
+    assert hostname_subparts(url, normalize='unicode') == ['www.bücher.de', 'bücher.de']
+    assert stem_url(url) == 'user@WWW.XN--BCHER-KVA.DE.:8080/Path'
+    assert stem_url(url, normalize='unicode') == 'user@www.bücher.de:8080/Path'
+    assert stem_url(url, use_netloc=False, normalize='ascii') == 'www.xn--bcher-kva.de/Path'
+    assert stem_url('about:blank', normalize='unicode') == 'about:blank'
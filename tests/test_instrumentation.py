@@ -0,0 +1,116 @@
+import threading
+
+import pytest
+from domain_utils import (
+    cache_clear,
+    classify_host,
+    get_etld1,
+    get_etld1_many,
+    get_port,
+    get_scheme,
+    hostname_subparts,
+    instrumentation,
+    preload,
+    stem_url,
+)
+from domain_utils.extractor import PSL_SNAPSHOT
+
+
+@pytest.fixture
+def instrumented():
+    instrumentation.reset()
+    cache_clear()
+    classify_host.cache_clear()
+    instrumentation.enable()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_disabled_by_default():
+    instrumentation.reset()
+    get_etld1('http://www.example.com')
+    snapshot = instrumentation.snapshot()
+    assert snapshot['enabled'] is False
+    assert snapshot['calls'] == {}
+    assert snapshot['counters'] == {}
+
+
+def test_calls_and_time(instrumented):
+    for _ in range(3):
+        get_etld1('http://www.example.com')
+    snapshot = instrumentation.snapshot()
+    assert snapshot['calls']['get_etld1'] == 3
+    assert snapshot['calls']['parse_url'] == 3
+    assert snapshot['seconds']['get_etld1'] >= snapshot['seconds']['parse_url'] > 0
+
+
+def test_branch_counters(instrumented):
+    stem_url('https://example.com/a')
+    stem_url('example.com:8080/a')
+    stem_url('localhost:5000')
+    stem_url('about:blank')
+    counters = instrumentation.snapshot()['counters']
+    assert counters['parse_url.plain'] == 1
+    assert counters['parse_url.heuristic'] == 3
+    assert counters['adapt.scheme_lookup'] == 1
+    assert counters['adapt.root_added'] == 1
+    assert counters['stem_url.unparsed'] == 1
+
+
+def test_only_hosts_like_addresses_reach_ipaddress(instrumented):
+    hostname_subparts('http://www.example.com')
+    assert 'ip_address.value_error' not in instrumentation.snapshot()['counters']
+    hostname_subparts('http://999.1.2.3')
+    assert instrumentation.snapshot()['counters']['ip_address.value_error'] > 0
+
+
+def test_cache_hit_rate(instrumented):
+    assert instrumentation.snapshot()['cache']['hit_rate'] is None
+    get_etld1('http://a.example.com')
+    get_etld1('http://a.example.com/b')
+    cache = instrumentation.snapshot()['cache']
+    assert (cache['hits'], cache['misses']) == (1, 1)
+    assert cache['hit_rate'] == 0.5
+
+
+def test_batch_cache_counters(instrumented):
+    get_etld1_many(['http://a.com/1', 'http://a.com/2', 'http://b.com/'])
+    snapshot = instrumentation.snapshot()
+    assert snapshot['calls']['get_etld1_many'] == 1
+    assert snapshot['counters']['batch_cache.hits'] == 1
+    assert snapshot['counters']['batch_cache.misses'] == 2
+
+
+def test_extractor_load_is_timed(instrumented, restore_shared_extractor):
+    preload(PSL_SNAPSHOT)
+    assert instrumentation.snapshot()['calls']['extractor.load'] == 1
+
+
+def test_disabled_instrumentation_adds_no_calls():
+    # Per-url functions are timed inline, so only the shared extractor
+    # wrappers remain. Batch functions are wrapped once per batch.
+    assert not hasattr(get_etld1, '__wrapped__')
+    assert not hasattr(get_scheme, '__wrapped__')
+    assert not hasattr(stem_url.__wrapped__, '__wrapped__')
+    assert hasattr(get_etld1_many.__wrapped__, '__wrapped__')
+
+
+def test_disable_keeps_counts(instrumented):
+    get_port('http://example.com:80')
+    instrumentation.disable()
+    get_port('http://example.com:80')
+    assert instrumentation.snapshot()['calls']['get_port'] == 1
+
+
+def test_counts_from_threads_are_exact(instrumented):
+    def count():
+        for _ in range(2000):
+            instrumentation.count('test')
+
+    threads = [threading.Thread(target=count) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert instrumentation.snapshot()['counters']['test'] == 16000
@@ -0,0 +1,111 @@
+import pytest
+from domain_utils import DomainMatcher, SuffixTrie, hostname_subparts
+
+DOMAINS = [
+    'google.com',
+    'mail.google.com',
+    'cloudfront.net',
+    'x.cloudfront.net',
+    'co.uk',
+    'bbc.co.uk',
+    '127.0.0.1',
+    '0.1',
+    'localhost',
+    'c.d.com',
+]
+
+URLS = [
+    'http://www.mail.google.com/x',
+    'http://google.com',
+    'http://WWW.Google.COM',
+    'http://a.x.cloudfront.net',
+    'http://y.cloudfront.net',
+    'http://co.uk',
+    'http://www.bbc.co.uk',
+    'http://127.0.0.1:80',
+    'http://localhost',
+    'http://z.c.d.com',
+    'about:blank',
+    'foo.com?x',
+    'http://x.com',
+]
+
+
+@pytest.mark.parametrize('include_ps', [False, True])
+@pytest.mark.parametrize('url', URLS)
+def test_agrees_with_hostname_subparts(url, include_ps):
+    matcher = DomainMatcher(DOMAINS, include_ps=include_ps)
+    listed = set(DOMAINS)
+    expected = next(
+        (part.lower() for part in hostname_subparts(url, include_ps=include_ps)
+         if part.lower() in listed),
+        None)
+    assert matcher.match(url) == expected
+
+
+def test_most_specific_entry_wins():
+    matcher = DomainMatcher(['google.com', 'mail.google.com'])
+    assert matcher.match('https://www.mail.google.com/') == 'mail.google.com'
+    assert matcher.match('https://docs.google.com/') == 'google.com'
+
+
+def test_entries_are_normalized():
+    matcher = DomainMatcher(['*.Tracker.COM.', '.ads.net'])
+    assert len(matcher) == 2
+    assert matcher.match('http://a.tracker.com') == 'tracker.com'
+    assert 'http://ads.net/pixel' in matcher
+    assert 'http://example.com' not in matcher
+    with pytest.raises(ValueError):
+        matcher.add('*.')
+
+
+def test_hosts_are_normalized():
+    matcher = DomainMatcher(['google.com', 'bücher.de', 'xn--mnchen-3ya.de'])
+    assert matcher.match_hostname('www.google.com.') == 'google.com'
+    assert matcher.match_hostname(' WWW.Google.COM ') == 'google.com'
+    assert matcher.match_hostname('www.xn--bcher-kva.de') == 'bücher.de'
+    assert matcher.match_hostname('shop.BÜCHER.de') == 'bücher.de'
+    assert matcher.match('http://www.münchen.de/') == 'münchen.de'
+    assert matcher.match('http://www.google.com./x') == 'google.com'
+
+
+def test_ipv6_addresses():
+    matcher = DomainMatcher(['2001:db8::1', '[::1]'])
+    assert matcher.match_hostname('2001:db8::1') == '2001:db8::1'
+    assert matcher.match_hostname('[2001:DB8::1]') == '2001:db8::1'
+    assert matcher.match('http://[2001:db8::1]:8080/x') == '2001:db8::1'
+    assert matcher.match('http://[::1]/') == '::1'
+    assert matcher.match('http://[2001:db8::2]/') is None
+
+
+def test_values():
+    matcher = DomainMatcher()
+    matcher.add('tracker.com', value='list-a')
+    matcher.add('ads.tracker.com', value='list-b')
+    matcher.add('tracker.com', value='list-c')
+    assert len(matcher) == 2
+    assert matcher.match('http://x.tracker.com') == 'list-c'
+    assert matcher.match('http://x.ads.tracker.com') == 'list-b'
+
+
+def test_match_many():
+    matcher = DomainMatcher(DOMAINS)
+    result = matcher.match_many(URLS + ['http://[::1/x'], errors='coerce', default='bad')
+    assert result == [matcher.match(url) for url in URLS] + ['bad']
+
+
+def test_from_file(tmp_path):
+    path = tmp_path / 'list.txt'
+    path.write_text('# trackers\n\ntracker.com\nads.net\n')
+    matcher = DomainMatcher.from_file(str(path), include_ps=True)
+    assert len(matcher) == 2
+    assert matcher.include_ps is True
+    assert matcher.match('http://x.ads.net') == 'ads.net'
+
+
+def test_custom_extractor():
+    matcher = DomainMatcher(['moz.illa'], extractor=SuffixTrie([('moz.illa', False)]))
+    assert matcher.match('http://foo.moz.illa') is None
+    matcher = DomainMatcher(['moz.illa'], include_ps=True,
+                            extractor=SuffixTrie([('moz.illa', False)]))
+    assert matcher.match('http://foo.moz.illa') == 'moz.illa'
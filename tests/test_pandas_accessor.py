@@ -0,0 +1,111 @@
+import pytest
+
+pd = pytest.importorskip('pandas')
+import domain_utils.pandas_accessor  # noqa: E402,F401
+from domain_utils import (  # noqa: E402
+    get_etld1,
+    get_port,
+    hostname_subparts,
+    is_third_party,
+    stem_url,
+)
+
+URLS = [
+    'https://my.domain.cloudfront.net/a/path?a=1',
+    'http://www.google.com#anchor',
+    None,
+    'about:blank',
+    'example.com:8080/path',
+    'http://www.google.com#anchor',
+    'wss://www.google.com/socket',
+]
+
+
+@pytest.fixture
+def urls():
+    return pd.Series(URLS, name='url', index=range(10, 10 + len(URLS)))
+
+
+def test_etld1(urls):
+    result = urls.du.etld1()
+    assert result.dtype == 'category'
+    assert result.name == 'url'
+    assert list(result.index) == list(urls.index)
+    assert result.isna().tolist() == [url is None for url in URLS]
+    assert result.dropna().tolist() == [get_etld1(url) for url in URLS if url is not None]
+
+
+def test_stem(urls):
+    result = urls.du.stem(scheme=True)
+    assert result.dropna().tolist() == [
+        stem_url(url, scheme=True) for url in URLS if url is not None]
+    assert urls.du.stem(categorical=True).dtype == 'category'
+
+
+def test_port(urls):
+    result = urls.du.port()
+    assert str(result.dtype) == 'Int32'
+    assert result[14] == 8080
+    assert result.isna().sum() == 6
+    assert result.fillna(-1).tolist() == [
+        -1 if url is None or get_port(url) is None else get_port(url) for url in URLS]
+
+
+def test_scheme(urls):
+    result = urls.du.scheme()
+    assert result.dtype == 'category'
+    assert result[10] == 'https'
+    assert pd.isna(result[12])
+    assert result[13] == 'about'
+    assert result[16] == 'wss'
+
+
+def test_subparts(urls):
+    result = urls.du.subparts(include_ps=True)
+    assert result[11] == hostname_subparts(URLS[1], include_ps=True)
+    assert result[12] is None
+
+
+def test_series_changed_in_place(urls):
+    # Some pandas versions cache the accessor on the Series
+    accessor = urls.du
+    assert accessor.port().tolist()[4] == 8080
+    urls.iloc[4] = 'http://example.com:9090/path'
+    urls.loc[10] = 'https://www.example.co.uk'
+    assert accessor.port().tolist()[4] == 9090
+    assert accessor.etld1().tolist()[0] == 'example.co.uk'
+
+
+def test_errors_coerced_to_missing():
+    urls = pd.Series(['http://[::1/path', 'http://www.google.com'])
+    with pytest.raises(ValueError):
+        urls.du.etld1()
+    result = urls.du.etld1(errors='coerce')
+    assert pd.isna(result[0])
+    assert result[1] == 'google.com'
+    with pytest.raises(ValueError):
+        urls.du.scheme()
+    result = urls.du.scheme(errors='coerce')
+    assert pd.isna(result[0])
+    assert result[1] == 'http'
+
+
+def test_categorical_input():
+    urls = pd.Series(['http://a.b.com', 'http://c.b.com', 'http://a.b.com'], dtype='category')
+    assert urls.du.etld1().tolist() == ['b.com', 'b.com', 'b.com']
+
+
+def test_is_third_party(urls):
+    top_level_urls = ['https://www.google.com/'] * len(URLS)
+    result = urls.du.is_third_party(top_level_urls)
+    assert result.dtype == 'boolean'
+    assert list(result.index) == list(urls.index)
+    assert result.isna().tolist() == [url is None for url in URLS]
+    assert result.dropna().tolist() == [
+        is_third_party(url, 'https://www.google.com/') for url in URLS if url is not None]
+
+
+def test_is_third_party_coerces_top_level_errors(urls):
+    top_level_urls = ['http://[::1/x'] + ['https://www.google.com/'] * (len(URLS) - 1)
+    result = urls.du.is_third_party(top_level_urls, errors='coerce')
+    assert result.isna().tolist() == [True] + [url is None for url in URLS[1:]]
@@ -0,0 +1,111 @@
+import multiprocessing
+import sys
+import threading
+
+import pytest
+from domain_utils import (
+    SuffixTrie,
+    cache_info,
+    get_etld1,
+    get_etld1_many,
+    get_extractor,
+    hostname_subparts_many,
+    instrumentation,
+    set_extractor,
+    stem_url_many,
+)
+from domain_utils.parallel import THREAD, imap, imap_chunks
+
+URLS = [
+    'https://my.domain.cloudfront.net/a/path?a=1',
+    'http://www.google.com#anchor',
+    'about:blank',
+    'example.com:8080/path',
+    'http://foo.bar.moz.illa',
+] * 5
+
+
+def test_imap_preserves_order():
+    result = list(imap(get_etld1_many, iter(URLS), workers=2, chunksize=3))
+    assert result == [get_etld1(url) for url in URLS]
+
+
+def test_imap_chunks():
+    chunks = list(imap_chunks(
+        hostname_subparts_many, URLS, workers=2, chunksize=10, include_ps=True))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+
+
+def test_imap_kwargs():
+    result = list(imap(get_etld1_many, ['http://[::1/x', 'http://a.com'], workers=1,
+                       errors='coerce', default='bad'))
+    assert result == ['bad', 'a.com']
+
+
+def test_workers_use_parent_extractor(restore_shared_extractor):
+    set_extractor(SuffixTrie([('moz.illa', False)]))
+    result = list(imap(get_etld1_many, ['http://foo.bar.moz.illa'], workers=2))
+    assert result == ['bar.moz.illa']
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason='mp_context is Python 3.7+')
+def test_spawned_workers_use_parent_extractor(restore_shared_extractor):
+    set_extractor(SuffixTrie([('moz.illa', False)]))
+    context = multiprocessing.get_context('spawn')
+    result = list(imap(get_etld1_many, ['http://foo.bar.moz.illa'], workers=1,
+                       mp_context=context))
+    assert result == ['bar.moz.illa']
+
+
+def test_parent_cache_is_kept():
+    get_etld1_many(URLS)
+    warm = cache_info().currsize
+    assert warm
+    assert list(imap(get_etld1_many, [], workers=1, executor=THREAD)) == []
+    assert cache_info().currsize == warm
+
+
+def test_empty_input():
+    assert list(imap(get_etld1_many, [], workers=2)) == []
+
+
+def test_thread_executor():
+    result = list(imap(stem_url_many, iter(URLS), workers=3, chunksize=4, executor=THREAD))
+    assert result == stem_url_many(URLS)
+
+
+def test_thread_executor_accepts_extractor():
+    extractor = SuffixTrie([('moz.illa', False)])
+    result = list(imap(
+        get_etld1_many, ['http://foo.bar.moz.illa'], executor=THREAD, extractor=extractor))
+    assert result == ['bar.moz.illa']
+
+
+def test_unknown_executor():
+    with pytest.raises(ValueError):
+        list(imap(get_etld1_many, URLS, executor='fiber'))
+
+
+def test_concurrent_first_calls_load_once(restore_shared_extractor):
+    set_extractor(None)
+    instrumentation.reset()
+    instrumentation.enable()
+    barrier = threading.Barrier(8)
+    extractors = []
+
+    def first_call():
+        barrier.wait()
+        extractors.append(get_extractor())
+
+    threads = [threading.Thread(target=first_call) for _ in range(8)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert instrumentation.snapshot()['calls']['extractor.load'] == 1
+    finally:
+        instrumentation.disable()
+        instrumentation.reset()
+    assert len(extractors) == 8
+    assert all(extractor is extractors[0] for extractor in extractors)
@@ -0,0 +1,96 @@
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+from domain_utils import get_etld1, get_port, stem_url  # noqa: E402
+from domain_utils.parquet import enrich_parquet, enrich_table  # noqa: E402
+
+URLS = [
+    'https://my.domain.cloudfront.net/a/path?a=1',
+    'http://www.google.com:8080#anchor',
+    None,
+    'about:blank',
+    'example.com/path',
+    'wss://www.google.com/socket',
+] * 5
+
+
+def _write_requests(path, row_group_size=4):
+    table = pa.table({
+        'id': list(range(len(URLS))),
+        'url': URLS,
+        'top_level_url': ['https://www.google.com/'] * len(URLS),
+    })
+    pq.write_table(table, path, row_group_size=row_group_size)
+    return table
+
+
+def _check(path, table):
+    parquet_file = pq.ParquetFile(path)
+    assert parquet_file.num_row_groups == 8
+    enriched = parquet_file.read()
+    assert enriched.schema.names == table.schema.names + ['url_etld1', 'url_stem', 'url_port']
+    assert enriched.column('id').to_pylist() == table.column('id').to_pylist()
+    assert enriched.column('url_etld1').to_pylist() == [
+        None if url is None else get_etld1(url) for url in URLS]
+    assert enriched.column('url_stem').to_pylist() == [
+        None if url is None else stem_url(url) for url in URLS]
+    assert enriched.column('url_port').to_pylist() == [
+        None if url is None else get_port(url) for url in URLS]
+
+
+def test_enrich_parquet_file(tmp_path):
+    table = _write_requests(tmp_path / 'http_requests.parquet')
+    rows = enrich_parquet(tmp_path / 'http_requests.parquet', tmp_path / 'out.parquet')
+    assert rows == len(URLS)
+    _check(tmp_path / 'out.parquet', table)
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_enrich_parquet_in_parallel(tmp_path, executor):
+    table = _write_requests(tmp_path / 'http_requests.parquet')
+    enrich_parquet(
+        tmp_path / 'http_requests.parquet', tmp_path / 'out.parquet',
+        workers=2, executor=executor)
+    _check(tmp_path / 'out.parquet', table)
+
+
+def test_enrich_parquet_dataset(tmp_path):
+    source = tmp_path / 'crawl'
+    (source / 'part=1').mkdir(parents=True)
+    table = _write_requests(source / 'a.parquet')
+    _write_requests(source / 'part=1' / 'b.parquet')
+    pq.write_table(table.schema.empty_table(), source / 'empty.parquet')
+    assert enrich_parquet(source, tmp_path / 'out') == 2 * len(URLS)
+    _check(tmp_path / 'out' / 'a.parquet', table)
+    _check(tmp_path / 'out' / 'part=1' / 'b.parquet', table)
+    empty = pq.read_table(tmp_path / 'out' / 'empty.parquet')
+    assert empty.num_rows == 0
+    assert 'url_etld1' in empty.schema.names
+
+
+def test_enrich_table_options():
+    table = pa.table({'url': ['http://a.b.com:99999/', 'http://a.b.com/x'], 'top': ['x.com'] * 2})
+    with pytest.raises(ValueError):
+        enrich_table(table, fields=['port'])
+    enriched = enrich_table(
+        table, url_columns=['url', 'top'], fields=['scheme', 'stem', 'port'],
+        errors='coerce', scheme=True)
+    assert enriched.column_names == [
+        'url', 'top', 'url_scheme', 'url_stem', 'url_port', 'top_scheme', 'top_stem',
+        'top_port']
+    assert enriched.column('url_port').to_pylist() == [None, None]
+    assert enriched.column('url_stem').to_pylist() == [
+        'http://a.b.com:99999/', 'http://a.b.com/x']
+    assert enriched.column('top_scheme').to_pylist() == ['no_scheme'] * 2
+    with pytest.raises(ValueError):
+        enrich_table(enriched, fields=['stem'])
+
+
+def test_enrich_table_coerces_scheme_errors():
+    table = pa.table({'url': ['http://[::1/x', 'https://www.google.com/']})
+    with pytest.raises(ValueError):
+        enrich_table(table, fields=['scheme'])
+    enriched = enrich_table(table, fields=['etld1', 'scheme'], errors='coerce')
+    assert enriched.column('url_etld1').to_pylist() == [None, 'google.com']
+    assert enriched.column('url_scheme').to_pylist() == [None, 'https']
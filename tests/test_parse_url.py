@@ -0,0 +1,87 @@
+import pytest
+from urllib.parse import urlparse
+
+import domain_utils.domain_utils
+from domain_utils import get_etld1, get_port, parse_url, stem_url
+
+
+def test_parse_url_attributes():
+    parsed = parse_url('https://my.domain.cloudfront.net:8080/a/file.html?a=1#anchor')
+    assert parsed.scheme == 'https'
+    assert parsed.netloc == 'my.domain.cloudfront.net:8080'
+    assert parsed.hostname == 'my.domain.cloudfront.net'
+    assert parsed.port == 8080
+    assert parsed.path == '/a/file.html'
+    assert parsed.subdomain == 'my'
+    assert parsed.domain == 'domain'
+    assert parsed.suffix == 'cloudfront.net'
+    assert parsed.etld1 == 'domain.cloudfront.net'
+
+
+def test_parse_url_no_scheme_with_port():
+    parsed = parse_url('example.com:5000')
+    assert parsed.scheme == 'http'
+    assert parsed.port == 5000
+    assert parsed.etld1 == 'example.com'
+
+
+def test_parse_url_unparsed_scheme():
+    parsed = parse_url('about:blank')
+    assert parsed.scheme == 'about'
+    assert parsed.etld1 == ''
+    assert parsed.stem() == 'about:blank'
+    assert parsed.stem(return_unparsed=False) == ''
+
+
+def test_parse_url_ip_address():
+    assert parse_url('http://127.0.0.1/foo.html').etld1 == '127.0.0.1'
+
+
+def test_parse_url_invalid_port_raises_only_on_access():
+    parsed = parse_url('http://example.com:abc/')
+    assert parsed.etld1 == 'example.com'
+    with pytest.raises(ValueError):
+        parsed.port
+
+
+def test_parse_url_has_no_instance_dict():
+    with pytest.raises(AttributeError):
+        parse_url('http://example.com').__dict__
+
+
+@pytest.mark.parametrize('url', [
+    'https://my.domain.cloudfront.net/a/path/to/a/file.html#anchor?a=1',
+    'ws://example.com:5000',
+    'localhost:8000',
+    'data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP',
+])
+def test_views_agree_with_record(url):
+    parsed = parse_url(url)
+    assert get_etld1(url) == parsed.etld1
+    assert get_port(url) == parsed.port
+    assert stem_url(url, scheme=True) == parsed.stem(scheme=True)
+
+
+@pytest.mark.parametrize('url', [
+    'http://example.com',
+    'https://user:pw@Example.COM:8080/a/b.html?q=1&r=2#frag',
+    'ws://example.com?q=1',
+    'wss://example.com#frag?not=query',
+    'http://example.com/a;params?q',
+    'http://[::1]:80/x',
+    'http://exämple.com/',
+    'http://example.com/a\tb',
+    'HTTP://example.com/',
+    'https:///path',
+])
+def test_plain_url_split_matches_urlparse(url):
+    assert parse_url(url)._split == urlparse(url)
+
+
+def test_explicit_scheme_does_not_load_extractor(monkeypatch):
+    def fail():
+        raise AssertionError('extractor loaded')
+    monkeypatch.setattr(domain_utils.domain_utils, 'get_extractor', fail)
+    assert get_port('https://example.com:8443/a') == 8443
+    assert stem_url('ws://example.com/a?b=1', scheme=True) == 'ws://example.com/a'
+    assert stem_url('about:blank') == 'about:blank'
@@ -0,0 +1,106 @@
+import copy
+import hashlib
+import pickle
+
+import pytest
+from domain_utils import get_etld1, preload
+from domain_utils.extractor import PSL_SNAPSHOT
+from domain_utils.psl_binary import (
+    CompiledSuffixListError,
+    MappedSuffixTrie,
+    compile_suffix_list,
+)
+from domain_utils.suffix_trie import SuffixTrie, parse_suffix_list
+
+
+@pytest.fixture(scope='module')
+def compiled(tmp_path_factory):
+    path = tmp_path_factory.mktemp('psl') / 'psl.bin'
+    compile_suffix_list(PSL_SNAPSHOT, str(path))
+    return path
+
+
+def test_matches_suffix_trie_on_every_rule(compiled):
+    mapped = MappedSuffixTrie(str(compiled))
+    trie = SuffixTrie.from_file(PSL_SNAPSHOT)
+    with open(PSL_SNAPSHOT, encoding='utf-8') as f:
+        rules = parse_suffix_list(f.read())
+    for rule, _ in rules:
+        host = rule.lstrip('!').replace('*', 'x')
+        for url in [host, 'a.' + host, 'B.a.' + host]:
+            assert mapped(url) == trie(url)
+            assert mapped.is_private(url) == trie.is_private(url)
+
+
+def test_source_checksum(compiled):
+    with open(PSL_SNAPSHOT, 'rb') as f:
+        expected = hashlib.sha256(f.read()).hexdigest()
+    assert MappedSuffixTrie(str(compiled)).source_sha256 == expected
+
+
+def test_corrupt_file_fails_checksum(compiled, tmp_path):
+    data = bytearray(compiled.read_bytes())
+    data[-1] ^= 0xFF
+    corrupt = tmp_path / 'corrupt.bin'
+    corrupt.write_bytes(bytes(data))
+    with pytest.raises(CompiledSuffixListError):
+        MappedSuffixTrie(str(corrupt))
+
+
+def test_other_format_version(compiled, tmp_path):
+    data = bytearray(compiled.read_bytes())
+    data[8] = 99
+    other = tmp_path / 'other.bin'
+    other.write_bytes(bytes(data))
+    with pytest.raises(CompiledSuffixListError):
+        MappedSuffixTrie(str(other))
+
+
+def test_not_compiled(tmp_path):
+    text = tmp_path / 'list.dat'
+    text.write_text('com\n' * 20)
+    with pytest.raises(CompiledSuffixListError):
+        MappedSuffixTrie(str(text))
+    empty = tmp_path / 'empty.bin'
+    empty.write_bytes(b'')
+    with pytest.raises(CompiledSuffixListError):
+        MappedSuffixTrie(str(empty))
+
+
+def test_lookups_are_cached(compiled):
+    trie = MappedSuffixTrie(str(compiled))
+    assert trie('http://www.google.co.uk').suffix == 'co.uk'
+    assert trie('http://mail.bbc.co.uk').suffix == 'co.uk'
+    assert (0, 'uk') in trie._children
+    trie._children[0, 'uk'] = None
+    assert trie('http://www.google.co.uk').suffix == ''
+
+
+def test_read_only(compiled):
+    with pytest.raises(TypeError):
+        MappedSuffixTrie(str(compiled)).add_rule('moz.illa')
+
+
+def test_rules_and_wire_format(compiled):
+    mapped = MappedSuffixTrie(str(compiled))
+    trie = SuffixTrie.from_file(PSL_SNAPSHOT)
+    assert sorted(mapped.rules()) == sorted(trie.rules())
+    assert mapped.dumps() == trie.dumps()
+
+
+def test_copies_share_the_read_only_map(compiled):
+    mapped = MappedSuffixTrie(str(compiled))
+    assert copy.copy(mapped) is mapped
+    assert copy.deepcopy(mapped) is mapped
+
+
+def test_pickles_by_path(compiled):
+    mapped = MappedSuffixTrie(str(compiled))
+    data = pickle.dumps(mapped)
+    assert len(data) < 1000
+    assert pickle.loads(data)('my.domain.cloudfront.net').suffix == 'cloudfront.net'
+
+
+def test_preload_compiled_file(compiled, restore_shared_extractor):
+    assert isinstance(preload(suffix_list_file=str(compiled)), MappedSuffixTrie)
+    assert get_etld1('https://my.domain.cloudfront.net') == 'domain.cloudfront.net'
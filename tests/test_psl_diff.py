@@ -0,0 +1,110 @@
+import pytest
+from domain_utils import DomainTable, SuffixTrie
+from domain_utils.psl_diff import SuffixListDiff, diff_suffix_lists
+
+OLD = '''
+// ===BEGIN ICANN DOMAINS===
+com
+uk
+co.uk
+ck
+*.ck
+!www.ck
+// ===BEGIN PRIVATE DOMAINS===
+cloudfront.net
+'''
+
+NEW = '''
+// ===BEGIN ICANN DOMAINS===
+com
+uk
+co.uk
+ck
+*.ck
+net
+// ===BEGIN PRIVATE DOMAINS===
+cloudfront.net
+blogspot.com
+'''
+
+HOSTS = [
+    'www.example.com',
+    'foo.blogspot.com',
+    'a.b.co.uk',
+    'www.ck',
+    'a.www.ck',
+    'foo.ck',
+    'd1.cloudfront.net',
+    'example.net',
+    '127.0.0.1',
+]
+
+
+@pytest.fixture
+def diff():
+    return SuffixListDiff.from_text(OLD, NEW)
+
+
+def test_added_and_removed_rules(diff):
+    assert diff.added == {'blogspot.com', 'net'}
+    assert diff.removed == {'!www.ck'}
+    assert diff.rules == {'blogspot.com', 'net', '!www.ck'}
+    assert len(diff) == 3
+    assert repr(diff) == 'SuffixListDiff(2 added, 1 removed)'
+
+
+@pytest.mark.parametrize('hostname, expected', [
+    ('www.example.com', False),
+    ('foo.blogspot.com', True),
+    ('FOO.BLOGSPOT.COM.', True),
+    ('blogspot.com', True),
+    ('a.b.co.uk', False),
+    ('www.ck', True),
+    ('a.www.ck', True),
+    ('foo.ck', False),
+    ('d1.cloudfront.net', True),
+    ('example.net', True),
+    ('127.0.0.1', False),
+    ('', False),
+])
+def test_affects(diff, hostname, expected):
+    assert diff.affects(hostname) is expected
+
+
+def test_wildcard_rules_need_a_label():
+    diff = SuffixListDiff.from_text('', '*.ck')
+    assert diff.affects('foo.ck')
+    assert not diff.affects('ck')
+
+
+def test_unaffected_hosts_keep_their_etld1(diff):
+    old, new = SuffixTrie.from_text(OLD), SuffixTrie.from_text(NEW)
+    for hostname in HOSTS:
+        if not diff.affects(hostname):
+            assert old(hostname) == new(hostname)
+
+
+def test_changed_etld1s(diff):
+    table = DomainTable(extractor=SuffixTrie.from_text(OLD))
+    for hostname in HOSTS:
+        table.add_hostname(hostname)
+    assert list(diff.affected_ids(table)) == [1, 3, 4, 6, 7]
+    changes = diff.changed_etld1s(table, SuffixTrie.from_text(NEW))
+    assert {table.hostname(host_id): etld1 for host_id, etld1 in changes.items()} == {
+        'foo.blogspot.com': 'foo.blogspot.com',
+        'www.ck': '.www.ck',
+        'a.www.ck': 'a.www.ck',
+        'example.net': 'example.net',
+    }
+
+
+def test_section_moves_and_private_rules(tmp_path):
+    old = tmp_path / 'old.dat'
+    new = tmp_path / 'new.dat'
+    old.write_text(OLD)
+    # Every rule moves to the ICANN section
+    new.write_text(OLD.replace('// ===BEGIN PRIVATE DOMAINS===', ''))
+    assert len(diff_suffix_lists(old, new)) == 0
+    old.write_text(OLD)
+    new.write_text(NEW)
+    assert diff_suffix_lists(old, new, include_private=False).rules == {'net', '!www.ck'}
@@ -0,0 +1,140 @@
+import asyncio
+import threading
+
+import pytest
+from domain_utils import cache_info, get_etld1, get_extractor, load_extractor, set_extractor
+from domain_utils.psl_binary import compile_suffix_list
+from domain_utils.refresh import (
+    InvalidSuffixListError,
+    Refresher,
+    check_suffix_list,
+    refresh,
+    refresh_async,
+    refresh_periodically,
+)
+
+
+def _run(coroutine):
+    # ``asyncio.run`` is Python 3.7+
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+@pytest.fixture
+def suffix_list(tmp_path):
+    path = tmp_path / 'list.dat'
+    path.write_text('com\nuk\nco.uk\nmoz.illa\n')
+    return str(path)
+
+
+def test_load_extractor_does_not_swap(suffix_list):
+    shared = get_extractor()
+    extractor = load_extractor(suffix_list)
+    assert extractor is not shared
+    assert get_extractor() is shared
+    assert extractor('foo.bar.moz.illa').suffix == 'moz.illa'
+
+
+def test_load_compiled_extractor(suffix_list, tmp_path):
+    compiled = str(tmp_path / 'list.bin')
+    compile_suffix_list(suffix_list, compiled)
+    assert load_extractor(compiled)('foo.bar.moz.illa').suffix == 'moz.illa'
+
+
+def test_refresh_swaps_extractor_and_cache(suffix_list, restore_shared_extractor):
+    assert get_etld1('http://foo.bar.moz.illa') == 'illa'
+    assert cache_info().currsize > 0
+    extractor = refresh(suffix_list, min_rules=4)
+    assert get_extractor() is extractor
+    assert cache_info().currsize == 0
+    assert get_etld1('http://foo.bar.moz.illa') == 'bar.moz.illa'
+
+
+def test_refresh_async(suffix_list, restore_shared_extractor):
+    extractor = _run(refresh_async(suffix_list, min_rules=4))
+    assert get_extractor() is extractor
+    assert get_etld1('http://foo.bar.moz.illa') == 'bar.moz.illa'
+
+
+def test_refresh_periodically_survives_errors(tmp_path, restore_shared_extractor, caplog):
+    async def run():
+        task = asyncio.ensure_future(
+            refresh_periodically(str(tmp_path / 'missing.dat'), interval=0.01))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    shared = get_extractor()
+    _run(run())
+    assert get_extractor() is shared
+    assert 'Refreshing the Public Suffix List failed' in caplog.text
+
+
+def test_refresher_thread(suffix_list, restore_shared_extractor):
+    with Refresher(suffix_list, interval=60, min_rules=4) as refresher:
+        for _ in range(100):
+            if refresher.last_refresh is not None:
+                break
+            threading.Event().wait(0.01)
+    assert refresher.last_error is None
+    assert get_etld1('http://foo.bar.moz.illa') == 'bar.moz.illa'
+
+
+def test_refresher_keeps_list_on_error(tmp_path, restore_shared_extractor):
+    shared = get_extractor()
+    refresher = Refresher(str(tmp_path / 'missing.dat'))
+    assert refresher.refresh() is False
+    assert isinstance(refresher.last_error, OSError)
+    assert get_extractor() is shared
+
+
+def test_readers_during_swaps(suffix_list, restore_shared_extractor):
+    lists = [get_extractor(), load_extractor(suffix_list)]
+    results = set()
+    errors = []
+    done = threading.Event()
+
+    def read():
+        try:
+            while not done.is_set():
+                results.add(get_etld1('http://foo.bar.moz.illa'))
+        except Exception as e:
+            errors.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for i in range(200):
+        set_extractor(lists[i % 2])
+    done.set()
+    for reader in readers:
+        reader.join()
+    assert not errors
+    assert results <= {'illa', 'bar.moz.illa'}
+
+
+def test_check_suffix_list(suffix_list):
+    check_suffix_list(get_extractor())
+    extractor = load_extractor(suffix_list)
+    check_suffix_list(extractor, min_rules=4)
+    with pytest.raises(InvalidSuffixListError):
+        check_suffix_list(extractor)
+    with pytest.raises(InvalidSuffixListError):
+        check_suffix_list(extractor, min_rules=4, known_suffixes=['com', 'co.uk', 'de'])
+
+
+def test_refresh_keeps_list_that_fails_checks(suffix_list, restore_shared_extractor, caplog):
+    shared = get_extractor()
+    with pytest.raises(InvalidSuffixListError):
+        refresh(suffix_list)
+    with pytest.raises(InvalidSuffixListError):
+        _run(refresh_async(suffix_list))
+    refresher = Refresher(suffix_list)
+    assert refresher.refresh() is False
+    assert isinstance(refresher.last_error, InvalidSuffixListError)
+    assert 'expected at least 1000' in caplog.text
+    assert get_extractor() is shared
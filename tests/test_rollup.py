@@ -0,0 +1,155 @@
+import os
+import pickle
+
+import pytest
+from domain_utils.rollup import Rollup, _Distinct
+
+RECORDS = [
+    {'url': 'https://www.google.com/a', 'top_level_url': 'https://news.com/', 'bytes': 10},
+    {'url': 'https://mail.google.com/', 'top_level_url': 'https://news.com/', 'bytes': '5'},
+    {'url': 'https://ads.tracker.co.uk/p', 'top_level_url': 'https://news.com/', 'bytes': None},
+    {'url': 'https://www.google.com/b', 'top_level_url': 'https://blog.org/', 'bytes': 1},
+]
+
+
+def _rows(rollup, *columns):
+    return sorted(tuple(row[column] for column in columns) for row in rollup.rows())
+
+
+def test_counts_sums_and_distinct_hostnames():
+    rollup = Rollup(sums=['bytes'], distinct=['hostname'])
+    rollup.update(RECORDS)
+    assert _rows(rollup, 'etld1', 'count', 'bytes', 'distinct_hostname') == [
+        ('google.com', 3, 16.0, 2),
+        ('tracker.co.uk', 1, 0, 1),
+    ]
+
+
+def test_group_by_site_and_fields():
+    rollup = Rollup(site_field='top_level_url', by=['bytes'])
+    rollup.add(RECORDS[0])
+    rollup.add(RECORDS[0])
+    rollup.add(RECORDS[3])
+    assert _rows(rollup, 'etld1', 'site', 'bytes', 'count') == [
+        ('google.com', 'blog.org', 1, 1),
+        ('google.com', 'news.com', 10, 2),
+    ]
+
+
+def test_subparts_key():
+    rollup = Rollup(key='subparts')
+    rollup.update(RECORDS[:2])
+    assert _rows(rollup, 'domain', 'count') == [
+        ('google.com', 2), ('mail.google.com', 1), ('www.google.com', 1)]
+
+
+def test_subparts_key_counts_every_record():
+    records = RECORDS + [
+        {'url': 'about:blank'}, {'url': 'http://localhost/'}, {'url': 'http://localhost:80/'}]
+    by_etld1 = Rollup()
+    by_etld1.update(records)
+    by_subparts = Rollup(key='subparts')
+    by_subparts.update(records)
+    etld1_counts = dict(_rows(by_etld1, 'etld1', 'count'))
+    assert etld1_counts == {'google.com': 3, 'tracker.co.uk': 1, '': 1, 'localhost': 2}
+    subparts_counts = dict(_rows(by_subparts, 'domain', 'count'))
+    assert {domain: subparts_counts[domain] for domain in etld1_counts} == etld1_counts
+
+
+def test_errors():
+    records = [{'url': 'http://example.com'}, {'url': None}]
+    with pytest.raises(AttributeError):
+        Rollup().update(records)
+    rollup = Rollup(errors='coerce')
+    rollup.update(records)
+    assert {row['etld1']: row['count'] for row in rollup.rows()} == {
+        'example.com': 1, None: 1}
+    with pytest.raises(ValueError):
+        Rollup(key='hostname')
+
+
+def test_spills_past_max_keys():
+    records = [
+        {'url': f'http://www.site{i % 50}.com/', 'id': i} for i in range(500)]
+    rollup = Rollup(max_keys=10, partitions=4, distinct=['id'])
+    rollup.update(records)
+    assert rollup.spilled
+    spill_dir = rollup._spill_dir
+    assert os.listdir(spill_dir)
+    rows = list(rollup.rows())
+    assert len(rows) == 50
+    assert all(row['count'] == 10 and row['distinct_id'] == 10 for row in rows)
+    # Spilled rollups can be read again
+    assert len(list(rollup.rows())) == 50
+    rollup.close()
+    assert not os.path.exists(spill_dir)
+
+
+def test_distinct_counts_are_sketched_past_exact_limit():
+    rollup = Rollup(distinct=['id'], exact_limit=100, precision=12)
+    rollup.update({'url': 'http://example.com', 'id': i} for i in range(20000))
+    (row,) = rollup.rows()
+    assert row['count'] == 20000
+    assert abs(row['distinct_id'] - 20000) < 20000 * 0.06
+
+
+def test_merge_partials():
+    records = [{'url': f'http://a{i % 7}.example{i % 3}.com/', 'id': i} for i in range(3000)]
+    whole = Rollup(distinct=['hostname', 'id'], exact_limit=50)
+    whole.update(records)
+    merged = Rollup(distinct=['hostname', 'id'], exact_limit=50, max_keys=2)
+    for start in range(0, 3000, 1000):
+        part = Rollup(distinct=['hostname', 'id'], exact_limit=50)
+        part.update(records[start:start + 1000])
+        # Partials cross process boundaries pickled
+        merged.merge(pickle.loads(pickle.dumps(part)))
+    expected = {row['etld1']: row for row in whole.rows()}
+    actual = {row['etld1']: row for row in merged.rows()}
+    assert actual.keys() == expected.keys()
+    for etld1, row in actual.items():
+        assert row['count'] == expected[etld1]['count'] == 1000
+        assert row['distinct_hostname'] == 7
+        assert abs(row['distinct_id'] - 1000) < 1000 * 0.1
+    with pytest.raises(ValueError):
+        merged.merge(Rollup(sums=['bytes']))
+
+
+def test_merge_leaves_other_rollup_unchanged():
+    a = Rollup(sums=['bytes'], distinct=['hostname'], exact_limit=2)
+    b = Rollup(sums=['bytes'], distinct=['hostname'], exact_limit=2)
+    b.add(RECORDS[0])
+    a.merge(b)
+    a.add(RECORDS[1])
+    a.add({'url': 'https://c.google.com/', 'bytes': 1})
+    a.merge(b)
+    assert _rows(b, 'etld1', 'count', 'bytes', 'distinct_hostname') == [
+        ('google.com', 1, 10, 1)]
+    assert _rows(a, 'etld1', 'count', 'bytes', 'distinct_hostname') == [
+        ('google.com', 4, 26.0, 3)]
+
+
+def test_merge_needs_same_sketch_settings():
+    a = Rollup(distinct=['id'])
+    with pytest.raises(ValueError):
+        a.merge(Rollup(distinct=['id'], precision=12))
+    with pytest.raises(ValueError):
+        a.merge(Rollup(distinct=['id'], exact_limit=10))
+    sketch = _Distinct()
+    for i in range(3):
+        sketch.add(i, 1, 10)
+    with pytest.raises(ValueError):
+        _Distinct().merge(sketch, 1, 12)
+    exact = _Distinct()
+    for i in range(3):
+        exact.add(i, 10, 10)
+    with pytest.raises(ValueError):
+        _Distinct().merge(exact, 1, 10)
+
+
+def test_pickle_loads_spilled_partials():
+    rollup = Rollup(max_keys=1)
+    rollup.update(RECORDS)
+    assert rollup.spilled
+    copy = pickle.loads(pickle.dumps(rollup))
+    assert not copy.spilled
+    assert _rows(copy, 'etld1', 'count') == _rows(rollup, 'etld1', 'count')
@@ -0,0 +1,88 @@
+import sqlite3
+import sys
+
+import pytest
+from domain_utils import SuffixTrie, get_etld1, get_port, get_scheme, stem_url
+from domain_utils.sqlite import register
+
+deterministic = pytest.mark.skipif(
+    sys.version_info < (3, 8), reason='deterministic functions need Python 3.8')
+
+URLS = [
+    'https://my.domain.cloudfront.net/a/path?a=1',
+    'http://www.google.com:8080#anchor',
+    'wss://mail.google.com/',
+    'about:blank',
+    'example.com/path',
+    'http://127.0.0.1/foo.html',
+]
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    register(conn)
+    conn.execute('CREATE TABLE http_requests (url TEXT, top_level_url TEXT)')
+    conn.executemany(
+        'INSERT INTO http_requests VALUES (?, ?)',
+        [(url, 'https://www.google.com/') for url in URLS] + [(None, None)])
+    yield conn
+    conn.close()
+
+
+def _column(conn, expression):
+    return [row[0] for row in conn.execute(f'SELECT {expression} FROM http_requests')]
+
+
+def test_functions_match_python(conn):
+    assert _column(conn, 'etld1(url)') == [get_etld1(url) for url in URLS] + [None]
+    assert _column(conn, 'stem_url(url)') == [stem_url(url) for url in URLS] + [None]
+    assert _column(conn, 'url_port(url)') == [get_port(url) for url in URLS] + [None]
+    assert _column(conn, 'url_scheme(url)') == [get_scheme(url) for url in URLS] + [None]
+    assert _column(conn, 'is_third_party(url, top_level_url)') == [1, 0, 0, 1, 1, 1, None]
+
+
+def test_stem_url_arguments(conn):
+    assert _column(conn, 'stem_url(url, 0, "http", 0, 1, 0)')[:4] == [
+        'https://my.domain.cloudfront.net', 'http://www.google.com:8080', '', '']
+
+
+@deterministic
+def test_group_by_etld1_with_expression_index(conn):
+    conn.execute('CREATE INDEX http_requests_etld1 ON http_requests (etld1(url))')
+    plan = conn.execute(
+        'EXPLAIN QUERY PLAN SELECT count(*) FROM http_requests WHERE etld1(url) = ?',
+        ('google.com',)).fetchall()
+    assert 'http_requests_etld1' in str(plan)
+    rows = conn.execute(
+        'SELECT etld1(url), count(*) FROM http_requests GROUP BY 1 ORDER BY 2 DESC, 1'
+    ).fetchall()
+    assert rows[0] == ('google.com', 2)
+
+
+@deterministic
+def test_generated_column(conn):
+    conn.execute(
+        'ALTER TABLE http_requests ADD COLUMN site TEXT AS (etld1(top_level_url)) VIRTUAL')
+    assert set(_column(conn, 'site')) == {'google.com', None}
+
+
+def test_errors():
+    conn = sqlite3.connect(':memory:')
+    register(conn)
+    assert conn.execute("SELECT url_port('http://a.com:99999/')").fetchone() == (None,)
+    conn = sqlite3.connect(':memory:')
+    register(conn, errors='raise')
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("SELECT url_port('http://a.com:99999/')").fetchone()
+    with pytest.raises(ValueError):
+        register(conn, errors='ignore')
+
+
+def test_extractor_and_cache_size():
+    conn = sqlite3.connect(':memory:')
+    register(conn, extractor=SuffixTrie.from_text('illa\nmoz.illa'), cache_size=1)
+    assert conn.execute(
+        "SELECT etld1('http://foo.bar.moz.illa'), etld1('http://a.b.illa'),"
+        " etld1('http://foo.bar.moz.illa')"
+    ).fetchone() == ('bar.moz.illa', 'b.illa', 'bar.moz.illa')
@@ -0,0 +1,178 @@
+import copy
+import multiprocessing
+import pickle
+
+import pytest
+from domain_utils import SuffixTrie, get_etld1, hostname_subparts, stem_url
+from domain_utils.extractor import PSL_SNAPSHOT, _local_extractor
+from domain_utils.suffix_trie import LOADED_CACHE_SIZE, _loaded, parse_suffix_list
+
+
+@pytest.fixture(scope='module')
+def trie():
+    return SuffixTrie.from_file(PSL_SNAPSHOT)
+
+
+def test_matches_tldextract_on_every_rule(trie):
+    tldextract_extractor = _local_extractor()
+    with open(PSL_SNAPSHOT, encoding='utf-8') as f:
+        rules = parse_suffix_list(f.read())
+    for rule, _ in rules:
+        host = rule.lstrip('!').replace('*', 'x')
+        for url in [host, 'a.' + host, 'http://B.a.' + host + ':80/p?q#f']:
+            assert trie(url) == tldextract_extractor(url)
+
+
+def test_wildcard_and_exception_rules(trie):
+    assert trie('foo.bar.ck') == ('', 'foo', 'bar.ck')
+    assert trie('a.www.ck') == ('a', 'www', 'ck')
+    assert trie('a.b.city.kawasaki.jp') == ('a.b', 'city', 'kawasaki.jp')
+    assert trie('a.b.foo.kawasaki.jp') == ('a', 'b', 'foo.kawasaki.jp')
+
+
+def test_punycode_host(trie):
+    assert trie('www.xn--85x722f.xn--55qx5d.cn').suffix == 'xn--55qx5d.cn'
+
+
+def test_ip_address(trie):
+    assert trie('http://127.0.0.1:8080/path') == ('', '127.0.0.1', '')
+
+
+def test_is_private(trie):
+    assert trie.is_private('my.domain.cloudfront.net')
+    assert not trie.is_private('www.google.com')
+    assert not trie.is_private('localhost')
+
+
+def test_exclude_private_rules():
+    with open(PSL_SNAPSHOT, encoding='utf-8') as f:
+        icann_trie = SuffixTrie.from_text(f.read(), include_private=False)
+    assert icann_trie('my.domain.cloudfront.net').suffix == 'net'
+
+
+def test_custom_rules():
+    trie = SuffixTrie([('moz.illa', False)])
+    assert get_etld1('http://foo.bar.moz.illa', extractor=trie) == 'bar.moz.illa'
+
+
+def test_get_etld1_with_trie(trie):
+    assert get_etld1('https://my.domain.cloudfront.net', extractor=trie) == 'domain.cloudfront.net'
+    assert get_etld1('http://foo.blah.apps.fbsbx.com', extractor=trie) == 'blah.apps.fbsbx.com'
+    assert get_etld1('http://192.168.1.1', extractor=trie) == '192.168.1.1'
+    assert get_etld1('about:blank', extractor=trie) == ''
+
+
+def test_hostname_subparts_with_trie(trie):
+    result = hostname_subparts(
+        'mydomain.cn-north-1.eb.amazonaws.com.cn', include_ps=True, extractor=trie)
+    assert result == ['mydomain.cn-north-1.eb.amazonaws.com.cn', 'cn-north-1.eb.amazonaws.com.cn']
+
+
+def test_stem_url_with_trie(trie):
+    result = stem_url('domain.com:8080/path/to/test.html?a=1', extractor=trie)
+    assert result == 'domain.com:8080/path/to/test.html'
+
+
+def test_rules_round_trip():
+    rules = [('com', False), ('*.ck', False), ('!www.ck', False), ('blogspot.com', True)]
+    assert sorted(SuffixTrie(rules).rules()) == sorted(rules)
+
+
+def test_wire_format_round_trip(trie):
+    data = trie.dumps()
+    assert data.startswith(b'DUSFX')
+    with open(PSL_SNAPSHOT, 'rb') as f:
+        assert len(data) < len(f.read()) / 4
+    _loaded.clear()
+    loaded = SuffixTrie.loads(data)
+    assert loaded is not trie
+    assert loaded._root == trie._root
+    assert loaded.dumps() == data
+    # Tries of the same rules serialize the same
+    assert SuffixTrie(trie.rules()).dumps() == data
+
+
+def test_loads_once_per_process(trie):
+    _loaded.clear()
+    first = pickle.loads(pickle.dumps(trie))
+    second = pickle.loads(pickle.dumps(trie))
+    assert second is not first
+    assert second._root is first._root
+    assert SuffixTrie.loads(trie.dumps())._root is first._root
+    assert get_etld1('http://a.b.bar.ck', extractor=first) == 'b.bar.ck'
+
+
+def test_loaded_cache_is_bounded():
+    _loaded.clear()
+    for i in range(LOADED_CACHE_SIZE + 3):
+        SuffixTrie.loads(SuffixTrie([(f'tld{i}', False)]).dumps())
+    assert len(_loaded) == LOADED_CACHE_SIZE
+
+
+def test_mutating_an_unpickled_trie(trie):
+    _loaded.clear()
+    data = pickle.dumps(trie)
+    changed = pickle.loads(data)
+    changed.add_rule('foo.com')
+    assert changed('x.y.foo.com').suffix == 'foo.com'
+    assert pickle.loads(data)('x.y.foo.com').suffix == 'com'
+    assert trie('x.y.foo.com').suffix == 'com'
+
+
+def test_copies_are_independent(trie):
+    for copy_trie in [copy.copy, copy.deepcopy]:
+        original = SuffixTrie([('com', False)])
+        copied = copy_trie(original)
+        copied.add_rule('foo.com')
+        original.add_rule('bar.com')
+        assert copied('a.foo.com').suffix == 'foo.com'
+        assert copied('a.bar.com').suffix == 'com'
+        assert original('a.foo.com').suffix == 'com'
+        assert original('a.bar.com').suffix == 'bar.com'
+
+
+def test_adding_rules_changes_wire_format():
+    trie = SuffixTrie([('com', False)])
+    data = trie.dumps()
+    trie.add_rule('co.com')
+    assert trie.dumps() != data
+    assert pickle.loads(pickle.dumps(trie))('a.co.com').suffix == 'co.com'
+
+
+@pytest.mark.parametrize('corrupt', [
+    lambda data: data[:4],
+    lambda data: b'X' + data[1:],
+    lambda data: data[:6] + b'\x02' + data[7:],
+    lambda data: data[:-1] + bytes([data[-1] ^ 1]),
+])
+def test_loads_rejects_bad_data(corrupt):
+    data = SuffixTrie([('com', False)]).dumps()
+    with pytest.raises(ValueError):
+        SuffixTrie.loads(corrupt(data))
+
+
+def test_loads_checks_cached_lists():
+    _loaded.clear()
+    data = SuffixTrie([('com', False)]).dumps()
+    SuffixTrie.loads(data)
+    with pytest.raises(ValueError):
+        SuffixTrie.loads(data[:-1] + bytes([data[-1] ^ 1]))
+    # Another list of the same size does not hit the cached one
+    other = SuffixTrie([('org', False)]).dumps()
+    assert len(other) == len(data)
+    assert SuffixTrie.loads(other)('a.b.org').suffix == 'org'
+
+
+def _etld1_in_worker(url, extractor):
+    return get_etld1(url, extractor=extractor), id(extractor._root)
+
+
+def test_pickled_to_worker_processes(trie):
+    urls = ['http://a.b.bar.ck', 'https://my.domain.cloudfront.net/', 'http://www.google.co.uk']
+    context = multiprocessing.get_context('spawn')
+    # ``ProcessPoolExecutor`` only takes ``mp_context`` from Python 3.7
+    with context.Pool(1) as pool:
+        results = [pool.apply(_etld1_in_worker, (url, trie)) for url in urls]
+    assert [etld1 for etld1, _ in results] == [get_etld1(url, extractor=trie) for url in urls]
+    # Each task unpickled the trie, but the worker only rebuilt it once
+    assert len({worker_id for _, worker_id in results}) == 1
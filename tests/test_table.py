@@ -0,0 +1,90 @@
+from array import array
+
+import pytest
+from domain_utils import DomainTable, SuffixTrie, get_etld1
+from domain_utils.table import MISSING
+
+URLS = [
+    'https://my.domain.cloudfront.net/a/path?a=1',
+    'http://www.google.com#anchor',
+    'https://mail.google.com/',
+    'about:blank',
+    'example.com:8080/path',
+    'http://127.0.0.1/foo.html',
+    'http://www.google.com/other',
+]
+
+
+def test_add_many():
+    table = DomainTable()
+    host_ids = table.add_many(URLS)
+    assert isinstance(host_ids, array)
+    assert host_ids.typecode == 'q'
+    assert list(host_ids) == [0, 1, 2, 3, 4, 5, 1]
+    assert len(table) == 6
+    assert table.etld1_count == 5
+    assert table.etld1s(table.parents(host_ids)) == [get_etld1(url) for url in URLS]
+
+
+def test_lookups_both_ways():
+    table = DomainTable()
+    host_id = table.add('https://mail.google.com:443/inbox')
+    assert table.hostname(host_id) == 'mail.google.com'
+    assert table.hostname_id('mail.google.com') == host_id
+    etld1_id = table.parent(host_id)
+    assert table.etld1(etld1_id) == 'google.com'
+    assert table.etld1_id('google.com') == etld1_id
+    with pytest.raises(KeyError):
+        table.hostname_id('www.google.com')
+
+
+def test_hosts_share_etld1_id():
+    table = DomainTable()
+    www, mail = table.add_many(['http://www.google.com', 'http://mail.google.com'])
+    assert www != mail
+    assert table.parent(www) == table.parent(mail)
+    assert table.parent_ids == array('q', [0, 0])
+
+
+def test_unparsed_urls_have_empty_hostname():
+    table = DomainTable()
+    host_id = table.add('about:blank')
+    assert table.hostname(host_id) == ''
+    assert table.etld1(table.parent(host_id)) == ''
+    assert table.add('data:image/gif;base64,AAA') == host_id
+
+
+def test_ipv6_addresses():
+    table = DomainTable()
+    loopback = table.add_hostname('[::1]')
+    assert table.hostname(loopback) == '::1'
+    assert table.etld1(table.parent(loopback)) == '::1'
+    address = table.add_hostname('2001:db8::1')
+    assert table.etld1(table.parent(address)) == '2001:db8::1'
+    assert table.add_hostname('[2001:db8::1]') == address
+    assert table.add('http://[2001:db8::1]:8080/x') == address
+    assert table.add('http://[::1]/') == loopback
+
+
+def test_errors_coerced_to_missing():
+    table = DomainTable()
+    host_ids = table.add_many(['http://[::1/x', 'http://a.com'], errors='coerce')
+    assert list(host_ids) == [MISSING, 0]
+    assert list(table.parents(host_ids)) == [MISSING, 0]
+    assert table.hostnames(host_ids) == [None, 'a.com']
+    with pytest.raises(ValueError):
+        table.add_many(['http://[::1/x'])
+
+
+def test_custom_extractor():
+    table = DomainTable(extractor=SuffixTrie([('moz.illa', False)]))
+    host_id = table.add('http://foo.bar.moz.illa')
+    assert table.etld1(table.parent(host_id)) == 'bar.moz.illa'
+
+
+def test_numpy_views():
+    np = pytest.importorskip('numpy')
+    table = DomainTable()
+    host_ids = np.frombuffer(table.add_many(URLS), dtype=np.int64)
+    parents = np.frombuffer(table.parent_ids, dtype=np.int64)
+    assert parents[host_ids].tolist() == list(table.parents(host_ids.tolist()))